@@ -28,11 +28,19 @@ def create_agent(tools, memory=None, llm_config=None):
         llm_config = DEFAULT_CONFIGS["huggingface"]
     
     # Initialize the LLM using the LiteLLM wrapper
-    llm = get_llm(llm_config)
+    # The agent's LLM streams by default so callbacks receive tokens as they arrive
+    llm = get_llm({**llm_config, "streaming": llm_config.get("streaming", True)})
+    
+    # Tool descriptions are formatted into the prompt template, so literal braces
+    # (JSON examples) must be escaped on per-agent copies of the tools
+    prompt_tools = [
+        tool.copy(update={"description": _escape_braces(tool.description)}) if "{" in tool.description else tool
+        for tool in tools
+    ]
     
     # Initialize the agent
     agent = initialize_agent(
-        tools=tools,
+        tools=prompt_tools,
         llm=llm,
         agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
         memory=memory,
@@ -43,7 +51,7 @@ def create_agent(tools, memory=None, llm_config=None):
     )
     
     # Custom prompt with error handling instructions
-    agent.agent.llm_chain.prompt.template += """
+    guidelines = """
 When using tools, follow these guidelines:
 1. If a tool call fails, reflect on the error and retry up to 2 times with corrected parameters.
 2. Document your thought process for each step in the workflow.
@@ -52,6 +60,8 @@ When using tools, follow these guidelines:
 
 Remember that you are an agentic software development assistant with access to:
 - CodeEditor: Read and write files in the user's filesystem
+- CodeSearch: Search the code under /sandbox/code (use it instead of grep/find)
+- CodeSymbols: Outline a file, find where a function or class is defined, and read just that definition
 - Shell: Execute commands in the user's environment
 
 Your goal is to help the user develop software efficiently and effectively.
@@ -104,5 +114,15 @@ Action: None
 Final Answer:
 /home/username/Documents/credentials.pdf
 """
+    prompt = agent.agent.llm_chain.prompt
+    if hasattr(prompt, "template"):
+        prompt.template += _escape_braces(guidelines)
+    else:
+        # Chat prompts keep the instructions in the leading system message
+        prompt.messages[0].prompt.template += _escape_braces(guidelines)
     
-    return agent
\ No newline at end of file
+    return agent
+
+def _escape_braces(text):
+    """Escape literal braces so text can be embedded in a prompt template."""
+    return text.replace("{", "{{").replace("}", "}}")
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Agent pool module for the Agentic Software-Development tool.
+This module keeps one LangChain agent per workflow so concurrent requests for different
+workflows never swap memory under each other.
+"""
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from backend.api.agent import create_agent
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class _PooledAgent:
+    """An agent bound to a single workflow, with a lock serializing runs on that workflow."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.lock = threading.Lock()
+
+
+class AgentPool:
+    """
+    LRU registry of agents keyed by workflow ID.
+
+    Each agent is bound to the workflow's ConversationBufferMemory from the memory
+    manager. Runs on the same workflow are serialized; runs on different workflows
+    proceed in parallel.
+    """
+
+    def __init__(self, tools, memory_manager, llm_config, max_agents=16):
+        """
+        Initialize the agent pool.
+
+        Args:
+            tools (list): List of LangChain tools shared by every agent
+            memory_manager (EnhancedMemoryManager): Source of per-workflow memories
+            llm_config (dict): Configuration for the LLM
+            max_agents (int): Maximum number of agents kept alive
+        """
+        self.tools = tools
+        self.memory_manager = memory_manager
+        self.llm_config = llm_config
+        self.max_agents = max_agents
+        self._agents = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented by reconfigure, so agents built for an older configuration are not pooled
+        self._generation = 0
+        self.created = 0
+        self.evicted = 0
+
+    def _get_entry(self, workflow_id):
+        """Get or create the pool entry for a workflow, updating LRU order."""
+        with self._lock:
+            entry = self._agents.get(workflow_id)
+            if entry is not None:
+                self._agents.move_to_end(workflow_id)
+                return entry
+            memory_manager, llm_config, generation = self.memory_manager, self.llm_config, self._generation
+
+        # Building an agent creates its LLM client, so it happens outside the lock
+        # Tools with per-workflow state (e.g. the persistent shell) get a bound copy
+        tools = [tool.for_workflow(workflow_id) if hasattr(tool, "for_workflow") else tool
+                 for tool in self.tools]
+        built = _PooledAgent(create_agent(
+            tools=tools,
+            memory=memory_manager.get_memory_for_llm(workflow_id),
+            llm_config=llm_config
+        ))
+
+        with self._lock:
+            entry = self._agents.get(workflow_id)
+            if entry is not None:
+                # Another request built this workflow's agent first
+                self._agents.move_to_end(workflow_id)
+                return entry
+            if self._generation != generation:
+                # Reconfigured while building; use the agent for this run only
+                return built
+            entry = self._agents[workflow_id] = built
+            self.created += 1
+            logger.info(f"Created agent for workflow {workflow_id} ({len(self._agents)}/{self.max_agents})")
+
+            # Evict the least recently used agents; in-flight runs keep their reference
+            while len(self._agents) > self.max_agents:
+                evicted_id, _ = self._agents.popitem(last=False)
+                self.evicted += 1
+                logger.info(f"Evicted agent for workflow {evicted_id}")
+            return entry
+
+    @contextmanager
+    def lease(self, workflow_id):
+        """
+        Borrow the agent for a workflow for the duration of a run.
+
+        Args:
+            workflow_id (str): The workflow ID
+
+        Yields:
+            Agent: The workflow's agent, bound to its current memory
+        """
+        entry = self._get_entry(workflow_id)
+        with entry.lock:
+            # Rebind if the memory manager replaced the workflow's memory since the agent was built
+            memory = self.memory_manager.get_memory_for_llm(workflow_id)
+            if entry.agent.memory is not memory:
+                entry.agent.memory = memory
+            yield entry.agent
+
+    def evict(self, workflow_id):
+        """
+        Drop the agent for a workflow.
+
+        Args:
+            workflow_id (str): The workflow ID
+        """
+        with self._lock:
+            if self._agents.pop(workflow_id, None) is not None:
+                self.evicted += 1
+
+    def reconfigure(self, llm_config):
+        """
+        Switch to a new LLM configuration, dropping existing agents. In-flight runs
+        finish with the agent they leased.
+
+        Args:
+            llm_config (dict): The new LLM configuration
+        """
+        with self._lock:
+            self.llm_config = llm_config
+            self._generation += 1
+            self._agents.clear()
+        logger.info("Agent pool reconfigured")
+
+    def get_stats(self):
+        """
+        Get pool occupancy.
+
+        Returns:
+            dict: Size, capacity and lifetime created/evicted counts
+        """
+        with self._lock:
+            return {
+                "size": len(self._agents),
+                "max_agents": self.max_agents,
+                "created": self.created,
+                "evicted": self.evicted
+            }
@@ -0,0 +1,151 @@
+"""
+HTTP cache module for the Agentic Software-Development tool.
+This module adds conditional GET (ETag/Last-Modified, 304 Not Modified) and negotiated
+gzip/brotli compression to JSON endpoints the frontend polls, so an unchanged resource
+is answered from a version check without reading or re-sending it.
+"""
+import os
+import gzip
+import logging
+from datetime import datetime, timezone
+from flask import request, Response
+from werkzeug.http import is_resource_modified, parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are sent uncompressed (the headers would cost more than they save)
+COMPRESS_MIN_BYTES = int(os.environ.get("AGENT_COMPRESS_MIN_BYTES", "1024"))
+
+# gzip level 6 and brotli quality 5 favour speed; responses are compressed per request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _encodings():
+    """Get the content codings this server can produce, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The header value
+
+    Returns:
+        str: "br", "gzip" or None for identity
+    """
+    accepted = parse_accept_header(accept_encoding or "")
+    best, best_quality = None, 0
+    for encoding in _encodings():
+        quality = accepted.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response):
+    """
+    Compress a response body in place if the client accepts it and it is worth it.
+
+    Streamed, already encoded and small responses are left alone.
+
+    Args:
+        response (Response): The response
+
+    Returns:
+        Response: The same response
+    """
+    response.vary.add("Accept-Encoding")
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or "Content-Encoding" in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    if encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    else:
+        return response
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def _as_datetime(timestamp):
+    """Convert a Unix time to the aware datetime werkzeug compares validators with."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else None
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Answer a conditional GET from a resource version, before the resource is read.
+
+    Args:
+        etag (str): The resource's current entity tag (unquoted; sent as a weak ETag)
+        last_modified (float, optional): Unix time of the last change
+
+    Returns:
+        Response: A 304 response if the client's copy is current, otherwise None
+    """
+    if is_resource_modified(request.environ, etag=etag, last_modified=_as_datetime(last_modified)):
+        return None
+    response = Response(status=304)
+    return _set_validators(response, etag, last_modified)
+
+
+def cacheable(response, etag, last_modified=None):
+    """
+    Add validators to a 200 response and compress it.
+
+    Clients must revalidate on every use (no-cache), so polling stays correct while
+    unchanged resources come back as empty 304s.
+
+    Args:
+        response (Response): The response
+        etag (str): The resource's entity tag, taken before the resource was read
+        last_modified (float, optional): Unix time of the last change
+
+    Returns:
+        Response: The same response
+    """
+    _set_validators(response, etag, last_modified)
+    return compress_response(response)
+
+
+def _set_validators(response, etag, last_modified):
+    """Set ETag, Last-Modified and Cache-Control on a response."""
+    # Weak, since the same representation is sent with different content codings
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _as_datetime(last_modified)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def file_version(path):
+    """
+    Get the validators of a file from its metadata, without reading it.
+
+    Args:
+        path (str): The file path
+
+    Returns:
+        tuple: (etag, last_modified)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    stat = os.stat(path)
+    return f"{stat.st_ino:x}-{stat.st_mtime_ns:x}-{stat.st_size:x}", stat.st_mtime
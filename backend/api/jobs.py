@@ -0,0 +1,436 @@
+"""
+Job manager module for the Agentic Software-Development tool.
+This module runs agent tasks as background jobs so HTTP requests return immediately:
+a worker pool executes the runs, clients poll or stream a job's events, and each LLM
+provider has its own concurrency limit.
+"""
+import time
+import uuid
+import threading
+import logging
+from collections import OrderedDict, deque
+from typing import Any
+from langchain.callbacks.base import BaseCallbackHandler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's run once cancellation has been requested."""
+
+
+class Job:
+    """
+    A single agent run and its progress.
+
+    Events (tokens, actions, observations, ...) are numbered so clients can resume a
+    stream from the last event they saw. Only the newest max_events are retained;
+    a reader that falls behind them gets a "truncated" event first. Actions and
+    observations are additionally kept in full as the job's steps.
+    """
+
+    def __init__(self, params, provider, max_events=5000):
+        """
+        Initialize a queued job.
+
+        Args:
+            params (dict): Parameters for the run function
+            provider (str): The LLM provider the run uses
+            max_events (int): Number of events retained for streaming
+        """
+        self.id = str(uuid.uuid4())
+        self.params = params
+        self.provider = provider
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.steps = []
+        self.events = deque(maxlen=max_events)
+        self.next_seq = 1
+        self.cancel_requested = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        """Whether the job reached a final state."""
+        return self.status in FINISHED_STATES
+
+    def emit(self, event, data):
+        """
+        Record an event and wake up stream readers.
+
+        Args:
+            event (str): The event name
+            data (dict): JSON-serializable event payload
+        """
+        with self._changed:
+            self.events.append((self.next_seq, event, data))
+            self.next_seq += 1
+            if event in ("action", "observation"):
+                self.steps.append({"type": event, **data})
+            self._changed.notify_all()
+
+    def set_status(self, status, result=None, error=None):
+        """
+        Move the job to a new state and emit a matching event.
+
+        Args:
+            status (str): The new status
+            result (dict, optional): The run's result on success
+            error (str, optional): The error message on failure
+        """
+        with self._changed:
+            self.status = status
+            if status == RUNNING:
+                self.started_at = time.time()
+            if status in FINISHED_STATES:
+                self.finished_at = time.time()
+                self.result = result
+                self.error = error
+        if status == SUCCEEDED:
+            self.emit("final", {**(result or {}), "job_id": self.id})
+        elif status == FAILED:
+            self.emit("error", {"error": error, "job_id": self.id})
+        else:
+            self.emit(status, {"job_id": self.id})
+
+    def events_after(self, seq, timeout=None):
+        """
+        Get events newer than seq, waiting for one if there are none yet.
+
+        If events after seq were already dropped, the list starts with a "truncated"
+        event numbered just before the oldest retained one, saying how many were lost.
+
+        Args:
+            seq (int): The last event number already seen
+            timeout (float, optional): Seconds to wait for a new event
+
+        Returns:
+            list: (seq, event, data) tuples
+        """
+        with self._changed:
+            if self.next_seq - 1 <= seq and not self.finished:
+                self._changed.wait(timeout)
+            events = [item for item in self.events if item[0] > seq]
+            if events and events[0][0] > seq + 1:
+                first = events[0][0]
+                events.insert(0, (first - 1, "truncated", {"job_id": self.id, "dropped": first - 1 - seq,
+                                                          "first_event": first}))
+            return events
+
+    def to_dict(self, include_steps=True):
+        """
+        Serialize the job for the API.
+
+        Args:
+            include_steps (bool): Whether to include intermediate steps
+
+        Returns:
+            dict: The job's state
+        """
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "provider": self.provider,
+            "session_id": self.params.get("session_id"),
+            "workflow_id": self.params.get("workflow_id"),
+            "step_id": self.params.get("step_id"),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "last_event": self.next_seq - 1,
+            "result": self.result,
+            "error": self.error
+        }
+        if include_steps:
+            data["steps"] = list(self.steps)
+        return data
+
+
+class JobEventHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler that records agent progress on a job and stops the
+    run at the next callback once the job is cancelled.
+    """
+
+    # Let JobCancelled propagate out of the callback manager instead of being logged
+    raise_error = True
+
+    def __init__(self, job):
+        self.job = job
+
+    def _check_cancelled(self):
+        if self.job.cancel_requested.is_set():
+            raise JobCancelled(f"Job {self.job.id} was cancelled")
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        """Stop before another LLM call if the job was cancelled."""
+        self._check_cancelled()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Record each generated token."""
+        self._check_cancelled()
+        self.job.emit("token", {"token": token})
+
+    def on_agent_action(self, action, **kwargs: Any) -> Any:
+        """Record the agent's thought and chosen action."""
+        self._check_cancelled()
+        self.job.emit("action", {
+            "thought": action.log,
+            "tool": action.tool,
+            "tool_input": action.tool_input
+        })
+
+    def on_tool_start(self, serialized, input_str: str, **kwargs: Any) -> None:
+        """Stop before running a tool if the job was cancelled."""
+        self._check_cancelled()
+
+    def on_tool_end(self, output: str, **kwargs: Any) -> None:
+        """Record the observation returned by a tool."""
+        self.job.emit("observation", {"observation": output})
+
+    def on_tool_error(self, error, **kwargs: Any) -> None:
+        """Record tool failures as observations."""
+        self.job.emit("observation", {"observation": f"Tool error: {str(error)}"})
+
+    def on_agent_finish(self, finish, **kwargs: Any) -> None:
+        """Record the agent's final answer text."""
+        self.job.emit("agent_finish", {"output": finish.return_values.get("output", ""), "log": finish.log})
+
+
+class JobManager:
+    """
+    Runs jobs on a fixed pool of worker threads.
+
+    Workers take the oldest queued job whose provider is below its concurrency limit,
+    so a slow or rate-limited provider cannot occupy every worker.
+    """
+
+    def __init__(self, run_fn, num_workers=4, provider_limits=None, default_provider_limit=2, max_finished=200):
+        """
+        Initialize the manager and start its workers.
+
+        Args:
+            run_fn (callable): Called as run_fn(job, handler); returns the result dict
+            num_workers (int): Number of worker threads
+            provider_limits (dict, optional): Maximum concurrent jobs per provider
+            default_provider_limit (int): Limit for providers not in provider_limits
+            max_finished (int): Number of finished jobs kept for polling
+        """
+        self.run_fn = run_fn
+        self.provider_limits = dict(provider_limits or {})
+        self.default_provider_limit = default_provider_limit
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._queue = []
+        self._running = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _limit(self, provider):
+        """Get the concurrency limit for a provider."""
+        return self.provider_limits.get(provider, self.default_provider_limit)
+
+    def submit(self, params, provider):
+        """
+        Queue a job.
+
+        Args:
+            params (dict): Parameters for the run function
+            provider (str): The LLM provider the run uses
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(params, provider)
+        with self._cond:
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self.submitted += 1
+            self._prune()
+            self._cond.notify_all()
+        job.emit("queued", {"job_id": job.id, "position": self.queue_position(job.id)})
+        logger.info(f"Queued job {job.id} for provider {provider}")
+        return job
+
+    def get(self, job_id):
+        """
+        Get a job by ID.
+
+        Args:
+            job_id (str): The job ID
+
+        Returns:
+            Job: The job, or None
+        """
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """
+        Get a queued job's position (1 is next).
+
+        Args:
+            job_id (str): The job ID
+
+        Returns:
+            int: The position, or None if the job is not queued
+        """
+        with self._cond:
+            for position, job in enumerate(self._queue, 1):
+                if job.id == job_id:
+                    return position
+        return None
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Queued jobs are dropped at once; running jobs stop at their next
+        LLM call, token or tool invocation.
+
+        Args:
+            job_id (str): The job ID
+
+        Returns:
+            Job: The job, or None if it does not exist
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.cancel_requested.set()
+            if job in self._queue:
+                self._queue.remove(job)
+                self.cancelled += 1
+                dequeued = True
+            else:
+                dequeued = False
+        if dequeued:
+            job.set_status(CANCELLED)
+        logger.info(f"Cancellation requested for job {job_id}")
+        return job
+
+    def _next_job(self):
+        """Take the oldest runnable job. Caller holds the condition."""
+        for job in self._queue:
+            if self._running.get(job.provider, 0) < self._limit(job.provider):
+                self._queue.remove(job)
+                self._running[job.provider] = self._running.get(job.provider, 0) + 1
+                return job
+        return None
+
+    def _worker(self):
+        """Run jobs until stopped."""
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._stopped:
+                    self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+
+            job.set_status(RUNNING)
+            logger.info(f"Running job {job.id}")
+            try:
+                result = self.run_fn(job, JobEventHandler(job))
+                if job.cancel_requested.is_set():
+                    raise JobCancelled(f"Job {job.id} was cancelled")
+                job.set_status(SUCCEEDED, result=result)
+                outcome = "succeeded"
+            except JobCancelled:
+                job.set_status(CANCELLED)
+                outcome = "cancelled"
+            except Exception as e:
+                if job.cancel_requested.is_set():
+                    job.set_status(CANCELLED)
+                    outcome = "cancelled"
+                else:
+                    logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+                    job.set_status(FAILED, error=str(e))
+                    outcome = "failed"
+            logger.info(f"Job {job.id} {outcome} in {job.finished_at - job.started_at:.2f}s")
+
+            with self._cond:
+                self._running[job.provider] -= 1
+                setattr(self, outcome, getattr(self, outcome) + 1)
+                self._prune()
+                self._cond.notify_all()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished. Caller holds the condition."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def get_stats(self):
+        """
+        Get queue and worker occupancy.
+
+        Returns:
+            dict: Job counters and per-provider running counts and limits
+        """
+        with self._cond:
+            providers = set(self._running) | set(self.provider_limits) | {job.provider for job in self._queue}
+            return {
+                "workers": len(self._workers),
+                "queued": len(self._queue),
+                "running": sum(self._running.values()),
+                "submitted": self.submitted,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "providers": {
+                    provider: {
+                        "running": self._running.get(provider, 0),
+                        "queued": sum(1 for job in self._queue if job.provider == provider),
+                        "limit": self._limit(provider)
+                    }
+                    for provider in sorted(providers)
+                }
+            }
+
+    def stop(self):
+        """Stop the workers once their current jobs finish."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+def parse_provider_limits(spec):
+    """
+    Parse a per-provider concurrency spec such as "openai=4,huggingface=1".
+
+    Args:
+        spec (str): Comma-separated provider=limit pairs
+
+    Returns:
+        dict: Provider to limit
+    """
+    limits = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            provider, limit = part.split("=", 1)
+            limits[provider.strip()] = int(limit)
+    return limits
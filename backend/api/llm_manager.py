@@ -5,10 +5,16 @@ This module provides a unified interface to different LLM providers using LiteLL
 import os
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
 import litellm
 from langchain.llms.base import LLM
+from langchain.schema.output import GenerationChunk
 from langchain.callbacks.manager import CallbackManagerForLLMRun
+from backend.api.rate_limiter import rate_limiters, estimate_tokens
+from backend.api.response_cache import get_response_cache, make_cache_key
+from backend.api.metrics import LLM_REQUEST_DURATION, LLM_FIRST_TOKEN, LLM_REQUESTS, LLM_TOKENS
+from backend.api.tracing import record_span
+from backend.api.jobs import JobCancelled
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,12 +30,124 @@ class LiteLLMWrapper(LLM):
     model_name: str = "gpt-3.5-turbo"
     api_key: Optional[str] = None
     model_kwargs: Dict[str, Any] = {}
+    rate_limit: Dict[str, Any] = {}
+    streaming: bool = False
+    response_cache: Dict[str, Any] = {}
     
     @property
     def _llm_type(self) -> str:
         """Return the type of LLM."""
         return "litellm"
     
+    def _set_api_key(self):
+        """Export the API key for the configured provider to the environment LiteLLM reads."""
+        if self.provider == "openai":
+            os.environ["OPENAI_API_KEY"] = self.api_key or os.environ.get("OPENAI_API_KEY", "")
+        elif self.provider == "anthropic":
+            os.environ["ANTHROPIC_API_KEY"] = self.api_key or os.environ.get("ANTHROPIC_API_KEY", "")
+        elif self.provider == "huggingface":
+            # Handle both environment variable names for Hugging Face
+            hf_key = self.api_key or os.environ.get("HUGGINGFACE_API_KEY", os.environ.get("HUGGINGFACEHUB_API_TOKEN", ""))
+            os.environ["HUGGINGFACE_API_KEY"] = hf_key
+            os.environ["HUGGINGFACEHUB_API_TOKEN"] = hf_key  # Set both for compatibility
+        elif self.provider == "google":
+            os.environ["GOOGLE_API_KEY"] = self.api_key or os.environ.get("GOOGLE_API_KEY", "")
+        elif self.provider == "azure":
+            os.environ["AZURE_API_KEY"] = self.api_key or os.environ.get("AZURE_API_KEY", "")
+    
+    def _get_model(self):
+        """Construct the model string for LiteLLM."""
+        # Special case for Hugging Face models
+        if self.provider == "huggingface":
+            return self.model_name
+        return f"{self.provider}/{self.model_name}" if self.provider != "openai" else self.model_name
+    
+    def _completion(self, **kwargs):
+        """
+        Request a completion from the provider.
+        
+        Args:
+            **kwargs: Arguments for litellm.completion
+            
+        Returns:
+            The LiteLLM response, or an iterator of chunks when stream=True
+        """
+        return litellm.completion(**kwargs)
+    
+    def _acquire_rate_limit(self, prompt, call_kwargs):
+        """
+        Wait until the shared provider/model budget allows another call.
+        
+        Args:
+            prompt (str): The prompt to send to the model
+            call_kwargs (dict): Model parameters for the call
+            
+        Returns:
+            tuple: (RateLimiter, estimated_tokens)
+        """
+        limiter = rate_limiters.get(
+            self.provider,
+            self.model_name,
+            requests_per_minute=self.rate_limit.get("requests_per_minute"),
+            tokens_per_minute=self.rate_limit.get("tokens_per_minute")
+        )
+        estimated_tokens = estimate_tokens(prompt, call_kwargs)
+        waited = limiter.acquire(estimated_tokens)
+        if waited > 0:
+            logger.info(f"Rate limited: waited {waited:.2f}s before LLM API call to {self.provider}/{self.model_name}")
+            record_span("rate_limit.wait", "wait", waited, provider=self.provider, model=self.model_name)
+        return limiter, estimated_tokens
+    
+    def _cache_key(self, prompt, stop, call_kwargs):
+        """
+        Get the response cache key for a call, or None if the call bypasses the cache.
+        
+        Only calls with temperature 0 are cached, since sampled completions are not
+        reproducible; "force" caches regardless of temperature.
+        
+        Args:
+            prompt (str): The prompt to send to the model
+            stop (List[str], optional): List of stop sequences
+            call_kwargs (dict): Model parameters for the call
+            
+        Returns:
+            str: The cache key, or None
+        """
+        if not self.response_cache.get("enabled"):
+            return None
+        if not self.response_cache.get("force"):
+            try:
+                temperature = float(call_kwargs.get("temperature", 1.0))
+            except (TypeError, ValueError):
+                temperature = 1.0
+            if temperature > 0:
+                get_response_cache().record_bypass()
+                return None
+        return make_cache_key(self.provider, self.model_name, prompt, stop, call_kwargs)
+    
+    def _record_metrics(self, mode, started, status, prompt="", text="", response=None):
+        """
+        Record a finished LLM call's latency, outcome and token counts.
+        
+        Args:
+            mode (str): "complete" or "stream"
+            started (float): time.perf_counter() at the start of the call
+            status (str): "ok", "error", "cancelled" or "cached"
+            prompt (str): The prompt, used to estimate prompt tokens
+            text (str): The completion, used to estimate completion tokens
+            response: The LiteLLM response, for provider-reported usage
+        """
+        labels = {"provider": self.provider, "model": self.model_name}
+        LLM_REQUESTS.inc(status=status, **labels)
+        if status == "cached":
+            return
+        LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode=mode, **labels)
+        if status != "ok":
+            return
+        prompt_tokens, completion_tokens = _get_usage(response)
+        LLM_TOKENS.inc(prompt_tokens if prompt_tokens is not None else len(prompt) // 4 + 1, type="prompt", **labels)
+        LLM_TOKENS.inc(completion_tokens if completion_tokens is not None else len(text) // 4, type="completion", **labels)
+    
     def _call(
         self,
         prompt: str,
@@ -40,6 +158,9 @@ class LiteLLMWrapper(LLM):
         """
         Call the LiteLLM model.
         
+        When streaming is enabled the completion is requested as a stream and every
+        token is forwarded to the callback manager as it arrives.
+        
         Args:
             prompt (str): The prompt to send to the model
             stop (List[str], optional): List of stop sequences
@@ -48,66 +169,279 @@ class LiteLLMWrapper(LLM):
         Returns:
             str: The model's response
         """
-        # Set the API key based on provider
-        if self.provider == "openai":
-            os.environ["OPENAI_API_KEY"] = self.api_key or os.environ.get("OPENAI_API_KEY", "")
-        elif self.provider == "anthropic":
-            os.environ["ANTHROPIC_API_KEY"] = self.api_key or os.environ.get("ANTHROPIC_API_KEY", "")
-        elif self.provider == "huggingface":
-            # Handle both environment variable names for Hugging Face
-            hf_key = self.api_key or os.environ.get("HUGGINGFACE_API_KEY", os.environ.get("HUGGINGFACEHUB_API_TOKEN", ""))
-            os.environ["HUGGINGFACE_API_KEY"] = hf_key
-            os.environ["HUGGINGFACEHUB_API_TOKEN"] = hf_key  # Set both for compatibility
-        elif self.provider == "google":
-            os.environ["GOOGLE_API_KEY"] = self.api_key or os.environ.get("GOOGLE_API_KEY", "")
-        elif self.provider == "azure":
-            os.environ["AZURE_API_KEY"] = self.api_key or os.environ.get("AZURE_API_KEY", "")
-        
-        # Construct the model string for LiteLLM
-        model = f"{self.provider}/{self.model_name}" if self.provider != "openai" else self.model_name
+        if self.streaming:
+            try:
+                text = "".join(chunk.text for chunk in self._stream(prompt, stop=stop, run_manager=run_manager, **kwargs))
+                logger.info(f"LLM stream finished, length: {len(text)}")
+                return text
+            except JobCancelled:
+                # Raised by the job's token callback; the run must stop, not see an error reply
+                raise
+            except Exception as e:
+                logger.error(f"LiteLLM Error: {str(e)}", exc_info=True)
+                return f"Error calling LLM: {str(e)}"
         
-        # Special case for Hugging Face models
-        if self.provider == "huggingface":
-            model = self.model_name
+        self._set_api_key()
+        model = self._get_model()
+        call_kwargs = {**self.model_kwargs, **kwargs}
+        started = time.perf_counter()
         
         try:
-            # Add a 2-second delay before each API call to avoid rate limiting
-            logger.info(f"Adding 2-second delay before LLM API call to {self.provider}/{self.model_name}")
-            time.sleep(2)
+            cache_key = self._cache_key(prompt, stop, call_kwargs)
+            if cache_key:
+                cached = get_response_cache().get(cache_key)
+                if cached is not None:
+                    logger.info(f"LLM response served from cache, length: {len(cached)}")
+                    self._record_metrics("complete", started, "cached")
+                    return cached
+            
+            limiter, estimated_tokens = self._acquire_rate_limit(prompt, call_kwargs)
             
             # Call LiteLLM
             logger.info(f"Calling LLM: {model}")
-            response = litellm.completion(
+            response = self._completion(
                 model=model,
                 prompt=prompt,
                 stop=stop,
-                **{**self.model_kwargs, **kwargs}
+                **call_kwargs
             )
+            limiter.record_usage(estimated_tokens, _get_total_tokens(response))
+            text = response.choices[0].text
+            if cache_key:
+                get_response_cache().set(cache_key, text, ttl=self.response_cache.get("ttl"))
             
-            logger.info(f"LLM response received, length: {len(response.choices[0].text)}")
-            return response.choices[0].text
+            self._record_metrics("complete", started, "ok", prompt, text, response)
+            logger.info(f"LLM response received, length: {len(text)}")
+            return text
         except Exception as e:
             # Log the error and return a helpful message
+            self._record_metrics("complete", started, "error")
             logger.error(f"LiteLLM Error: {str(e)}", exc_info=True)
             return f"Error calling LLM: {str(e)}"
+    
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> Iterator[GenerationChunk]:
+        """
+        Stream the LiteLLM model's response token by token.
+        
+        Args:
+            prompt (str): The prompt to send to the model
+            stop (List[str], optional): List of stop sequences
+            run_manager (CallbackManagerForLLMRun, optional): Callback manager notified of each token
+            
+        Yields:
+            GenerationChunk: The next piece of the response
+        """
+        self._set_api_key()
+        model = self._get_model()
+        call_kwargs = {**self.model_kwargs, **kwargs}
+        started = time.perf_counter()
+        
+        # A cached response is replayed as a single token
+        cache_key = self._cache_key(prompt, stop, call_kwargs)
+        if cache_key:
+            cached = get_response_cache().get(cache_key)
+            if cached is not None:
+                logger.info(f"LLM response served from cache, length: {len(cached)}")
+                self._record_metrics("stream", started, "cached")
+                if run_manager:
+                    run_manager.on_llm_new_token(cached)
+                yield GenerationChunk(text=cached)
+                return
+        
+        limiter, estimated_tokens = self._acquire_rate_limit(prompt, call_kwargs)
+        
+        logger.info(f"Calling LLM (streaming): {model}")
+        completion_chars = 0
+        tokens = []
+        try:
+            stream = self._completion(
+                model=model,
+                prompt=prompt,
+                stop=stop,
+                stream=True,
+                **call_kwargs
+            )
+            
+            for chunk in stream:
+                token = _get_chunk_text(chunk)
+                if not token:
+                    continue
+                if not completion_chars:
+                    LLM_FIRST_TOKEN.observe(time.perf_counter() - started, provider=self.provider, model=self.model_name)
+                completion_chars += len(token)
+                tokens.append(token)
+                if run_manager:
+                    run_manager.on_llm_new_token(token)
+                yield GenerationChunk(text=token)
+        except JobCancelled:
+            self._record_metrics("stream", started, "cancelled")
+            raise
+        except Exception:
+            self._record_metrics("stream", started, "error")
+            raise
+        text = "".join(tokens)
+        self._record_metrics("stream", started, "ok", prompt, text)
+        
+        # Streams don't report usage, so reconcile with an estimate of what was produced
+        limiter.record_usage(estimated_tokens, estimate_tokens(prompt) + completion_chars // 4)
+        if cache_key:
+            get_response_cache().set(cache_key, text, ttl=self.response_cache.get("ttl"))
+
+def _get_chunk_text(chunk):
+    """
+    Extract the text of a streamed LiteLLM chunk.
+    
+    Args:
+        chunk: A streamed completion chunk (text or chat style)
+        
+    Returns:
+        str: The chunk text, or an empty string
+    """
+    try:
+        choice = chunk.choices[0]
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return ""
+    text = getattr(choice, "text", None)
+    if text:
+        return text
+    delta = getattr(choice, "delta", None)
+    if isinstance(delta, dict):
+        return delta.get("content") or ""
+    return getattr(delta, "content", None) or ""
+
+def _get_usage(response):
+    """
+    Extract prompt and completion token usage from a LiteLLM response.
+    
+    Args:
+        response: The LiteLLM completion response, or None
+        
+    Returns:
+        tuple: (prompt_tokens, completion_tokens); each is None if not reported
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None, None
+    counts = []
+    for key in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+        try:
+            counts.append(int(value) if value is not None else None)
+        except (TypeError, ValueError):
+            counts.append(None)
+    return tuple(counts)
+
+def _get_total_tokens(response):
+    """
+    Extract the total token usage from a LiteLLM response.
+    
+    Args:
+        response: The LiteLLM completion response
+        
+    Returns:
+        int: Total tokens used, or None if the provider did not report usage
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    try:
+        total = usage.get("total_tokens") if isinstance(usage, dict) else getattr(usage, "total_tokens", None)
+        return int(total) if total is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def get_rate_limit(config):
+    """
+    Resolve the rate limit budget for a configuration.
+    
+    Budgets come from the config's "rate_limit" entry, then the LLM_RATE_LIMIT_RPM /
+    LLM_RATE_LIMIT_TPM environment variables, then DEFAULT_RATE_LIMITS for the provider.
+    
+    Args:
+        config (dict): Configuration with provider and optionally rate_limit
+        
+    Returns:
+        dict: {"requests_per_minute": int|None, "tokens_per_minute": int|None}
+    """
+    rate_limit = dict(DEFAULT_RATE_LIMITS.get(config.get("provider", "openai"), {}))
+    if os.environ.get("LLM_RATE_LIMIT_RPM"):
+        rate_limit["requests_per_minute"] = int(os.environ["LLM_RATE_LIMIT_RPM"])
+    if os.environ.get("LLM_RATE_LIMIT_TPM"):
+        rate_limit["tokens_per_minute"] = int(os.environ["LLM_RATE_LIMIT_TPM"])
+    rate_limit.update(config.get("rate_limit") or {})
+    return rate_limit
+
+def get_cache_config(config):
+    """
+    Resolve the response cache settings for a configuration.
+    
+    The cache is off unless the config's "cache" entry or the LLM_RESPONSE_CACHE
+    environment variable ("1"/"true", or "force") turns it on.
+    
+    Args:
+        config (dict): Configuration with optionally cache
+        
+    Returns:
+        dict: {"enabled": bool, "force": bool, "ttl": seconds|None}
+    """
+    env = os.environ.get("LLM_RESPONSE_CACHE", "").lower()
+    cache = {
+        "enabled": env in ("1", "true", "yes", "force"),
+        "force": env == "force",
+        "ttl": float(os.environ["LLM_CACHE_TTL"]) if os.environ.get("LLM_CACHE_TTL") else None
+    }
+    cache.update(config.get("cache") or {})
+    return cache
 
 def get_llm(config):
     """
     Create an LLM based on configuration.
     
     Args:
-        config (dict): Configuration with provider, model_name, api_key, and model_kwargs
+        config (dict): Configuration with provider, model_name, api_key, model_kwargs
+                       and optionally rate_limit, streaming and cache
         
     Returns:
         LLM: A LangChain compatible LLM
     """
+    if config.get("provider") == "mock":
+        # Imported here to keep the benchmark-only provider out of normal startup
+        from backend.api.mock_llm import MockLLM
+        return MockLLM(
+            provider="mock",
+            model_name=config.get("model_name", "react"),
+            model_kwargs=config.get("model_kwargs", {}),
+            rate_limit=get_rate_limit(config),
+            streaming=config.get("streaming", False),
+            response_cache=get_cache_config(config),
+            mock=config.get("mock") or {}
+        )
     return LiteLLMWrapper(
         provider=config.get("provider", "openai"),
         model_name=config.get("model_name", "gpt-3.5-turbo"),
         api_key=config.get("api_key"),
-        model_kwargs=config.get("model_kwargs", {})
+        model_kwargs=config.get("model_kwargs", {}),
+        rate_limit=get_rate_limit(config),
+        streaming=config.get("streaming", False),
+        response_cache=get_cache_config(config)
     )
 
+# Default rate limit budgets per provider (None means unlimited)
+DEFAULT_RATE_LIMITS = {
+    "huggingface": {"requests_per_minute": 30, "tokens_per_minute": None},
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 60000},
+    "anthropic": {"requests_per_minute": 50, "tokens_per_minute": 40000},
+    "google": {"requests_per_minute": 60, "tokens_per_minute": None},
+    "azure": {"requests_per_minute": 300, "tokens_per_minute": 60000},
+    "mock": {"requests_per_minute": None, "tokens_per_minute": None}
+}
+
 # Default configurations for different providers
 DEFAULT_CONFIGS = {
     "huggingface": {
@@ -149,5 +483,17 @@ DEFAULT_CONFIGS = {
             "max_output_tokens": 1024,
             "top_p": 0.95
         }
+    },
+    "mock": {
+        "provider": "mock",
+        "model_name": "react",
+        "api_key": "",
+        "model_kwargs": {
+            "temperature": 0.0
+        },
+        "mock": {
+            "latency": 0.05,
+            "tokens_per_second": 0
+        }
     }
 }
\ No newline at end of file
@@ -0,0 +1,347 @@
+"""
+Metrics module for the Agentic Software-Development tool.
+This module keeps in-process counters, gauges and histograms for the hot paths (HTTP
+requests, LLM calls, tools, history storage and summarization) and renders them in the
+Prometheus text exposition format for /api/metrics.
+"""
+import time
+import threading
+import functools
+import logging
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value):
+    """Escape a label value for the text format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    """Render a {name="value",...} label set."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    """Render a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): The metric name
+            documentation (str): HELP text
+            labelnames (tuple): Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """Get the label values in labelnames order."""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self):
+        """Yield (suffix, label values, extra label, value) tuples."""
+        raise NotImplementedError
+
+    def render(self):
+        """
+        Render the metric in the text exposition format.
+
+        Returns:
+            str: HELP, TYPE and sample lines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): Amount to add
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        """Get the current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", key, None, value
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down.
+
+    Values are either set directly or read from a callback at render time, so queue
+    depths cost nothing between scrapes.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        """
+        Initialize the gauge.
+
+        Args:
+            name (str): The metric name
+            documentation (str): HELP text
+            labelnames (tuple): Label names
+            callback (callable, optional): Returns a number, or a list of (labels dict, value)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        """
+        Set the gauge.
+
+        Args:
+            value (float): The new value
+            **labels: Label values
+        """
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self.callback is not None:
+            try:
+                result = self.callback()
+            except Exception as e:
+                logger.warning(f"Metrics callback for {self.name} failed: {str(e)}")
+                return
+            if isinstance(result, (int, float)):
+                yield "", (), None, result
+                return
+            for labels, value in result:
+                if value is not None:
+                    yield "", self._key(labels), None, value
+            return
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", key, None, value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): The metric name
+            documentation (str): HELP text
+            labelnames (tuple): Label names
+            buckets (tuple): Increasing bucket upper bounds
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (not cumulative) plus sum and count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of a with-block.
+
+        Args:
+            **labels: Label values
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def get_count(self, **labels):
+        """Get the number of observations for a label set."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield "_bucket", key, f'le="{_format_value(float(bound))}"', cumulative
+            yield "_bucket", key, 'le="+Inf"', count
+            yield "_sum", key, None, round(total, 6)
+            yield "_count", key, None, count
+
+
+class MetricsRegistry:
+    """Named collection of metrics; asking for an existing name returns that metric."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        """Get or create a gauge; a given callback replaces any previous one."""
+        gauge = self._get_or_create(Gauge, name, documentation, labelnames)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "omni_http_request_duration_seconds",
+    "Time to produce an HTTP response (until headers for streaming responses).",
+    ("method", "endpoint", "status")
+)
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "omni_llm_request_duration_seconds",
+    "LLM call latency, including rate-limit waits.",
+    ("provider", "model", "mode")
+)
+LLM_FIRST_TOKEN = REGISTRY.histogram(
+    "omni_llm_time_to_first_token_seconds",
+    "Time from starting a streamed LLM call to its first token.",
+    ("provider", "model")
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "omni_llm_requests_total",
+    "LLM calls by outcome (ok, error, cancelled or cached).",
+    ("provider", "model", "status")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "omni_llm_tokens_total",
+    "LLM tokens by type; reported by the provider where available, otherwise estimated.",
+    ("provider", "model", "type")
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "omni_tool_duration_seconds",
+    "Agent tool run time.",
+    ("tool",)
+)
+STORAGE_DURATION = REGISTRY.histogram(
+    "omni_history_storage_duration_seconds",
+    "History storage operation time.",
+    ("backend", "operation")
+)
+STORAGE_BYTES = REGISTRY.counter(
+    "omni_history_storage_bytes_total",
+    "Bytes serialized to or read from history storage.",
+    ("backend", "direction")
+)
+SUMMARY_DURATION = REGISTRY.histogram(
+    "omni_summarization_duration_seconds",
+    "Workflow summarization run time by outcome.",
+    ("status",)
+)
+
+
+def timed_tool(func):
+    """
+    Decorate a tool's _run so its duration is recorded per tool name.
+
+    Args:
+        func (callable): The tool's _run method
+
+    Returns:
+        callable: The wrapped method
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=self.name)
+    return wrapper
@@ -0,0 +1,134 @@
+"""
+Mock LLM module for the Agentic Software-Development tool.
+This module provides a deterministic, offline LLM provider for load tests and benchmarks.
+It plugs into get_llm as provider "mock" and goes through the same rate limiting,
+response cache and metrics path as a real provider; only the network call is replaced.
+"""
+import re
+import json
+import time
+import logging
+from types import SimpleNamespace
+from typing import Dict, Any
+from backend.api.llm_manager import LiteLLMWrapper
+from backend.api.rate_limiter import estimate_tokens
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Marker the conversational agent puts before each tool result in the scratchpad
+TOOL_RESPONSE_PATTERN = re.compile(r"TOOL RESPONSE:")
+
+# Default ReAct script: run one shell command, then answer
+DEFAULT_SCRIPT = [
+    {"action": "Shell", "action_input": "echo benchmark"},
+    {"action": "Final Answer", "action_input": "The command printed: benchmark"}
+]
+
+# Response for prompts that are not agent turns (e.g. workflow summarization)
+DEFAULT_TEXT = "The user asked for a task and the agent completed it using the shell."
+
+
+def _render_step(step):
+    """
+    Render a script step as the markdown JSON blob the agent's output parser expects.
+
+    Args:
+        step (dict|str): {"action", "action_input"}, or raw text returned as-is
+
+    Returns:
+        str: The completion text
+    """
+    if isinstance(step, str):
+        return step
+    return "```json\n" + json.dumps(step, indent=4) + "\n```"
+
+
+class MockLLM(LiteLLMWrapper):
+    """
+    Deterministic stand-in for a LiteLLM provider.
+
+    Options (the "mock" entry of the model config):
+    - "latency": Seconds to wait before the first token (default 0.05)
+    - "tokens_per_second": Completion pacing; 0 returns the whole response at once (default 0)
+    - "script": ReAct steps, each {"action", "action_input"} or a raw completion string.
+      Step N is answered after N tool responses; the last step repeats.
+    - "text": Completion for prompts that are not agent turns
+    """
+
+    mock: Dict[str, Any] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        """Return the type of LLM."""
+        return "mock"
+
+    def _set_api_key(self):
+        """The mock provider needs no API key."""
+
+    def _get_model(self):
+        """Construct the model string."""
+        return f"mock/{self.model_name}"
+
+    def _respond(self, prompt):
+        """
+        Pick the scripted completion for a prompt.
+
+        Args:
+            prompt (str): The prompt
+
+        Returns:
+            str: The completion text
+        """
+        if "action_input" not in prompt:
+            return self.mock.get("text", DEFAULT_TEXT)
+        script = self.mock.get("script") or DEFAULT_SCRIPT
+        step = len(TOOL_RESPONSE_PATTERN.findall(prompt))
+        return _render_step(script[min(step, len(script) - 1)])
+
+    def _completion(self, **kwargs):
+        """
+        Produce a LiteLLM-shaped response without any network access.
+
+        Args:
+            **kwargs: The arguments LiteLLMWrapper passes to litellm.completion
+
+        Returns:
+            The response object, or an iterator of chunks when stream=True
+        """
+        prompt = kwargs.get("prompt", "")
+        text = self._respond(prompt)
+        time.sleep(float(self.mock.get("latency", 0.05)))
+
+        if kwargs.get("stream"):
+            return self._chunks(text)
+
+        tokens_per_second = float(self.mock.get("tokens_per_second", 0))
+        if tokens_per_second > 0:
+            time.sleep(estimate_tokens(text) / tokens_per_second)
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(text)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(text=text)],
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        )
+
+    def _chunks(self, text):
+        """
+        Yield a completion as streamed chunks of roughly one token each.
+
+        Args:
+            text (str): The completion text
+
+        Yields:
+            A chunk with choices[0].text set
+        """
+        tokens_per_second = float(self.mock.get("tokens_per_second", 0))
+        for start in range(0, len(text), 4):
+            if tokens_per_second > 0:
+                time.sleep(1.0 / tokens_per_second)
+            yield SimpleNamespace(choices=[SimpleNamespace(text=text[start:start + 4])])
@@ -0,0 +1,291 @@
+"""
+Rate limiting module for the Agentic Software-Development tool.
+This module provides token-bucket rate limiters keyed per provider/model so LLM calls
+only wait when a provider's request or token budget is actually exhausted.
+"""
+import math
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Budgets accepted in a "rate_limit" configuration entry
+RATE_LIMIT_KEYS = ("requests_per_minute", "tokens_per_minute")
+
+
+def validate_rate_limit(rate_limit):
+    """
+    Check a "rate_limit" configuration entry and coerce its budgets to numbers.
+
+    Args:
+        rate_limit (dict): {"requests_per_minute": number|None, "tokens_per_minute": number|None};
+                           numeric strings such as "60" are accepted, None leaves a budget unset
+
+    Returns:
+        dict: The budgets as numbers (None where unset)
+
+    Raises:
+        ValueError: If the entry is not an object, has an unknown key, or a budget is
+                    not a positive number
+    """
+    if not isinstance(rate_limit, dict):
+        raise ValueError("rate_limit must be an object")
+    unknown = sorted(set(rate_limit) - set(RATE_LIMIT_KEYS))
+    if unknown:
+        raise ValueError(f"Unknown rate_limit key(s): {', '.join(unknown)}")
+    budgets = {}
+    for key, value in rate_limit.items():
+        if value is None:
+            budgets[key] = None
+            continue
+        try:
+            if isinstance(value, bool):
+                raise ValueError()
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"rate_limit.{key} must be a number, got {value!r}")
+        if not math.isfinite(number) or number <= 0:
+            raise ValueError(f"rate_limit.{key} must be greater than 0, got {value!r}")
+        budgets[key] = int(number) if number.is_integer() else number
+    return budgets
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Callers reserve capacity up front; if the bucket does not hold enough tokens the
+    reservation still succeeds but the caller is told how long to wait before using it.
+    This keeps concurrent callers in FIFO order without holding the lock while sleeping.
+    """
+
+    def __init__(self, capacity, refill_per_second):
+        """
+        Initialize the bucket.
+
+        Args:
+            capacity (float): Maximum number of tokens the bucket can hold
+            refill_per_second (float): Tokens added back per second
+        """
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens accrued since the last update."""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def reserve(self, amount):
+        """
+        Reserve tokens from the bucket.
+
+        Args:
+            amount (float): Number of tokens to take (clamped to the bucket capacity)
+
+        Returns:
+            float: Seconds the caller must wait before the reservation is honoured
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_per_second
+
+    def refund(self, amount):
+        """
+        Give tokens back to the bucket (or take more if amount is negative).
+
+        Args:
+            amount (float): Number of tokens to return
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def available(self):
+        """Return the number of tokens currently available."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class RateLimiter:
+    """
+    Rate limiter for a single provider/model combining a requests-per-minute bucket
+    and a tokens-per-minute bucket.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute (int, optional): Request budget per minute. None or 0 disables it.
+            tokens_per_minute (int, optional): Token budget per minute. None or 0 disables it.
+
+        Raises:
+            ValueError: If a budget is negative or not a number
+        """
+        budgets = validate_rate_limit({
+            "requests_per_minute": requests_per_minute or None,
+            "tokens_per_minute": tokens_per_minute or None
+        })
+        self.requests_per_minute = requests_per_minute = budgets["requests_per_minute"]
+        self.tokens_per_minute = tokens_per_minute = budgets["tokens_per_minute"]
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute / 60.0) if self.requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if self.tokens_per_minute else None
+
+        self._stats_lock = threading.Lock()
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_tokens = 0
+
+    def acquire(self, estimated_tokens=0):
+        """
+        Block until the limiter allows another call.
+
+        Args:
+            estimated_tokens (int): Estimated prompt + completion tokens for the call
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = 0.0
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket and estimated_tokens:
+            wait = max(wait, self.token_bucket.reserve(estimated_tokens))
+
+        if wait > 0:
+            time.sleep(wait)
+
+        with self._stats_lock:
+            self.total_requests += 1
+            if wait > 0:
+                self.throttled_requests += 1
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        return wait
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        """
+        Reconcile the token budget once the real usage of a call is known.
+
+        Args:
+            estimated_tokens (int): Tokens reserved by acquire()
+            actual_tokens (int, optional): Tokens reported by the provider
+        """
+        used = actual_tokens if actual_tokens is not None else estimated_tokens
+        with self._stats_lock:
+            self.total_tokens += used
+        if self.token_bucket and actual_tokens is not None:
+            self.token_bucket.refund(estimated_tokens - actual_tokens)
+
+    def get_stats(self):
+        """
+        Get the limiter state.
+
+        Returns:
+            dict: Budgets, remaining capacity and accumulated wait time
+        """
+        with self._stats_lock:
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "available_requests": round(self.request_bucket.available(), 2) if self.request_bucket else None,
+                "available_tokens": round(self.token_bucket.available(), 2) if self.token_bucket else None,
+                "total_requests": self.total_requests,
+                "throttled_requests": self.throttled_requests,
+                "total_tokens": self.total_tokens,
+                "total_wait_seconds": round(self.total_wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3)
+            }
+
+
+class RateLimiterRegistry:
+    """
+    Process-wide registry of rate limiters keyed by (provider, model_name).
+    Shared by every thread so all gunicorn worker threads draw from the same budget.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider, model_name, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Get the limiter for a provider/model, creating or reconfiguring it if needed.
+
+        Args:
+            provider (str): The LLM provider
+            model_name (str): The model name
+            requests_per_minute (int, optional): Request budget per minute
+            tokens_per_minute (int, optional): Token budget per minute
+
+        Returns:
+            RateLimiter: The shared limiter
+        """
+        key = (provider, model_name)
+        budgets = validate_rate_limit({
+            "requests_per_minute": requests_per_minute or None,
+            "tokens_per_minute": tokens_per_minute or None
+        })
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if (limiter is None
+                    or limiter.requests_per_minute != budgets["requests_per_minute"]
+                    or limiter.tokens_per_minute != budgets["tokens_per_minute"]):
+                if limiter is not None:
+                    logger.info(f"Reconfiguring rate limiter for {provider}/{model_name}")
+                limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+                self._limiters[key] = limiter
+            return limiter
+
+    def get_stats(self):
+        """
+        Get the state of every limiter.
+
+        Returns:
+            dict: Mapping of "provider/model" to limiter stats
+        """
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {f"{provider}/{model}": limiter.get_stats() for (provider, model), limiter in limiters.items()}
+
+
+def estimate_tokens(text, model_kwargs: Optional[Dict[str, Any]] = None):
+    """
+    Roughly estimate the tokens a completion will consume.
+
+    Args:
+        text (str): The prompt text
+        model_kwargs (dict, optional): Model parameters, used for the completion budget
+
+    Returns:
+        int: Estimated prompt + completion tokens
+    """
+    prompt_tokens = len(text or "") // 4 + 1
+    completion_tokens = 0
+    for key in ("max_tokens", "max_tokens_to_sample", "max_output_tokens", "max_new_tokens"):
+        if model_kwargs and model_kwargs.get(key):
+            completion_tokens = int(model_kwargs[key])
+            break
+    return prompt_tokens + completion_tokens
+
+
+# Shared registry used by every LiteLLMWrapper in the process
+rate_limiters = RateLimiterRegistry()
@@ -0,0 +1,271 @@
+"""
+Response cache module for the Agentic Software-Development tool.
+This module caches LLM completions in an in-memory LRU tier backed by an on-disk
+SQLite tier, so repeated deterministic prompts skip the provider round trip.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(provider, model_name, prompt, stop=None, model_kwargs=None):
+    """
+    Build the cache key for a completion.
+
+    Entries are exact matches on the whole prompt and parameters, since a completion
+    depends on all of its prompt. Keys are prefixed with "<provider>/<model>:" only so
+    every entry for a model can be invalidated together.
+
+    Args:
+        provider (str): The LLM provider
+        model_name (str): The model name
+        prompt (str): The prompt text
+        stop (list, optional): Stop sequences
+        model_kwargs (dict, optional): Model parameters
+
+    Returns:
+        str: The cache key
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    params = json.dumps({"stop": stop, "model_kwargs": model_kwargs or {}}, sort_keys=True, default=str)
+    digest = hashlib.sha256(f"{prompt_hash}:{params}".encode("utf-8")).hexdigest()
+    return f"{provider}/{model_name}:{digest}"
+
+
+class ResponseCache:
+    """
+    Two-tier completion cache.
+
+    The memory tier is an LRU bounded by entry count; the disk tier is a SQLite table
+    bounded by total bytes, evicting the least recently used rows. Both tiers honour
+    per-entry TTLs.
+    """
+
+    def __init__(self, disk_path=None, max_memory_entries=256, max_disk_bytes=100 * 1024 * 1024, default_ttl=24 * 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            disk_path (str, optional): SQLite file for the disk tier. None keeps the cache in memory only.
+            max_memory_entries (int): Maximum entries in the memory tier
+            max_disk_bytes (int): Maximum total response bytes in the disk tier
+            default_ttl (float): Seconds an entry stays valid unless a TTL is given
+        """
+        self.disk_path = disk_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.default_ttl = default_ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stores = 0
+        self.evictions = 0
+
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT, size INTEGER, expires_at REAL, last_access REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+
+    def _conn(self):
+        """Get this thread's disk tier connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, value, expires_at):
+        """Put an entry in the memory tier. Caller holds the lock."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            str: The cached response, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+        if self.disk_path:
+            try:
+                conn = self._conn()
+                row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row and row[1] > now:
+                    with conn:
+                        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                    with self._lock:
+                        self._remember(key, row[0], row[1])
+                        self.disk_hits += 1
+                    return row[0]
+                if row:
+                    with conn:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache disk read failed: {str(e)}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a response in both tiers.
+
+        Args:
+            key (str): The cache key
+            value (str): The response text
+            ttl (float, optional): Seconds until the entry expires; default_ttl if None.
+                A TTL of 0 or less stores nothing.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.stores += 1
+
+        if self.disk_path:
+            try:
+                conn = self._conn()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                        (key, value, len(value.encode("utf-8")), expires_at, now)
+                    )
+                self._evict_disk(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache disk write failed: {str(e)}")
+
+    def _evict_disk(self, conn):
+        """Drop expired rows, then least recently used rows while over the byte budget."""
+        with conn:
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_disk_bytes:
+                return
+            evicted = 0
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+                if total <= self.max_disk_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        with self._lock:
+            self.evictions += evicted
+
+    def record_bypass(self):
+        """Count a call that skipped the cache."""
+        with self._lock:
+            self.bypassed += 1
+
+    def invalidate(self, prefix=""):
+        """
+        Remove entries whose key starts with a prefix (all entries by default).
+
+        Args:
+            prefix (str): Key prefix, e.g. "openai/gpt-4:"
+        """
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(prefix)]:
+                del self._memory[key]
+        if self.disk_path:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def get_stats(self):
+        """
+        Get cache occupancy and hit/miss counters.
+
+        Returns:
+            dict: Cache statistics
+        """
+        disk_entries = disk_bytes = None
+        if self.disk_path:
+            try:
+                disk_entries, disk_bytes = self._conn().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.max_memory_entries,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes if self.disk_path else None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Get the process-wide response cache, creating it on first use.
+
+    The disk tier lives at LLM_CACHE_PATH (default llm_cache.db in AGENT_HISTORY_PATH);
+    set LLM_CACHE_PATH to an empty string to keep the cache in memory only.
+
+    Returns:
+        ResponseCache: The shared cache
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            history_path = os.environ.get("AGENT_HISTORY_PATH", "/host_home/.agent_history")
+            disk_path = os.environ.get("LLM_CACHE_PATH", os.path.join(history_path, "llm_cache.db"))
+            _response_cache = ResponseCache(
+                disk_path=disk_path or None,
+                max_memory_entries=int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "256")),
+                max_disk_bytes=int(os.environ.get("LLM_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+            )
+        return _response_cache
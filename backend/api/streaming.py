@@ -0,0 +1,102 @@
+"""
+Streaming module for the Agentic Software-Development tool.
+This module turns LangChain agent callbacks into Server-Sent Events so clients can
+render tokens and Thought/Action/Observation steps while the agent is still running.
+"""
+import json
+import queue
+import logging
+from typing import Any
+from langchain.callbacks.base import BaseCallbackHandler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Marker put on the queue once the stream is complete
+_STREAM_END = object()
+
+
+def format_sse(event, data, event_id=None):
+    """
+    Format a Server-Sent Events frame.
+
+    Args:
+        event (str): The event name
+        data (dict): JSON-serializable event payload
+        event_id (int, optional): ID a reconnecting client sends back as Last-Event-ID
+
+    Returns:
+        str: The SSE frame
+    """
+    frame = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n{frame}"
+    return frame
+
+
+class SSEEventHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler that queues agent events as SSE frames.
+
+    The agent runs in a worker thread and pushes events through the callbacks; the
+    request thread drains them with events() and writes them to the response.
+    """
+
+    def __init__(self, heartbeat_interval=15.0):
+        """
+        Initialize the handler.
+
+        Args:
+            heartbeat_interval (float): Seconds of silence before a keep-alive comment is sent
+        """
+        self.queue = queue.Queue()
+        self.heartbeat_interval = heartbeat_interval
+
+    def emit(self, event, data):
+        """Queue an event for the client."""
+        self.queue.put(format_sse(event, data))
+
+    def close(self):
+        """Signal that no more events will be produced."""
+        self.queue.put(_STREAM_END)
+
+    def events(self):
+        """
+        Yield queued SSE frames until the stream is closed.
+
+        Yields:
+            str: SSE frames, plus keep-alive comments while the agent is busy
+        """
+        while True:
+            try:
+                item = self.queue.get(timeout=self.heartbeat_interval)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if item is _STREAM_END:
+                return
+            yield item
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Forward each generated token."""
+        self.emit("token", {"token": token})
+
+    def on_agent_action(self, action, **kwargs: Any) -> Any:
+        """Forward the agent's thought and chosen action."""
+        self.emit("action", {
+            "thought": action.log,
+            "tool": action.tool,
+            "tool_input": action.tool_input
+        })
+
+    def on_tool_end(self, output: str, **kwargs: Any) -> None:
+        """Forward the observation returned by a tool."""
+        self.emit("observation", {"observation": output})
+
+    def on_tool_error(self, error, **kwargs: Any) -> None:
+        """Forward tool failures as observations."""
+        self.emit("observation", {"observation": f"Tool error: {str(error)}"})
+
+    def on_agent_finish(self, finish, **kwargs: Any) -> None:
+        """Forward the agent's final answer text."""
+        self.emit("agent_finish", {"output": finish.return_values.get("output", ""), "log": finish.log})
@@ -0,0 +1,416 @@
+"""
+Tracing module for the Agentic Software-Development tool.
+This module records a span tree for each agent run (LLM calls, output parsing, tool
+invocations, rate-limit waits and history writes) and converts it to Chrome
+trace-event JSON for offline profiling in chrome://tracing or Perfetto.
+"""
+import os
+import time
+import uuid
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any
+from langchain.callbacks.base import BaseCallbackHandler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.environ.get("AGENT_TRACING", "1").lower() not in ("0", "false", "no")
+
+# Longest string kept in span arguments
+MAX_ARG_CHARS = 500
+
+_local = threading.local()
+
+
+def _clip(value):
+    """Shorten long strings so traces stay small."""
+    if isinstance(value, str) and len(value) > MAX_ARG_CHARS:
+        return value[:MAX_ARG_CHARS] + f"... [{len(value) - MAX_ARG_CHARS} more chars]"
+    return value
+
+
+class Trace:
+    """
+    The spans of one agent run.
+
+    Times are seconds relative to the start of the trace. Spans opened without an
+    explicit parent nest under the innermost span still open on the same thread.
+    """
+
+    def __init__(self, name, metadata=None):
+        """
+        Start a trace.
+
+        Args:
+            name (str): The kind of run (e.g. "chat")
+            metadata (dict, optional): Session, workflow and step IDs and the like
+        """
+        self.id = str(uuid.uuid4())
+        self.name = name
+        self.metadata = dict(metadata or {})
+        self.started_at = time.time()
+        self.finished_at = None
+        self.error = None
+        self.spans = {}
+        self._order = []
+        self._origin = time.perf_counter()
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def now(self):
+        """Seconds since the trace started."""
+        return time.perf_counter() - self._origin
+
+    def start_span(self, name, category, parent_id=None, args=None):
+        """
+        Open a span.
+
+        Args:
+            name (str): The span name
+            category (str): The span category (llm, tool, memory, ...)
+            parent_id (str, optional): The parent span; defaults to the innermost open span on this thread
+            args (dict, optional): Extra details shown with the span
+
+        Returns:
+            str: The span ID
+        """
+        thread_id = threading.get_ident()
+        with self._lock:
+            stack = self._open.setdefault(thread_id, [])
+            span_id = uuid.uuid4().hex[:12]
+            self.spans[span_id] = {
+                "id": span_id,
+                "parent_id": parent_id if parent_id is not None else (stack[-1] if stack else None),
+                "name": name,
+                "cat": category,
+                "start": self.now(),
+                "end": None,
+                "thread": threading.current_thread().name,
+                "args": {key: _clip(value) for key, value in (args or {}).items()}
+            }
+            self._order.append(span_id)
+            stack.append(span_id)
+        return span_id
+
+    def end_span(self, span_id, args=None):
+        """
+        Close a span.
+
+        Args:
+            span_id (str): The span ID
+            args (dict, optional): Details to add (e.g. token counts)
+        """
+        with self._lock:
+            span = self.spans.get(span_id)
+            if span is None or span["end"] is not None:
+                return
+            span["end"] = self.now()
+            span["args"].update({key: _clip(value) for key, value in (args or {}).items()})
+            for stack in self._open.values():
+                if span_id in stack:
+                    stack.remove(span_id)
+                    break
+
+    def add_span(self, name, category, start, end, parent_id=None, args=None):
+        """
+        Record an already finished span.
+
+        Args:
+            name (str): The span name
+            category (str): The span category
+            start (float): Start, in seconds since the trace started
+            end (float): End, in seconds since the trace started
+            parent_id (str, optional): The parent span
+            args (dict, optional): Extra details
+        """
+        span_id = self.start_span(name, category, parent_id, args)
+        with self._lock:
+            self.spans[span_id]["start"] = start
+            self.spans[span_id]["end"] = end
+            for stack in self._open.values():
+                if span_id in stack:
+                    stack.remove(span_id)
+                    break
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """
+        Record the duration of a with-block as a span.
+
+        Args:
+            name (str): The span name
+            category (str): The span category
+            **args: Extra details
+        """
+        span_id = self.start_span(name, category, args=args)
+        try:
+            yield span_id
+        except Exception as e:
+            self.end_span(span_id, {"error": str(e)})
+            raise
+        self.end_span(span_id)
+
+    def finish(self, error=None):
+        """
+        End the trace, closing any spans left open.
+
+        Args:
+            error (str, optional): The error the run failed with
+        """
+        end = self.now()
+        with self._lock:
+            for span in self.spans.values():
+                if span["end"] is None:
+                    span["end"] = end
+                    span["args"]["unfinished"] = True
+            self._open.clear()
+            self.finished_at = time.time()
+            self.error = error
+
+    @property
+    def duration(self):
+        """Length of the trace in seconds."""
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return end - self.started_at
+
+    def to_dict(self):
+        """
+        Serialize the trace for storage.
+
+        Returns:
+            dict: Trace metadata and its spans in start order
+        """
+        with self._lock:
+            spans = [dict(self.spans[span_id]) for span_id in self._order]
+        return {
+            "id": self.id,
+            "name": self.name,
+            "metadata": self.metadata,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 6),
+            "error": self.error,
+            "spans": spans
+        }
+
+
+def summarize_trace(trace):
+    """
+    Get the per-category time breakdown of a stored trace.
+
+    Only top-level time of each category is counted, so nested spans of the same
+    category (e.g. a chain inside a chain) are not double counted.
+
+    Args:
+        trace (dict): A stored trace
+
+    Returns:
+        dict: id, name, started_at, duration, span count and seconds per category
+    """
+    spans = {span["id"]: span for span in trace.get("spans", [])}
+    by_category = {}
+    for span in spans.values():
+        parent = spans.get(span["parent_id"])
+        if parent is not None and parent["cat"] == span["cat"]:
+            continue
+        by_category[span["cat"]] = by_category.get(span["cat"], 0.0) + (span["end"] or 0) - span["start"]
+    return {
+        "id": trace["id"],
+        "name": trace.get("name"),
+        "started_at": trace.get("started_at"),
+        "duration": trace.get("duration"),
+        "error": trace.get("error"),
+        "span_count": len(spans),
+        "seconds_by_category": {category: round(seconds, 6) for category, seconds in sorted(by_category.items())}
+    }
+
+
+def to_chrome_trace(trace):
+    """
+    Convert a stored trace to Chrome trace-event JSON.
+
+    Args:
+        trace (dict): A stored trace
+
+    Returns:
+        dict: {"traceEvents": [...], "displayTimeUnit": "ms", "otherData": {...}}
+    """
+    threads = {}
+    events = [{"name": "process_name", "ph": "M", "pid": 1, "tid": 0,
+               "args": {"name": f"{trace.get('name', 'run')} {trace['id']}"}}]
+    base_us = trace.get("started_at", 0) * 1e6
+    for span in trace.get("spans", []):
+        thread = span.get("thread", "main")
+        if thread not in threads:
+            threads[thread] = len(threads) + 1
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": threads[thread],
+                           "args": {"name": thread}})
+        end = span["end"] if span["end"] is not None else span["start"]
+        events.append({
+            "name": span["name"],
+            "cat": span["cat"],
+            "ph": "X",
+            "ts": round(base_us + span["start"] * 1e6, 3),
+            "dur": round((end - span["start"]) * 1e6, 3),
+            "pid": 1,
+            "tid": threads[thread],
+            "args": {**span.get("args", {}), "span_id": span["id"], "parent_id": span["parent_id"]}
+        })
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {**trace.get("metadata", {}), "trace_id": trace["id"], "error": trace.get("error")}
+    }
+
+
+def current_trace():
+    """
+    Get the trace active on this thread.
+
+    Returns:
+        Trace: The active trace, or None
+    """
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def activate(trace):
+    """
+    Make a trace the active one on this thread for the duration of a with-block.
+
+    Args:
+        trace (Trace): The trace, or None to leave tracing off
+    """
+    previous = getattr(_local, "trace", None)
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+@contextmanager
+def trace_span(name, category, **args):
+    """
+    Record a span on the active trace, if there is one.
+
+    Args:
+        name (str): The span name
+        category (str): The span category
+        **args: Extra details
+    """
+    trace = current_trace()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, category, **args) as span_id:
+        yield span_id
+
+
+def record_span(name, category, duration, **args):
+    """
+    Record a span that just finished on the active trace, if there is one.
+
+    Args:
+        name (str): The span name
+        category (str): The span category
+        duration (float): How long it took, in seconds, ending now
+        **args: Extra details
+    """
+    trace = current_trace()
+    if trace is not None:
+        end = trace.now()
+        trace.add_span(name, category, max(end - duration, 0.0), end, args=args)
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler that turns chain, LLM and tool callbacks into spans.
+
+    The time between the end of an LLM call and the agent's resulting action (or
+    final answer) is recorded as a "parse" span.
+    """
+
+    def __init__(self, trace):
+        self.trace = trace
+        self._spans = {}
+        self._tokens = {}
+        self._llm_ended = {}
+
+    def _start(self, run_id, parent_run_id, name, category, args=None):
+        parent = self._spans.get(parent_run_id)
+        self._spans[run_id] = self.trace.start_span(name, category, parent_id=parent, args=args)
+
+    def _end(self, run_id, args=None):
+        span_id = self._spans.pop(run_id, None)
+        if span_id is not None:
+            self.trace.end_span(span_id, args)
+
+    def on_chain_start(self, serialized, inputs, *, run_id=None, parent_run_id=None, **kwargs: Any) -> None:
+        """Open a span for a chain (the agent executor or its LLM chain)."""
+        name = (serialized or {}).get("id", ["chain"])[-1]
+        self._start(run_id, parent_run_id, name, "chain")
+
+    def on_chain_end(self, outputs, *, run_id=None, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id=None, **kwargs: Any) -> None:
+        self._end(run_id, {"error": str(error)})
+
+    def on_llm_start(self, serialized, prompts, *, run_id=None, parent_run_id=None, **kwargs: Any) -> None:
+        """Open a span for an LLM call with the estimated prompt size."""
+        prompt_chars = sum(len(prompt) for prompt in prompts)
+        self._tokens[run_id] = 0
+        self._start(run_id, parent_run_id, "llm", "llm", {
+            "prompt_chars": prompt_chars,
+            "prompt_tokens_estimate": prompt_chars // 4 + 1
+        })
+
+    def on_llm_new_token(self, token: str, *, run_id=None, **kwargs: Any) -> None:
+        self._tokens[run_id] = self._tokens.get(run_id, 0) + 1
+
+    def on_llm_end(self, response, *, run_id=None, parent_run_id=None, **kwargs: Any) -> None:
+        """Close the LLM span with completion size and any provider-reported usage."""
+        text = "".join(generation.text for generations in response.generations for generation in generations)
+        args = {
+            "completion_chars": len(text),
+            "completion_tokens_estimate": len(text) // 4,
+            "streamed_chunks": self._tokens.pop(run_id, 0)
+        }
+        usage = (response.llm_output or {}).get("token_usage") if response.llm_output else None
+        if usage:
+            args["token_usage"] = usage
+        self._end(run_id, args)
+        self._llm_ended[parent_run_id] = self.trace.now()
+
+    def on_llm_error(self, error, *, run_id=None, **kwargs: Any) -> None:
+        self._tokens.pop(run_id, None)
+        self._end(run_id, {"error": str(error)})
+
+    def _record_parse(self, run_id, outcome):
+        """Record the output parsing that happened since the last LLM call of this chain."""
+        # Actions are reported by the executor, whose LLM chain is the LLM call's parent
+        for chain_run_id, ended in list(self._llm_ended.items()):
+            if self._spans.get(chain_run_id) is None:
+                self._llm_ended.pop(chain_run_id)
+                self.trace.add_span("parse", "parse", ended, self.trace.now(),
+                                    parent_id=self._spans.get(run_id), args={"outcome": outcome})
+                return
+
+    def on_agent_action(self, action, *, run_id=None, **kwargs: Any) -> Any:
+        self._record_parse(run_id, f"action:{action.tool}")
+
+    def on_agent_finish(self, finish, *, run_id=None, **kwargs: Any) -> None:
+        self._record_parse(run_id, "finish")
+
+    def on_tool_start(self, serialized, input_str: str, *, run_id=None, parent_run_id=None, **kwargs: Any) -> None:
+        """Open a span for a tool invocation."""
+        name = (serialized or {}).get("name", "tool")
+        self._start(run_id, parent_run_id, f"tool:{name}", "tool", {"input": input_str})
+
+    def on_tool_end(self, output: str, *, run_id=None, **kwargs: Any) -> None:
+        self._end(run_id, {"output_chars": len(str(output))})
+
+    def on_tool_error(self, error, *, run_id=None, **kwargs: Any) -> None:
+        self._end(run_id, {"error": str(error)})
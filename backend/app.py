@@ -6,13 +6,30 @@ import os
 import json
 import logging
 import sys
-from flask import Flask, request, jsonify
+import signal
+import time
+import threading
+from flask import Flask, request, jsonify, Response, g
 from flask_cors import CORS
-from backend.api.agent import create_agent
+from backend.api.agent_pool import AgentPool
 from backend.tools.code_editor import CodeEditorTool
+from backend.tools.code_index import CodeIndex
+from backend.tools.code_search import CodeSearchTool
+from backend.tools.symbol_index import SymbolIndex
+from backend.tools.code_symbols import CodeSymbolsTool
 from backend.tools.shell import ShellTool
+from backend.tools.shell_session import ShellSessionManager
 from backend.memory_manager import EnhancedMemoryManager
+from backend.storage.factory import create_storage
 from backend.api.llm_manager import DEFAULT_CONFIGS
+from backend.api.rate_limiter import rate_limiters, validate_rate_limit
+from backend.api.response_cache import get_response_cache
+from backend.api.streaming import SSEEventHandler, format_sse
+from backend.api.http_cache import not_modified, cacheable, compress_response, file_version
+from backend.api.jobs import JobManager, parse_provider_limits
+from backend.api.metrics import REGISTRY, HTTP_REQUEST_DURATION
+from backend.api.tracing import TRACING_ENABLED, Trace, TraceCallbackHandler, activate, trace_span, \
+    summarize_trace, to_chrome_trace
 
 # Configure logging
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
@@ -29,9 +46,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Conversation history, the code index and the response cache live here
+HISTORY_PATH = os.environ.get("AGENT_HISTORY_PATH", "/host_home/.agent_history")
+
 # Create required directories
 os.makedirs('/sandbox/code', exist_ok=True)
-os.makedirs('/host_home/.agent_history', exist_ok=True)
+os.makedirs(HISTORY_PATH, exist_ok=True)
 
 # Ensure environment variables are properly set
 if 'HUGGINGFACEHUB_API_TOKEN' in os.environ and not os.environ.get('HUGGINGFACE_API_KEY'):
@@ -51,85 +71,144 @@ current_llm_config = DEFAULT_CONFIGS["huggingface"].copy()
 logger.info(f"Using default LLM config: {current_llm_config['provider']}/{current_llm_config['model_name']}")
 
 try:
+    # Initialize history storage (shared by every memory manager instance)
+    history_storage = create_storage(os.environ.get("AGENT_HISTORY_STORAGE", "json"), HISTORY_PATH)
+    logger.info(f"History storage initialized: {type(history_storage).__name__}")
+    
     # Initialize enhanced memory manager
     memory_manager = EnhancedMemoryManager(
-        history_path="/host_home/.agent_history",
+        history_path=HISTORY_PATH,
         max_buffer_workflows=5,
-        llm_config=current_llm_config
+        llm_config=current_llm_config,
+        storage=history_storage
     )
     logger.info("Memory manager initialized successfully")
 
     # Initialize tools
-    code_editor_tool = CodeEditorTool()
-    shell_tool = ShellTool()
+    # Trigram index over /sandbox/code; built and kept refreshed by a background thread
+    code_index = CodeIndex(
+        root="/sandbox/code",
+        db_path=os.environ.get("CODE_INDEX_PATH", os.path.join(HISTORY_PATH, "code_index.db"))
+    )
+    code_index.start()
+    code_editor_tool = CodeEditorTool(code_index=code_index)
+    code_search_tool = CodeSearchTool(index=code_index)
+    # Definitions/references parsed on demand and cached by mtime
+    symbol_index = SymbolIndex(root="/sandbox/code", code_index=code_index)
+    code_symbols_tool = CodeSymbolsTool(index=symbol_index)
+    # Persistent shells keyed by workflow, shared by the agent and the Terminal
+    shell_sessions = ShellSessionManager(
+        cwd="/sandbox/code",
+        idle_ttl=float(os.environ.get("SHELL_SESSION_TTL", "1800")),
+        max_sessions=int(os.environ.get("SHELL_MAX_SESSIONS", "32"))
+    )
+    shell_tool = ShellTool(session_manager=shell_sessions)
     logger.info("Tools initialized successfully")
 
-    # Initialize agent with tools and memory
-    # We'll update the memory when a session/workflow is selected
-    agent = create_agent(
-        tools=[code_editor_tool, shell_tool],
-        memory=memory_manager.get_memory_for_llm(),
-        llm_config=current_llm_config
+    # Initialize the agent pool - one agent per workflow, bound to that workflow's memory
+    agent_pool = AgentPool(
+        tools=[code_editor_tool, code_search_tool, code_symbols_tool, shell_tool],
+        memory_manager=memory_manager,
+        llm_config=current_llm_config,
+        max_agents=int(os.environ.get("AGENT_POOL_SIZE", "16"))
     )
-    logger.info("Agent initialized successfully")
+    logger.info("Agent pool initialized successfully")
+
+    # Background job workers for long-running agent tasks
+    job_manager = JobManager(
+        run_fn=lambda job, handler: _run_chat_job(job, handler),
+        num_workers=int(os.environ.get("JOB_WORKERS", "4")),
+        provider_limits=parse_provider_limits(os.environ.get("JOB_PROVIDER_CONCURRENCY", "")),
+        default_provider_limit=int(os.environ.get("JOB_DEFAULT_PROVIDER_CONCURRENCY", "2"))
+    )
+    logger.info("Job manager initialized successfully")
 except Exception as e:
     logger.error(f"Error during initialization: {str(e)}", exc_info=True)
     raise
 
+# Queue depths and pool sizes are read when /api/metrics is scraped
+REGISTRY.gauge(
+    "omni_jobs", "Agent jobs by provider and state.", ("provider", "state"),
+    callback=lambda: [
+        ({"provider": provider, "state": state}, stats[state])
+        for provider, stats in job_manager.get_stats()["providers"].items()
+        for state in ("queued", "running")
+    ]
+)
+REGISTRY.gauge(
+    "omni_summary_queue", "Workflow summarization jobs by state.", ("state",),
+    callback=lambda: [
+        ({"state": state}, memory_manager.summary_queue.get_stats()[key])
+        for state, key in (("queued", "depth"), ("running", "in_flight"))
+    ]
+)
+REGISTRY.gauge("omni_shell_sessions", "Open persistent shell sessions.",
+               callback=lambda: shell_sessions.get_stats()["open"])
+REGISTRY.gauge("omni_agent_pool_agents", "Agents held in the agent pool.",
+               callback=lambda: agent_pool.get_stats()["size"])
+REGISTRY.gauge("omni_code_index_files", "Files in the code search index.",
+               callback=lambda: len(code_index.files))
+REGISTRY.gauge(
+    "omni_memory_cache_entries", "Entries in the memory manager's session and workflow memory caches.", ("cache",),
+    callback=lambda: [({"cache": cache.name}, len(cache)) for cache in (memory_manager.sessions, memory_manager.workflow_memories)]
+)
+REGISTRY.gauge(
+    "omni_memory_cache_bytes", "Approximate size of the memory manager's caches.", ("cache",),
+    callback=lambda: [
+        ({"cache": cache.name}, cache.get_stats()["bytes"])
+        for cache in (memory_manager.sessions, memory_manager.workflow_memories)
+    ]
+)
+
+@app.before_request
+def _start_request_timer():
+    """Remember when the request started for the latency histogram."""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    """Record the request's latency by method, route and status."""
+    started = getattr(g, "request_started", None)
+    if started is not None:
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            status=response.status_code
+        )
+    return response
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """
     API endpoint for chat interactions with the agent.
-    Expects: {"message": str, "session_id": str, "step_id": int}
-    Returns: {"response": str, "workflow_id": str}
+    Expects: {"message": str, "session_id": str, "step_id": int, "stream": bool}
+    Returns: {"response": str, "workflow_id": str, "trace_id": str, "context": {token counts of the history sent to the LLM}}
+    
+    If "stream" is true (or the client accepts text/event-stream) the response is an
+    SSE stream of "workflow", "token", "action", "observation", "agent_finish" and
+    finally "final" (or "error") events.
     
     Note: Each new task (first message in a conversation) creates a new workflow.
     Subsequent messages continue in the same workflow.
     """
     try:
-        from uuid import uuid4
-        
         data = request.json
-        message = data.get('message', '')
-        session_id = data.get('session_id', 'default_session')
-        step_id = data.get('step_id', 0)
-        
-        # Check if this is a continuation of an existing workflow or a new task
-        workflow_id = data.get('workflow_id')
-        is_new_task = step_id == 0 or not workflow_id
-        
-        if is_new_task:
-            # Create a new workflow for this task
-            workflow_id = str(uuid4())
-            workflow_name = f"Task: {message[:50]}..." if len(message) > 50 else f"Task: {message}"
-            logger.info(f"Creating new workflow for task: {workflow_id} - {workflow_name}")
-        else:
-            workflow_name = data.get('workflow_name')
-            logger.info(f"Continuing workflow: {workflow_id}, step={step_id}")
-        
-        logger.info(f"Chat request: session={session_id}, workflow={workflow_id}, step={step_id}")
-        
-        # Start or continue session and workflow
-        memory_manager.start_session(session_id)
-        memory_manager.start_workflow(workflow_id, workflow_name, task=message if is_new_task else None)
+        message, message_with_metadata, session_id, workflow_id, step_id = _start_chat_workflow(data)
         
-        # Update agent with current workflow memory
-        agent.memory = memory_manager.get_memory_for_llm(workflow_id)
+        if data.get('stream') or 'text/event-stream' in request.headers.get('Accept', ''):
+            return _stream_chat(message, message_with_metadata, session_id, workflow_id, step_id)
         
-        # Add metadata to the message
-        message_with_metadata = f"{message}\n[Metadata: session_id={session_id}, workflow_id={workflow_id}, step_id={step_id}]"
-        
-        # Get response from agent
+        # Get response from this workflow's agent
         logger.info(f"Running agent with message: {message[:50]}...")
-        response = agent.run(message_with_metadata)
-        
-        # Save interaction to memory manager
-        memory_manager.add_interaction(message, response, step_id)
+        response, context_stats, trace_id = _run_agent(message, message_with_metadata, session_id, workflow_id, step_id)
         
         logger.info(f"Chat response generated: {len(response)} chars")
         return jsonify({
             "response": response,
-            "workflow_id": workflow_id
+            "workflow_id": workflow_id,
+            "trace_id": trace_id,
+            "context": context_stats
         })
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}", exc_info=True)
@@ -139,31 +218,345 @@ def chat():
             "workflow_id": data.get('workflow_id', 'error_workflow')
         }), 500
 
+def _start_chat_workflow(data):
+    """
+    Start or continue the session and workflow for a chat message.
+    
+    Each new task (first message in a conversation) creates a new workflow.
+    
+    Args:
+        data (dict): The chat request body
+        
+    Returns:
+        tuple: (message, message_with_metadata, session_id, workflow_id, step_id)
+    """
+    from uuid import uuid4
+    
+    message = data.get('message', '')
+    session_id = data.get('session_id', 'default_session')
+    step_id = data.get('step_id', 0)
+    
+    # Check if this is a continuation of an existing workflow or a new task
+    workflow_id = data.get('workflow_id')
+    is_new_task = step_id == 0 or not workflow_id
+    
+    if is_new_task:
+        # Create a new workflow for this task
+        workflow_id = str(uuid4())
+        workflow_name = f"Task: {message[:50]}..." if len(message) > 50 else f"Task: {message}"
+        logger.info(f"Creating new workflow for task: {workflow_id} - {workflow_name}")
+    else:
+        workflow_name = data.get('workflow_name')
+        logger.info(f"Continuing workflow: {workflow_id}, step={step_id}")
+    
+    logger.info(f"Chat request: session={session_id}, workflow={workflow_id}, step={step_id}")
+    
+    # Start or continue session and workflow
+    memory_manager.start_session(session_id)
+    memory_manager.start_workflow(workflow_id, workflow_name, task=message if is_new_task else None, session_id=session_id)
+    
+    # Add metadata to the message
+    message_with_metadata = f"{message}\n[Metadata: session_id={session_id}, workflow_id={workflow_id}, step_id={step_id}]"
+    return message, message_with_metadata, session_id, workflow_id, step_id
+
+def _run_agent(message, message_with_metadata, session_id, workflow_id, step_id, callbacks=None, should_persist=None):
+    """
+    Run the workflow's agent on a message, persist the interaction and store the run's trace.
+    
+    Args:
+        message (str): The user's message
+        message_with_metadata (str): The message with session/workflow metadata appended
+        session_id (str): The session ID
+        workflow_id (str): The workflow ID
+        step_id (int): The step ID
+        callbacks (list, optional): LangChain callback handlers for the run
+        should_persist (callable, optional): Checked before saving the interaction
+        
+    Returns:
+        tuple: (response, context_stats, trace_id)
+    """
+    trace = None
+    callbacks = list(callbacks or [])
+    if TRACING_ENABLED:
+        trace = Trace("chat", {"session_id": session_id, "workflow_id": workflow_id, "step_id": step_id,
+                               "message": message[:200]})
+        callbacks.append(TraceCallbackHandler(trace))
+    
+    error = None
+    try:
+        with activate(trace), trace_span("agent.run", "agent"):
+            with agent_pool.lease(workflow_id) as agent:
+                response = agent.run(message_with_metadata, callbacks=callbacks)
+                context_stats = getattr(agent.memory, "last_context_stats", {})
+            
+            # Save interaction to memory manager
+            if should_persist is None or should_persist():
+                with trace_span("memory.add_interaction", "memory"):
+                    memory_manager.add_interaction(message, response, step_id, session_id=session_id, workflow_id=workflow_id)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        if trace is not None:
+            trace.finish(error)
+            memory_manager.save_trace(session_id, workflow_id, trace.to_dict())
+    return response, context_stats, trace.id if trace else None
+
+def _stream_chat(message, message_with_metadata, session_id, workflow_id, step_id):
+    """
+    Run the agent in a worker thread and stream its events as Server-Sent Events.
+    
+    The interaction is persisted through the memory manager exactly as in the
+    non-streaming path before the "final" event is sent.
+    """
+    handler = SSEEventHandler()
+    
+    def run_agent():
+        try:
+            logger.info(f"Running agent (streaming) with message: {message[:50]}...")
+            response, context_stats, trace_id = _run_agent(message, message_with_metadata, session_id, workflow_id,
+                                                           step_id, callbacks=[handler])
+            
+            logger.info(f"Chat response streamed: {len(response)} chars")
+            handler.emit("final", {"response": response, "workflow_id": workflow_id, "trace_id": trace_id,
+                                   "context": context_stats})
+        except Exception as e:
+            logger.error(f"Error in streaming chat: {str(e)}", exc_info=True)
+            handler.emit("error", {
+                "error": str(e),
+                "response": "I encountered an error processing your request. Please try again.",
+                "workflow_id": workflow_id
+            })
+        finally:
+            handler.close()
+    
+    def generate():
+        yield format_sse("workflow", {"session_id": session_id, "workflow_id": workflow_id, "step_id": step_id})
+        for frame in handler.events():
+            yield frame
+    
+    threading.Thread(target=run_agent, daemon=True).start()
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _run_chat_job(job, handler):
+    """
+    Run a queued chat job on the workflow's agent and persist the interaction.
+    
+    Args:
+        job (Job): The job, with message, message_with_metadata, session_id, workflow_id and step_id params
+        handler (JobEventHandler): Callback handler recording progress on the job
+        
+    Returns:
+        dict: {"response": str, "workflow_id": str, "trace_id": str, "context": dict}
+    """
+    params = job.params
+    logger.info(f"Running agent (job {job.id}) with message: {params['message'][:50]}...")
+    # Save interaction to memory manager unless the run was cancelled while finishing
+    response, context_stats, trace_id = _run_agent(
+        params['message'], params['message_with_metadata'], params['session_id'], params['workflow_id'],
+        params['step_id'], callbacks=[handler], should_persist=lambda: not job.cancel_requested.is_set()
+    )
+    return {"response": response, "workflow_id": params['workflow_id'], "trace_id": trace_id, "context": context_stats}
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    API endpoint to run a chat message as a background job.
+    Expects: the same body as /api/chat: {"message": str, "session_id": str, "step_id": int, "workflow_id": str}
+    Returns (202): {"job_id": str, "status": str, "session_id": str, "workflow_id": str, "step_id": int}
+    
+    Poll GET /api/jobs/<job_id> or stream GET /api/jobs/<job_id>/events for progress.
+    """
+    try:
+        data = request.json
+        message, message_with_metadata, session_id, workflow_id, step_id = _start_chat_workflow(data)
+        
+        job = job_manager.submit({
+            "message": message,
+            "message_with_metadata": message_with_metadata,
+            "session_id": session_id,
+            "workflow_id": workflow_id,
+            "step_id": step_id
+        }, provider=current_llm_config.get("provider", "openai"))
+        
+        return jsonify({
+            "job_id": job.id,
+            "status": job.status,
+            "session_id": session_id,
+            "workflow_id": workflow_id,
+            "step_id": step_id
+        }), 202
+    except Exception as e:
+        logger.error(f"Error creating job: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """
+    API endpoint to get job queue statistics.
+    Returns: {"jobs": {workers, queued, running, counters, per-provider running/queued/limit}}
+    """
+    try:
+        return jsonify({"jobs": job_manager.get_stats()})
+    except Exception as e:
+        logger.error(f"Error getting job stats: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e), "jobs": {}}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    API endpoint to get a job's status, intermediate steps and result.
+    Returns: {"job_id", "status", "queue_position", "steps": [...], "result": {"response", ...}, "error", ...}
+    """
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify({**job.to_dict(), "queue_position": job_manager.queue_position(job_id)})
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """
+    API endpoint to stream a job's events as Server-Sent Events.
+    Query params: after (int, optional) - resume after this event ID (or send Last-Event-ID)
+    Streams: "queued", "running", "token", "action", "observation", "agent_finish" and
+             finally "final", "error" or "cancelled". A reader that resumes after events
+             were dropped from the job's buffer first gets "truncated" {"dropped", "first_event"}.
+    """
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        after = int(request.args.get('after', request.headers.get('Last-Event-ID', 0)) or 0)
+        
+        def generate():
+            seq = after
+            while True:
+                events = job.events_after(seq, timeout=15.0)
+                if not events:
+                    if job.finished:
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                for seq, event, data in events:
+                    yield format_sse(event, data, event_id=seq)
+                if job.finished and seq >= job.next_seq - 1:
+                    return
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+    except Exception as e:
+        logger.error(f"Error streaming job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    API endpoint to cancel a job. Queued jobs are dropped; running jobs stop at their
+    next LLM call or tool invocation, and a running shell command is interrupted.
+    Returns: {"job_id": str, "status": str}
+    """
+    try:
+        job = job_manager.cancel(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        if job.status == "running":
+            session = shell_sessions.find(job.params.get('workflow_id'))
+            if session is not None:
+                session.send_signal(signal.SIGINT)
+        return jsonify({"job_id": job.id, "status": job.status})
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/sessions', methods=['GET'])
 def get_sessions():
     """
-    API endpoint to get all sessions for the history UI.
-    Returns: {"sessions": [session data]}
+    API endpoint to page through sessions for the history UI.
+    Query parameters:
+    - limit: Page size, 1-500 (default 50)
+    - cursor: The next_cursor of the previous page
+    - sort: "last_activity" (default), "created_at" or "name"
+    - order: "desc" (default) or "asc"
+    - q: Case-insensitive substring of the session name
+    - fields: Comma-separated fields to return (default all); leave out "workflows"
+      to drop the workflow lists
+    Returns: {"sessions": [session data], "next_cursor": str or null, "total": int}
     """
     try:
-        logger.info("Getting all sessions")
-        sessions = memory_manager.get_all_sessions()
-        return jsonify({"sessions": sessions})
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+        page = memory_manager.list_sessions(
+            limit=limit,
+            cursor=request.args.get('cursor') or None,
+            sort=request.args.get('sort', 'last_activity'),
+            descending=request.args.get('order', 'desc').lower() != 'asc',
+            query=request.args.get('q') or None,
+            **({"fields": fields} if fields else {})
+        )
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({"error": str(e), "sessions": []}), 400
     except Exception as e:
         logger.error(f"Error getting sessions: {str(e)}", exc_info=True)
         return jsonify({"error": str(e), "sessions": []}), 500
 
+@app.route('/api/history/search', methods=['GET'])
+def search_history():
+    """
+    API endpoint for full-text search over conversation history.
+    Query parameters:
+    - q: Search text; every word must match, the last one as a prefix
+    - limit: Hits per page, 1-100 (default 20)
+    - offset: Number of hits to skip (default 0)
+    - session_id, workflow_id: Restrict the search to one session or workflow
+    Returns: {"hits": [{"kind", "session_id", "workflow_id", "step_id", "timestamp", "score",
+              "highlights": {field: html}}], "total": int, "next_offset": int or null,
+              "indexing": bool}
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "q is required"}), 400
+        results = memory_manager.search_history(
+            query,
+            limit=min(max(int(request.args.get('limit', 20)), 1), 100),
+            offset=max(int(request.args.get('offset', 0)), 0),
+            session_id=request.args.get('session_id') or None,
+            workflow_id=request.args.get('workflow_id') or None
+        )
+        return jsonify(results)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error searching history: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e), "hits": []}), 500
+
 @app.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id):
     """
     API endpoint to get a specific session.
+    Supports If-None-Match/If-Modified-Since (304 without loading the session) and
+    gzip/brotli compression.
     Returns: {session data}
     """
     try:
+        etag, last_modified = memory_manager.get_version(session_id)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
         logger.info(f"Getting session: {session_id}")
         session = memory_manager.get_session(session_id)
         if session:
-            return jsonify(session)
+            return cacheable(jsonify(session), etag, last_modified)
         logger.warning(f"Session not found: {session_id}")
         return jsonify({"error": "Session not found"}), 404
     except Exception as e:
@@ -174,19 +567,60 @@ def get_session(session_id):
 def get_workflow(session_id, workflow_id):
     """
     API endpoint to get a specific workflow.
+    Supports If-None-Match/If-Modified-Since (304 without loading the workflow) and
+    gzip/brotli compression.
     Returns: {workflow data}
     """
     try:
+        etag, last_modified = memory_manager.get_version(session_id, workflow_id)
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
         logger.info(f"Getting workflow: {session_id}/{workflow_id}")
         workflow = memory_manager.get_workflow(session_id, workflow_id)
         if workflow:
-            return jsonify(workflow)
+            return cacheable(jsonify(workflow), etag, last_modified)
         logger.warning(f"Workflow not found: {session_id}/{workflow_id}")
         return jsonify({"error": "Workflow not found"}), 404
     except Exception as e:
         logger.error(f"Error getting workflow {session_id}/{workflow_id}: {str(e)}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/workflow/<session_id>/<workflow_id>/traces', methods=['GET'])
+def get_workflow_traces(session_id, workflow_id):
+    """
+    API endpoint to list the run traces stored with a workflow.
+    Returns: {"traces": [{"id", "started_at", "duration", "span_count", "seconds_by_category"}]}
+    """
+    try:
+        traces = memory_manager.get_traces(session_id, workflow_id)
+        return jsonify({"traces": [summarize_trace(trace) for trace in traces]})
+    except Exception as e:
+        logger.error(f"Error listing traces for {session_id}/{workflow_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e), "traces": []}), 500
+
+@app.route('/api/workflow/<session_id>/<workflow_id>/traces/<trace_id>', methods=['GET'])
+def get_workflow_trace(session_id, workflow_id, trace_id):
+    """
+    API endpoint to fetch one run trace.
+    Query parameters: "format" - "chrome" (default, Chrome trace-event JSON for chrome://tracing
+    or Perfetto) or "raw" (the stored span tree)
+    Returns: The trace in the requested format
+    """
+    try:
+        trace = memory_manager.get_trace(session_id, workflow_id, trace_id)
+        if trace is None:
+            return jsonify({"error": "Trace not found"}), 404
+        if request.args.get('format', 'chrome') == 'raw':
+            return jsonify(trace)
+        response = jsonify(to_chrome_trace(trace))
+        if request.args.get('download', '').lower() == 'true':
+            response.headers['Content-Disposition'] = f'attachment; filename="trace-{trace_id}.json"'
+        return response
+    except Exception as e:
+        logger.error(f"Error getting trace {trace_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/model/config', methods=['GET'])
 def get_model_config():
     """
@@ -207,15 +641,24 @@ def get_model_config():
 def update_model_config():
     """
     API endpoint to update the model configuration.
-    Expects: {"provider": str, "model_name": str, "api_key": str, "model_kwargs": dict}
+    Expects: {"provider": str, "model_name": str, "api_key": str, "model_kwargs": dict,
+              "rate_limit": {"requests_per_minute": number > 0, "tokens_per_minute": number > 0},
+              "cache": {"enabled": bool, "force": bool, "ttl": float},
+              "mock": {"latency": float, "tokens_per_second": float, "script": list} (provider "mock" only)}
     Returns: {"status": "success"|"error", "message": str}
     """
-    global current_llm_config, agent, memory_manager
+    global current_llm_config
     
     try:
         data = request.json
         logger.info(f"Updating model config to {data.get('provider')}/{data.get('model_name')}")
         
+        # Reject bad rate limit budgets before changing anything
+        try:
+            rate_limit = validate_rate_limit(data["rate_limit"]) if data.get("rate_limit") else None
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
         # Update the configuration
         current_llm_config.update({
             "provider": data.get("provider", current_llm_config["provider"]),
@@ -223,27 +666,31 @@ def update_model_config():
             "model_kwargs": data.get("model_kwargs", current_llm_config["model_kwargs"])
         })
         
+        # Only update rate limit budgets if provided
+        if rate_limit:
+            current_llm_config["rate_limit"] = rate_limit
+        
+        # Only update response cache settings if provided
+        if data.get("cache") is not None:
+            current_llm_config["cache"] = data["cache"]
+        
+        # Only update the offline mock provider's behaviour if provided
+        if data.get("mock") is not None:
+            current_llm_config["mock"] = data["mock"]
+        
         # Only update API key if provided
         if "api_key" in data and data["api_key"]:
             current_llm_config["api_key"] = data["api_key"]
             logger.info(f"Updated API key for {current_llm_config['provider']}")
         
-        # Reinitialize the agent with the new configuration
-        agent = create_agent(
-            tools=[code_editor_tool, shell_tool],
-            memory=memory_manager.get_memory_for_llm(),
-            llm_config=current_llm_config
-        )
-        logger.info("Agent reinitialized with new configuration")
-        
-        # Update memory manager's LLM
-        memory_manager = EnhancedMemoryManager(
-            history_path="/host_home/.agent_history",
-            max_buffer_workflows=5,
-            llm_config=current_llm_config
-        )
+        # Update memory manager's LLM in place; in-flight requests keep using the same manager
+        memory_manager.set_llm_config(current_llm_config)
         logger.info("Memory manager updated with new configuration")
         
+        # Drop pooled agents so they are rebuilt with the new configuration
+        agent_pool.reconfigure(current_llm_config)
+        logger.info("Agent pool reinitialized with new configuration")
+        
         return jsonify({
             "status": "success",
             "message": f"Model updated to {current_llm_config['provider']}/{current_llm_config['model_name']}"
@@ -307,12 +754,71 @@ def get_model_providers():
         logger.error(f"Error getting model providers: {str(e)}", exc_info=True)
         return jsonify({"error": str(e), "providers": []}), 500
 
+@app.route('/api/model/rate_limits', methods=['GET'])
+def get_rate_limits():
+    """
+    API endpoint to get the state of the shared LLM rate limiters.
+    Returns: {"rate_limits": {"provider/model": {budgets, available capacity, wait time}}}
+    """
+    try:
+        return jsonify({"rate_limits": rate_limiters.get_stats()})
+    except Exception as e:
+        logger.error(f"Error getting rate limits: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e), "rate_limits": {}}), 500
+
+@app.route('/api/model/cache', methods=['GET'])
+def get_cache_stats():
+    """
+    API endpoint to get LLM response cache statistics.
+    Returns: {"cache": {entries, bytes, hits, misses, bypassed, evictions}}
+    """
+    try:
+        return jsonify({"cache": get_response_cache().get_stats()})
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e), "cache": {}}), 500
+
+@app.route('/api/model/cache', methods=['DELETE'])
+def clear_cache():
+    """
+    API endpoint to clear the LLM response cache.
+    Query params: provider, model_name (optional, limit clearing to one model)
+    Returns: {"status": "success"|"error", "message": str}
+    """
+    try:
+        provider = request.args.get('provider')
+        model_name = request.args.get('model_name')
+        prefix = f"{provider}/{model_name}:" if provider and model_name else ""
+        get_response_cache().invalidate(prefix)
+        logger.info(f"Cleared response cache {prefix or '(all entries)'}")
+        return jsonify({"status": "success", "message": f"Cleared response cache {prefix or '(all entries)'}"})
+    except Exception as e:
+        logger.error(f"Error clearing cache: {str(e)}", exc_info=True)
+        return jsonify({"status": "error", "message": f"Error clearing cache: {str(e)}"}), 500
+
+@app.route('/api/memory/stats', methods=['GET'])
+def get_memory_stats():
+    """
+    API endpoint to get memory manager statistics, including the summarization queue.
+    Returns: {"buffer_workflows": int, ..., "summary_queue": {"depth": int, ...}}
+    """
+    try:
+        return jsonify(memory_manager.get_stats())
+    except Exception as e:
+        logger.error(f"Error getting memory stats: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/read_file', methods=['GET'])
 def read_file():
     """
     API endpoint to read a file.
     Expects: query parameters "file_path", "session_id", "workflow_id"
     Returns: {"content": str, "status": "success"|"error", "message": str}
+    
+    Reads without a workflow are not recorded, so their validators come from the file's
+    metadata and a conditional request for an unchanged file gets a 304 without the file
+    being read. Reads with a workflow are recorded in its memory every time, so they
+    always return the content and carry no validators.
     """
     try:
         file_path = request.args.get('file_path', '')
@@ -328,16 +834,21 @@ def read_file():
         # Create directory if it doesn't exist
         os.makedirs('/sandbox/code', exist_ok=True)
         
+        # Recorded reads have a side effect, so only unrecorded ones are answered from cache
+        record = bool(session_id and workflow_id)
+        if not record:
+            etag, last_modified = file_version(file_path)
+            cached = not_modified(etag, last_modified)
+            if cached is not None:
+                return cached
+        
         with open(file_path, 'r') as f:
             content = f.read()
         
         # Start or continue session and workflow if provided
-        if session_id and workflow_id:
+        if record:
             memory_manager.start_session(session_id)
-            memory_manager.start_workflow(workflow_id)
-            
-            # Update agent with current workflow memory
-            agent.memory = memory_manager.get_memory_for_llm(workflow_id)
+            memory_manager.start_workflow(workflow_id, session_id=session_id)
             
             # Add file read to memory if the file is not too large
             if len(content) <= 1000:
@@ -346,21 +857,24 @@ def read_file():
                 result_msg = f"File content:\n```\n{content}\n```"
                 
                 # Add to memory manager
-                memory_manager.add_interaction(read_msg, result_msg)
+                memory_manager.add_interaction(read_msg, result_msg, session_id=session_id, workflow_id=workflow_id)
             else:
                 # For large files, just note that it was read
                 read_msg = f"User read file: {file_path} ({len(content)} bytes)"
                 result_msg = f"File read successfully."
                 
                 # Add to memory manager
-                memory_manager.add_interaction(read_msg, result_msg)
+                memory_manager.add_interaction(read_msg, result_msg, session_id=session_id, workflow_id=workflow_id)
         
         logger.info(f"File read successfully: {file_path} ({len(content)} bytes)")
-        return jsonify({
+        response = jsonify({
             "status": "success",
             "content": content,
             "message": f"File {file_path} read successfully"
         })
+        if record:
+            return compress_response(response)
+        return cacheable(response, etag, last_modified)
     except FileNotFoundError:
         logger.warning(f"File not found: {file_path}")
         return jsonify({
@@ -418,10 +932,7 @@ def edit_file():
         # Start or continue session and workflow if provided
         if session_id and workflow_id:
             memory_manager.start_session(session_id)
-            memory_manager.start_workflow(workflow_id)
-            
-            # Update agent with current workflow memory
-            agent.memory = memory_manager.get_memory_for_llm(workflow_id)
+            memory_manager.start_workflow(workflow_id, session_id=session_id)
             
             # Add file edit to memory
             operation = "Created" if is_new_file else "Updated"
@@ -437,7 +948,7 @@ def edit_file():
             result_msg = f"File {operation.lower()} successfully."
             
             # Add to memory manager
-            memory_manager.add_interaction(edit_msg, result_msg)
+            memory_manager.add_interaction(edit_msg, result_msg, session_id=session_id, workflow_id=workflow_id)
         
         logger.info(f"File updated successfully: {file_path}")
         return jsonify({
@@ -451,12 +962,33 @@ def edit_file():
             "message": f"Error updating file: {str(e)}"
         }), 400
 
+def _record_shell_command(command, exit_code, stdout, stderr, session_id, workflow_id):
+    """
+    Add a terminal command and its result to the workflow's memory, if a workflow is active.
+    """
+    if not (session_id and workflow_id):
+        return
+    
+    # Format the command execution as a message for the memory
+    command_msg = f"User executed command: {command}"
+    result_msg = f"Command result (exit code {exit_code}):\n"
+    if stdout:
+        result_msg += f"STDOUT:\n{stdout}\n"
+    if stderr:
+        result_msg += f"STDERR:\n{stderr}\n"
+    
+    # Add to memory manager
+    memory_manager.add_interaction(command_msg, result_msg, session_id=session_id, workflow_id=workflow_id)
+
 @app.route('/api/shell', methods=['POST'])
 def execute_shell():
     """
     API endpoint to execute shell commands.
     Expects: {"command": str, "session_id": str, "workflow_id": str}
-    Returns: {"exit_code": int, "stdout": str, "stderr": str}
+    Commands run in the workflow's persistent shell (the session's when no workflow is
+    given), the same shell the agent uses.
+    Returns: {"exit_code": int, "stdout": str, "stderr": str, "cwd": str, "truncated": bool,
+              "stdout_bytes": int, "stderr_bytes": int, "timed_out": str|None, "duration": float}
     """
     try:
         data = request.json
@@ -472,12 +1004,9 @@ def execute_shell():
         # Start or continue session and workflow if provided
         if session_id and workflow_id:
             memory_manager.start_session(session_id)
-            memory_manager.start_workflow(workflow_id)
-            
-            # Update agent with current workflow memory
-            agent.memory = memory_manager.get_memory_for_llm(workflow_id)
+            memory_manager.start_workflow(workflow_id, session_id=session_id)
         
-        result = shell_tool.run(command)
+        result = shell_tool.for_workflow(workflow_id or session_id).run(command)
         
         try:
             result_dict = json.loads(result)
@@ -488,17 +1017,7 @@ def execute_shell():
             logger.info(f"Command executed with exit code: {exit_code}")
             
             # Add command execution to memory if workflow is active
-            if session_id and workflow_id:
-                # Format the command execution as a message for the memory
-                command_msg = f"User executed command: {command}"
-                result_msg = f"Command result (exit code {exit_code}):\n"
-                if stdout:
-                    result_msg += f"STDOUT:\n{stdout}\n"
-                if stderr:
-                    result_msg += f"STDERR:\n{stderr}\n"
-                
-                # Add to memory manager
-                memory_manager.add_interaction(command_msg, result_msg)
+            _record_shell_command(command, exit_code, stdout, stderr, session_id, workflow_id)
             
             return jsonify(result_dict)
         except json.JSONDecodeError as e:
@@ -516,6 +1035,180 @@ def execute_shell():
             "stderr": f"Error executing command: {str(e)}"
         }), 500
 
+@app.route('/api/shell/stream', methods=['POST'])
+def stream_shell():
+    """
+    API endpoint to execute a shell command and stream its output as Server-Sent Events.
+    Expects: {"command": str, "session_id": str, "workflow_id": str}
+    Streams: "start" {"key", "command"}, "output" {"stream", "data"} for each chunk, then
+             "exit" with the same payload /api/shell returns, or "error" {"error"}
+    """
+    try:
+        data = request.json
+        command = data.get('command', '')
+        session_id = data.get('session_id', 'default_session')
+        workflow_id = data.get('workflow_id')
+        key = workflow_id or session_id
+        
+        logger.info(f"Streaming shell command: {command} (session={session_id}, workflow={workflow_id})")
+        
+        # Start or continue session and workflow if provided
+        if session_id and workflow_id:
+            memory_manager.start_session(session_id)
+            memory_manager.start_workflow(workflow_id, session_id=session_id)
+        
+        handler = SSEEventHandler()
+        
+        def execute():
+            try:
+                result = shell_sessions.run(
+                    key,
+                    command,
+                    timeout=shell_tool.timeout,
+                    idle_timeout=shell_tool.idle_timeout,
+                    max_output_bytes=shell_tool.max_output_bytes,
+                    on_output=lambda stream, chunk: handler.emit("output", {"stream": stream, "data": chunk})
+                )
+                logger.info(f"Streamed command finished with exit code: {result['exit_code']}")
+                _record_shell_command(command, result['exit_code'], result['stdout'], result['stderr'],
+                                      session_id, workflow_id)
+                handler.emit("exit", result)
+            except Exception as e:
+                logger.error(f"Error streaming shell command: {str(e)}", exc_info=True)
+                handler.emit("error", {"error": f"Error executing command: {str(e)}"})
+            finally:
+                handler.close()
+        
+        def generate():
+            yield format_sse("start", {"key": key, "command": command})
+            for frame in handler.events():
+                yield frame
+        
+        threading.Thread(target=execute, daemon=True).start()
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+    except Exception as e:
+        logger.error(f"Error streaming shell command: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Error executing command: {str(e)}"}), 500
+
+@app.route('/api/shell/input', methods=['POST'])
+def shell_input():
+    """
+    API endpoint to send input to the command running in a shell session.
+    Expects: {"session_id": str, "workflow_id": str, "data": str}
+    Returns: {"status": "success"|"error", "message": str}
+    """
+    try:
+        data = request.json
+        key = data.get('workflow_id') or data.get('session_id', 'default_session')
+        session = shell_sessions.find(key)
+        if session is None:
+            return jsonify({"status": "error", "message": f"No shell session for {key}"}), 404
+        session.write_input(data.get('data', ''))
+        return jsonify({"status": "success", "message": "Input sent"})
+    except Exception as e:
+        logger.error(f"Error sending shell input: {str(e)}", exc_info=True)
+        return jsonify({"status": "error", "message": f"Error sending input: {str(e)}"}), 500
+
+@app.route('/api/shell/signal', methods=['POST'])
+def shell_signal():
+    """
+    API endpoint to signal the command running in a shell session (e.g. Ctrl-C).
+    Expects: {"session_id": str, "workflow_id": str, "signal": "SIGINT"|"SIGTERM"|"SIGKILL"|...}
+    Returns: {"status": "success"|"error", "message": str}
+    """
+    try:
+        data = request.json
+        key = data.get('workflow_id') or data.get('session_id', 'default_session')
+        signal_name = data.get('signal', 'SIGINT').upper()
+        if not signal_name.startswith('SIG'):
+            signal_name = f"SIG{signal_name}"
+        sig = getattr(signal, signal_name, None)
+        if not isinstance(sig, signal.Signals):
+            return jsonify({"status": "error", "message": f"Unknown signal: {signal_name}"}), 400
+        
+        session = shell_sessions.find(key)
+        if session is None:
+            return jsonify({"status": "error", "message": f"No shell session for {key}"}), 404
+        if not session.send_signal(sig):
+            return jsonify({"status": "error", "message": "No running command to signal"}), 409
+        logger.info(f"Sent {signal_name} to shell session {key}")
+        return jsonify({"status": "success", "message": f"Sent {signal_name}"})
+    except Exception as e:
+        logger.error(f"Error signalling shell session: {str(e)}", exc_info=True)
+        return jsonify({"status": "error", "message": f"Error sending signal: {str(e)}"}), 500
+
+@app.route('/api/shell/sessions', methods=['GET'])
+def get_shell_sessions():
+    """
+    API endpoint to list persistent shell sessions.
+    Returns: {"shell_sessions": {"open": int, "sessions": [{"key", "cwd", "commands", "busy", "idle_seconds"}]}}
+    """
+    try:
+        return jsonify({"shell_sessions": shell_sessions.get_stats()})
+    except Exception as e:
+        logger.error(f"Error getting shell sessions: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e), "shell_sessions": {}}), 500
+
+@app.route('/api/shell/sessions/<key>', methods=['DELETE'])
+def close_shell_session(key):
+    """
+    API endpoint to close a persistent shell session; the next command starts a fresh shell.
+    Returns: {"status": "success"|"error", "message": str}
+    """
+    try:
+        shell_sessions.close(key)
+        return jsonify({"status": "success", "message": f"Closed shell session {key}"})
+    except Exception as e:
+        logger.error(f"Error closing shell session: {str(e)}", exc_info=True)
+        return jsonify({"status": "error", "message": f"Error closing shell session: {str(e)}"}), 500
+
+@app.route('/api/symbols', methods=['GET'])
+def get_symbols():
+    """
+    API endpoint to look up symbols in /sandbox/code.
+    Query parameters: "file" for a file outline, or "name" (plus optional "kind" and
+    "references=true") to find a symbol; "source=true" with "name" returns the definition's source.
+    Returns: {"file", "definitions"} or {"name", "definitions", "references"?} or the definition with "content"
+    """
+    try:
+        file_path = request.args.get('file')
+        name = request.args.get('name')
+        if name and request.args.get('source', '').lower() == 'true':
+            result = symbol_index.read_symbol(name, file_path)
+            if result is None:
+                return jsonify({"error": f"No definition of {name} found"}), 404
+            return jsonify(result)
+        if name:
+            return jsonify(symbol_index.find_symbol(
+                name,
+                kind=request.args.get('kind'),
+                include_references=request.args.get('references', '').lower() == 'true',
+                max_results=int(request.args.get('limit', 50))
+            ))
+        if file_path:
+            return jsonify(symbol_index.outline(file_path))
+        return jsonify({"error": "Either file or name is required"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error looking up symbols: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    API endpoint exposing request, LLM, tool, storage and queue metrics.
+    Returns: Prometheus text exposition format
+    """
+    try:
+        return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
 # Add a health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
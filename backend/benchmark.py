@@ -0,0 +1,514 @@
+"""
+Benchmark module for the Agentic Software-Development tool.
+This module load-tests the API offline: the model is switched to the deterministic
+"mock" provider, scenario drivers (chat, shell, file edit, history browsing) send
+requests at a configurable concurrency, and a report of throughput, latency
+percentiles and history storage I/O is printed.
+
+Usage:
+    python -m backend.benchmark --scenario chat,shell,edit,history --requests 200 --concurrency 8
+    python -m backend.benchmark --url http://localhost:5000 --scenario history --json
+
+Without --url the Flask app is driven in-process through its test client, so no
+server, network access or API key is needed; its history then goes to a temporary
+directory that is removed afterwards. With --url the server's model configuration is
+restored when the run ends.
+"""
+import os
+import re
+import sys
+import math
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ("chat", "shell", "edit", "history")
+
+# Metric samples diffed around each scenario to report history storage I/O
+METRIC_LINE = re.compile(r'^(omni_history_storage_\w+?)(?:_(sum|count))?\{([^}]*)\} (\S+)$')
+
+
+class FlaskTransport:
+    """Sends requests to the app in-process through the Flask test client."""
+
+    def __init__(self):
+        from backend.app import app
+        self.app = app
+        self.local = threading.local()
+
+    def _client(self):
+        # Test clients keep per-client state, so each worker thread gets its own
+        if not hasattr(self.local, "client"):
+            self.local.client = self.app.test_client()
+        return self.local.client
+
+    def request(self, method, path, body=None, params=None):
+        """
+        Send a request.
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path, e.g. "/api/chat"
+            body (dict, optional): JSON body
+            params (dict, optional): Query parameters
+
+        Returns:
+            tuple: (status code, response text)
+        """
+        response = self._client().open(path, method=method, json=body, query_string=params)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class HttpTransport:
+    """Sends requests to a running server."""
+
+    def __init__(self, base_url, timeout=300):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def request(self, method, path, body=None, params=None):
+        """
+        Send a request.
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path, e.g. "/api/chat"
+            body (dict, optional): JSON body
+            params (dict, optional): Query parameters
+
+        Returns:
+            tuple: (status code, response text)
+        """
+        if not hasattr(self.local, "session"):
+            self.local.session = self.requests.Session()
+        response = self.local.session.request(
+            method, self.base_url + path, json=body, params=params, timeout=self.timeout
+        )
+        return response.status_code, response.text
+
+
+class Scenario:
+    """
+    A benchmark scenario: optional setup, then one operation per request.
+
+    Subclasses implement run_one, which returns True when the request succeeded.
+    """
+
+    name = "scenario"
+
+    def __init__(self, transport, run_id, sessions):
+        """
+        Initialize the scenario.
+
+        Args:
+            transport: FlaskTransport or HttpTransport
+            run_id (str): Prefix keeping this run's sessions and files apart
+            sessions (int): Number of sessions requests are spread across
+        """
+        self.transport = transport
+        self.run_id = run_id
+        self.sessions = max(1, sessions)
+
+    def session_id(self, index):
+        """Get the benchmark session for a request."""
+        return f"bench-{self.run_id}-{index % self.sessions}"
+
+    def setup(self):
+        """Prepare state before the timed requests."""
+
+    def teardown(self):
+        """Remove anything the scenario left outside the history."""
+
+    def run_one(self, index):
+        raise NotImplementedError
+
+
+class ChatScenario(Scenario):
+    """A new agent task per request; the mock model runs one shell command and answers."""
+
+    name = "chat"
+
+    def run_one(self, index):
+        status, _ = self.transport.request("POST", "/api/chat", {
+            "message": f"Benchmark task {index}: print a greeting",
+            "session_id": self.session_id(index),
+            "step_id": 0
+        })
+        return status == 200
+
+
+class ShellScenario(Scenario):
+    """A command in the session's persistent shell per request."""
+
+    name = "shell"
+
+    def run_one(self, index):
+        status, text = self.transport.request("POST", "/api/shell", {
+            "command": f"echo bench {index} && ls /sandbox/code > /dev/null",
+            "session_id": self.session_id(index)
+        })
+        return status == 200 and json.loads(text).get("exit_code") == 0
+
+
+class EditScenario(Scenario):
+    """Writes a file and reads it back per request."""
+
+    name = "edit"
+
+    def directory(self):
+        """Get the sandbox directory this run's files are written to."""
+        return f"/sandbox/code/.benchmark/{self.run_id}"
+
+    def teardown(self):
+        # Through the shell endpoint, so files on a remote server are removed too
+        status, text = self.transport.request("POST", "/api/shell", {
+            "command": f"rm -rf {self.directory()} && (rmdir /sandbox/code/.benchmark 2>/dev/null || true)",
+            "session_id": self.session_id(0)
+        })
+        if status != 200 or json.loads(text).get("exit_code") != 0:
+            logger.warning(f"Could not remove {self.directory()}: {text}")
+
+    def run_one(self, index):
+        file_path = f"{self.directory()}/file_{index % 20}.py"
+        content = "".join(f"def function_{i}():\n    return {index + i}\n\n" for i in range(50))
+        status, _ = self.transport.request("POST", "/api/edit_file", {
+            "file_path": file_path,
+            "content": content,
+            "session_id": self.session_id(index)
+        })
+        if status != 200:
+            return False
+        status, text = self.transport.request("GET", "/api/read_file", params={
+            "file_path": file_path,
+            "session_id": self.session_id(index)
+        })
+        return status == 200 and json.loads(text).get("content") == content
+
+
+class HistoryScenario(Scenario):
+    """Browses history like the UI: the session list, a session, then one of its workflows."""
+
+    name = "history"
+
+    def setup(self):
+        # Seed every benchmark session with a chat so there is history to browse
+        chat = ChatScenario(self.transport, self.run_id, self.sessions)
+        for index in range(self.sessions):
+            chat.run_one(index)
+        self.workflows = {}
+        for index in range(self.sessions):
+            status, text = self.transport.request("GET", f"/api/session/{self.session_id(index)}")
+            if status == 200:
+                self.workflows[index] = [workflow["id"] for workflow in json.loads(text).get("workflows", [])]
+
+    def run_one(self, index):
+        status, _ = self.transport.request("GET", "/api/sessions")
+        if status != 200:
+            return False
+        session_id = self.session_id(index)
+        status, _ = self.transport.request("GET", f"/api/session/{session_id}")
+        if status != 200:
+            return False
+        workflow_ids = self.workflows.get(index % self.sessions)
+        if not workflow_ids:
+            return False
+        status, _ = self.transport.request("GET", f"/api/workflow/{session_id}/{workflow_ids[index % len(workflow_ids)]}")
+        return status == 200
+
+
+SCENARIO_CLASSES = {cls.name: cls for cls in (ChatScenario, ShellScenario, EditScenario, HistoryScenario)}
+
+
+def percentile(values, fraction):
+    """
+    Get a percentile of a list of numbers by nearest rank.
+
+    Args:
+        values (list): The numbers
+        fraction (float): The percentile as a fraction, e.g. 0.95
+
+    Returns:
+        float: The value at that rank, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def scrape_storage_metrics(transport):
+    """
+    Read the history storage counters from /api/metrics.
+
+    Args:
+        transport: FlaskTransport or HttpTransport
+
+    Returns:
+        dict: {(metric, labels): value}
+    """
+    status, text = transport.request("GET", "/api/metrics")
+    samples = {}
+    if status != 200:
+        return samples
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match and "le=" not in match.group(3):
+            name = match.group(1) + (f"_{match.group(2)}" if match.group(2) else "")
+            samples[(name, match.group(3))] = float(match.group(4))
+    return samples
+
+
+def storage_io(before, after):
+    """
+    Summarize history storage I/O between two metric scrapes.
+
+    Args:
+        before (dict): Samples from scrape_storage_metrics
+        after (dict): Later samples
+
+    Returns:
+        dict: {"bytes_read", "bytes_written", "operations": {name: {"count", "seconds"}}}
+    """
+    def delta(key):
+        return after.get(key, 0.0) - before.get(key, 0.0)
+
+    report = {"bytes_read": 0, "bytes_written": 0, "operations": {}}
+    for key in after:
+        name, labels = key
+        if name == "omni_history_storage_bytes_total":
+            field = "bytes_read" if 'direction="read"' in labels else "bytes_written"
+            report[field] += int(delta(key))
+        elif name == "omni_history_storage_duration_seconds_count":
+            count = int(delta(key))
+            if not count:
+                continue
+            operation = re.search(r'operation="([^"]*)"', labels).group(1)
+            seconds = delta(("omni_history_storage_duration_seconds_sum", labels))
+            entry = report["operations"].setdefault(operation, {"count": 0, "seconds": 0.0})
+            entry["count"] += count
+            entry["seconds"] = round(entry["seconds"] + seconds, 6)
+    return report
+
+
+def run_scenario(scenario, requests_count, concurrency):
+    """
+    Run a scenario's requests on a thread pool and measure them.
+
+    Args:
+        scenario (Scenario): The scenario
+        requests_count (int): Number of requests
+        concurrency (int): Number of requests in flight at once
+
+    Returns:
+        dict: Throughput, latency percentiles (ms), error count and storage I/O
+    """
+    scenario.setup()
+    before = scrape_storage_metrics(scenario.transport)
+
+    def timed(index):
+        started = time.perf_counter()
+        try:
+            ok = scenario.run_one(index)
+        except Exception as e:
+            logger.warning(f"{scenario.name} request {index} failed: {str(e)}")
+            ok = False
+        return ok, time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(timed, range(requests_count)))
+        elapsed = time.perf_counter() - started
+        after = scrape_storage_metrics(scenario.transport)
+    finally:
+        scenario.teardown()
+
+    latencies = [duration for _, duration in results]
+    return {
+        "scenario": scenario.name,
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "errors": sum(1 for ok, _ in results if not ok),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(requests_count / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(1000 * percentile(latencies, 0.50), 2),
+            "p95": round(1000 * percentile(latencies, 0.95), 2),
+            "p99": round(1000 * percentile(latencies, 0.99), 2),
+            "max": round(1000 * max(latencies), 2) if latencies else 0.0
+        },
+        "storage": storage_io(before, after)
+    }
+
+
+def get_model_config(transport):
+    """
+    Get the server's model configuration so it can be restored after the run.
+
+    Args:
+        transport: FlaskTransport or HttpTransport
+
+    Returns:
+        dict: The configuration (without the API key, which the server keeps), or None
+    """
+    status, text = transport.request("GET", "/api/model/config")
+    if status != 200:
+        logger.error(f"Could not read the model configuration: {text}")
+        return None
+    return json.loads(text)
+
+
+def restore_model_config(transport, config):
+    """
+    Put back a configuration saved by get_model_config.
+
+    Args:
+        transport: FlaskTransport or HttpTransport
+        config (dict): The saved configuration
+    """
+    status, text = transport.request("POST", "/api/model/config", config)
+    if status != 200:
+        logger.error(f"Could not restore the model configuration {config.get('provider')}/"
+                     f"{config.get('model_name')}: {text}")
+
+
+def configure_mock_model(transport, latency, tokens_per_second):
+    """
+    Switch the server to the offline mock provider.
+
+    Args:
+        transport: FlaskTransport or HttpTransport
+        latency (float): Seconds before the mock's first token
+        tokens_per_second (float): Mock completion pacing (0 for instant)
+
+    Returns:
+        bool: True if the server accepted the configuration
+    """
+    status, text = transport.request("POST", "/api/model/config", {
+        "provider": "mock",
+        "model_name": "react",
+        "model_kwargs": {"temperature": 0.0},
+        "mock": {"latency": latency, "tokens_per_second": tokens_per_second}
+    })
+    if status != 200:
+        logger.error(f"Could not configure the mock model: {text}")
+    return status == 200
+
+
+def format_report(results):
+    """
+    Render results as a text table.
+
+    Args:
+        results (list): Dicts from run_scenario
+
+    Returns:
+        str: The report
+    """
+    header = f"{'scenario':<10}{'reqs':>7}{'conc':>6}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'read KB':>10}{'write KB':>10}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        latency = result["latency_ms"]
+        storage = result["storage"]
+        lines.append(
+            f"{result['scenario']:<10}{result['requests']:>7}{result['concurrency']:>6}{result['errors']:>8}"
+            f"{result['throughput_rps']:>9.2f}{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}"
+            f"{latency['max']:>10.2f}{storage['bytes_read'] / 1024:>10.1f}{storage['bytes_written'] / 1024:>10.1f}"
+        )
+    for result in results:
+        operations = result["storage"]["operations"]
+        if operations:
+            lines.append("")
+            lines.append(f"{result['scenario']} history storage operations:")
+            for operation, entry in sorted(operations.items(), key=lambda item: -item[1]["seconds"]):
+                mean_ms = 1000 * entry["seconds"] / entry["count"]
+                lines.append(f"  {operation:<22}{entry['count']:>8} calls {1000 * entry['seconds']:>10.1f} ms total {mean_ms:>8.2f} ms mean")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Run the benchmark from the command line.
+
+    Args:
+        argv (list, optional): Arguments (defaults to sys.argv)
+
+    Returns:
+        int: Exit code; 1 if any request failed
+    """
+    parser = argparse.ArgumentParser(description="Offline load test for the agent API using the mock LLM provider.")
+    parser.add_argument("--scenario", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run ({', '.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--sessions", type=int, default=10, help="Sessions the requests are spread across")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock LLM latency before the first token (seconds)")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="Mock LLM token rate (0 for instant)")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--dir", help="Directory for the in-process run's temporary history (default: system temp)")
+    parser.add_argument("--keep", action="store_true", help="Keep the in-process run's history")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenario.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIO_CLASSES]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.WARNING)
+    history_root = None
+    saved_config = None
+    if args.url:
+        transport = HttpTransport(args.url)
+        saved_config = get_model_config(transport)
+        if saved_config is None:
+            return 1
+    else:
+        # Keep the run out of the real history; read when backend.app is first imported
+        history_root = tempfile.mkdtemp(prefix="benchmark-", dir=args.dir)
+        os.environ["AGENT_HISTORY_PATH"] = history_root
+        os.environ["CODE_INDEX_PATH"] = os.path.join(history_root, "code_index.db")
+        os.environ["LLM_CACHE_PATH"] = os.path.join(history_root, "llm_cache.db")
+        transport = FlaskTransport()
+
+    try:
+        if not configure_mock_model(transport, args.latency, args.tokens_per_second):
+            return 1
+
+        run_id = uuid.uuid4().hex[:8]
+        # The in-process agent prints its chain verbosely; keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            results = [
+                run_scenario(SCENARIO_CLASSES[name](transport, run_id, args.sessions), args.requests, max(1, args.concurrency))
+                for name in names
+            ]
+    finally:
+        if saved_config is not None:
+            restore_model_config(transport, saved_config)
+        if history_root is not None:
+            if args.keep:
+                print(f"History kept in {history_root}", file=sys.stderr)
+            else:
+                shutil.rmtree(history_root, ignore_errors=True)
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
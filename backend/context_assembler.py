@@ -0,0 +1,204 @@
+"""
+Context assembly module for the Agentic Software-Development tool.
+This module keeps the conversation history sent to the LLM under a token budget: the
+newest turns are kept verbatim, oversized observations are truncated and the oldest
+turns are dropped once the budget is used up.
+"""
+import logging
+import threading
+from typing import Any, Dict, List
+import litellm
+from langchain.memory import ConversationBufferMemory
+from langchain.schema import BaseMessage, SystemMessage, get_buffer_string
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Approximate characters per token for providers without a local tokenizer
+CHARS_PER_TOKEN = {
+    "anthropic": 3.5,
+    "huggingface": 3.5,
+    "google": 4.0
+}
+
+
+def make_token_counter(provider, model_name):
+    """
+    Build a token counting function for a provider/model.
+
+    OpenAI and Azure models are counted with litellm's tiktoken-based counter; other
+    providers use a per-provider characters-per-token ratio.
+
+    Args:
+        provider (str): The LLM provider
+        model_name (str): The model name
+
+    Returns:
+        callable: Function mapping text to a token count
+    """
+    chars_per_token = CHARS_PER_TOKEN.get(provider, 4.0)
+
+    def estimate(text):
+        return int(len(text) / chars_per_token) + 1
+
+    if provider not in ("openai", "azure"):
+        return estimate
+
+    def count(text):
+        try:
+            return litellm.token_counter(model=model_name, text=text)
+        except Exception:
+            return estimate(text)
+
+    return count
+
+
+class ContextAssembler:
+    """
+    Selects and trims conversation messages to fit a token budget.
+    """
+
+    def __init__(self, token_counter, max_tokens=3000, keep_recent=4, max_message_tokens=800):
+        """
+        Initialize the assembler.
+
+        Args:
+            token_counter (callable): Function mapping text to a token count
+            max_tokens (int): Token budget for the assembled history
+            keep_recent (int): Number of newest messages kept verbatim when they fit
+            max_message_tokens (int): Older messages larger than this are truncated
+        """
+        self.token_counter = token_counter
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.max_message_tokens = max_message_tokens
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_tokens_in = 0
+        self.total_tokens_out = 0
+        self.truncated_messages = 0
+        self.dropped_messages = 0
+
+    def _truncate(self, message, max_tokens, tokens):
+        """Keep the head and tail of a message so it fits roughly in max_tokens."""
+        content = message.content
+        keep_chars = max(int(len(content) * max_tokens / max(tokens, 1)) - 80, 0)
+        head = keep_chars * 2 // 3
+        tail = keep_chars - head
+        elided = len(content) - head - tail
+        trimmed = f"{content[:head]}\n[... {elided} characters elided ...]\n{content[len(content) - tail:] if tail else ''}"
+        return message.copy(update={"content": trimmed})
+
+    def assemble(self, messages: List[BaseMessage]):
+        """
+        Assemble messages under the token budget.
+
+        System messages (previous workflow context) always come first. The remaining
+        messages are taken newest first; older large messages are truncated and the
+        oldest messages are dropped once the budget is reached.
+
+        Args:
+            messages (list): The full conversation history
+
+        Returns:
+            tuple: (assembled messages, stats dict with token counts)
+        """
+        counts = [self.token_counter(m.content) for m in messages]
+        tokens_in = sum(counts)
+
+        system = [(m, c) for m, c in zip(messages, counts) if isinstance(m, SystemMessage)]
+        turns = [(m, c) for m, c in zip(messages, counts) if not isinstance(m, SystemMessage)]
+
+        # Leave room for the note that replaces dropped messages
+        budget = self.max_tokens - 20
+        selected_system = []
+        truncated = 0
+        for message, tokens in system:
+            # Previous workflow context may use at most half the budget
+            if tokens > self.max_tokens // 2:
+                message = self._truncate(message, self.max_tokens // 2, tokens)
+                tokens = self.token_counter(message.content)
+                truncated += 1
+            selected_system.append(message)
+            budget -= tokens
+
+        selected = []
+        dropped = 0
+        for position, (message, tokens) in enumerate(reversed(turns)):
+            recent = position < self.keep_recent
+            limit = budget if recent else min(budget, self.max_message_tokens)
+            if tokens > limit:
+                if limit < 50:
+                    dropped = len(turns) - position
+                    break
+                message = self._truncate(message, limit, tokens)
+                tokens = self.token_counter(message.content)
+                truncated += 1
+            selected.append(message)
+            budget -= tokens
+
+        selected.reverse()
+        assembled = selected_system + selected
+        if dropped:
+            assembled.insert(len(selected_system), SystemMessage(
+                content=f"[{dropped} earlier messages omitted to fit the context budget]"
+            ))
+        tokens_out = sum(self.token_counter(m.content) for m in assembled)
+
+        stats = {
+            "messages_in": len(messages),
+            "messages_out": len(assembled),
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "truncated": truncated,
+            "dropped": dropped
+        }
+        with self._lock:
+            self.calls += 1
+            self.total_tokens_in += tokens_in
+            self.total_tokens_out += tokens_out
+            self.truncated_messages += truncated
+            self.dropped_messages += dropped
+        if truncated or dropped:
+            logger.info(f"Context assembled: {stats}")
+        return assembled, stats
+
+    def get_stats(self):
+        """
+        Get cumulative assembly statistics.
+
+        Returns:
+            dict: Budget settings and token counts across all calls
+        """
+        with self._lock:
+            return {
+                "max_tokens": self.max_tokens,
+                "calls": self.calls,
+                "total_tokens_in": self.total_tokens_in,
+                "total_tokens_out": self.total_tokens_out,
+                "truncated_messages": self.truncated_messages,
+                "dropped_messages": self.dropped_messages
+            }
+
+
+class BudgetedConversationMemory(ConversationBufferMemory):
+    """
+    ConversationBufferMemory that stores the full history but hands the LLM only what
+    its ContextAssembler selects.
+    """
+
+    assembler: Any = None
+    last_context_stats: Dict[str, Any] = {}
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the history assembled under the token budget."""
+        if self.assembler is None:
+            return super().load_memory_variables(inputs)
+
+        messages, self.last_context_stats = self.assembler.assemble(self.chat_memory.messages)
+        logger.info(f"Context tokens: {self.last_context_stats['tokens_out']} "
+                    f"(from {self.last_context_stats['tokens_in']})")
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: get_buffer_string(messages, human_prefix=self.human_prefix, ai_prefix=self.ai_prefix)}
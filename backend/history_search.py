@@ -0,0 +1,305 @@
+"""
+History search module for the Agentic Software-Development tool.
+This module keeps a full-text index over conversation history in a SQLite FTS5 database
+next to the history files. Steps and workflows are indexed as they are written, so a
+search is one indexed query instead of a scan over every stored session.
+"""
+import os
+import re
+import html
+import sqlite3
+import threading
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    rowid INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    step_id INTEGER,
+    timestamp REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    name, task, human, ai, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_workflow ON documents (session_id, workflow_id);
+"""
+
+# Indexed text columns, in documents_fts order
+TEXT_FIELDS = ("name", "task", "human", "ai")
+
+# bm25 column weights: a match in a workflow's name or task counts more than one in a step
+FIELD_WEIGHTS = (4.0, 2.0, 1.0, 1.0)
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Sentinels placed around matches by snippet(), replaced with <mark> after HTML escaping
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 query that matches documents containing every term.
+
+    The last term is matched as a prefix so results appear while a word is being typed.
+
+    Args:
+        query (str): The user's search text
+
+    Returns:
+        str: The FTS5 MATCH expression, or "" if the text has no terms
+    """
+    terms = _TERM_RE.findall(query or "")
+    if not terms:
+        return ""
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _highlight(snippet):
+    """HTML-escape a snippet and turn its match sentinels into <mark> tags."""
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _document_key(session_id, workflow_id, step_id=None):
+    """Get the unique key of a workflow (step_id None) or step document."""
+    return f"{session_id}\x1f{workflow_id}\x1f{'workflow' if step_id is None else step_id}"
+
+
+class HistorySearchIndex:
+    """
+    Incrementally maintained FTS5 index over workflow names/tasks and step messages.
+
+    Each workflow and each step is one document, replaced in place when it changes.
+    A single connection is shared behind a lock; writes are one small transaction each.
+    """
+
+    def __init__(self, db_path):
+        """
+        Open the index, creating the database if needed.
+
+        Args:
+            db_path (str): Path to the index database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self.backfilling = False
+        logger.info(f"History search index opened at {db_path}")
+
+    def _upsert(self, conn, key, kind, session_id, workflow_id, step_id, timestamp, texts, replace=True):
+        """
+        Insert or replace one document. Caller holds the lock and commits.
+
+        Args:
+            replace (bool): Whether to overwrite an existing document with the same key
+
+        Returns:
+            bool: Whether the document was written
+        """
+        row = conn.execute("SELECT rowid FROM documents WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            if not replace:
+                return False
+            rowid = row["rowid"]
+            conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (rowid,))
+            conn.execute("UPDATE documents SET timestamp = ? WHERE rowid = ?", (timestamp, rowid))
+        else:
+            rowid = conn.execute(
+                "INSERT INTO documents (key, kind, session_id, workflow_id, step_id, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, session_id, workflow_id, step_id, timestamp)
+            ).lastrowid
+        # Drop any sentinel characters in the text itself so only real matches become <mark>
+        conn.execute(
+            "INSERT INTO documents_fts (rowid, name, task, human, ai) VALUES (?, ?, ?, ?, ?)",
+            (rowid, *[(texts.get(field) or "").replace(_MARK_START, "").replace(_MARK_END, "")
+                      for field in TEXT_FIELDS])
+        )
+        return True
+
+    def index_workflow(self, session_id, workflow):
+        """
+        Add or replace a workflow's name and task.
+
+        Args:
+            session_id (str): The session ID
+            workflow (dict): The workflow {"id", "name", "task", "created_at", ...}
+        """
+        with self._lock, self._conn:
+            self._upsert(
+                self._conn, _document_key(session_id, workflow["id"]), "workflow", session_id, workflow["id"],
+                None, workflow.get("created_at"), {"name": workflow.get("name"), "task": workflow.get("task")}
+            )
+
+    def index_step(self, session_id, workflow_id, step):
+        """
+        Add or replace a step's human and AI messages.
+
+        Args:
+            session_id (str): The session ID
+            workflow_id (str): The workflow ID
+            step (dict): The step {"step_id", "human", "ai", "timestamp"}
+        """
+        with self._lock, self._conn:
+            self._upsert(
+                self._conn, _document_key(session_id, workflow_id, step.get("step_id")), "step", session_id,
+                workflow_id, step.get("step_id"), step.get("timestamp"),
+                {"human": step.get("human"), "ai": step.get("ai")}
+            )
+
+    def is_backfilled(self):
+        """Check whether existing history has been imported into the index."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'backfilled'").fetchone()
+        return row is not None
+
+    def backfill(self, storage):
+        """
+        Import all stored history once. Documents already written by index_workflow or
+        index_step are newer than what storage returned here, so they are kept.
+
+        Args:
+            storage (HistoryStorage): The history backend
+
+        Returns:
+            int: Number of documents added
+        """
+        if self.is_backfilled():
+            return 0
+        self.backfilling = True
+        added = 0
+        try:
+            for entry in storage.list_sessions():
+                session_data = storage.load_session(entry["id"]) or {}
+                with self._lock, self._conn:
+                    for workflow in session_data.get("workflows", []):
+                        added += self._upsert(
+                            self._conn, _document_key(entry["id"], workflow["id"]), "workflow", entry["id"],
+                            workflow["id"], None, workflow.get("created_at"),
+                            {"name": workflow.get("name"), "task": workflow.get("task")}, replace=False
+                        )
+                        for step in workflow.get("steps", []):
+                            added += self._upsert(
+                                self._conn, _document_key(entry["id"], workflow["id"], step.get("step_id")), "step",
+                                entry["id"], workflow["id"], step.get("step_id"), step.get("timestamp"),
+                                {"human": step.get("human"), "ai": step.get("ai")}, replace=False
+                            )
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled', '1')")
+            logger.info(f"Backfilled history search index with {added} documents")
+        finally:
+            self.backfilling = False
+        return added
+
+    def search(self, query, limit=20, offset=0, session_id=None, workflow_id=None):
+        """
+        Rank documents against a query.
+
+        Args:
+            query (str): The search text; every term must match, the last one as a prefix
+            limit (int): Maximum number of hits
+            offset (int): Number of hits to skip
+            session_id (str, optional): Only search this session
+            workflow_id (str, optional): Only search this workflow
+
+        Returns:
+            dict: {"hits": [...], "total": int, "next_offset": int or None}. Each hit has
+                  kind, session_id, workflow_id, step_id, timestamp, score and a
+                  "highlights" dict of HTML-escaped snippets with <mark> around matches.
+        """
+        match = build_match_query(query)
+        if not match:
+            return {"hits": [], "total": 0, "next_offset": None}
+
+        filters = ""
+        params = [match]
+        if session_id:
+            filters += " AND d.session_id = ?"
+            params.append(session_id)
+        if workflow_id:
+            filters += " AND d.workflow_id = ?"
+            params.append(workflow_id)
+
+        snippets = ", ".join(
+            f"snippet(documents_fts, {column}, '{_MARK_START}', '{_MARK_END}', '...', 16) AS {field}_snippet"
+            for column, field in enumerate(TEXT_FIELDS)
+        )
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS)
+        with self._lock:
+            total = self._conn.execute(
+                "SELECT COUNT(*) FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid "
+                f"WHERE documents_fts MATCH ?{filters}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT d.rowid, d.kind, d.session_id, d.workflow_id, d.step_id, d.timestamp, "
+                f"bm25(documents_fts, {weights}) AS score "
+                "FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid "
+                f"WHERE documents_fts MATCH ?{filters} "
+                "ORDER BY score, d.timestamp DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+            # Snippets are built only for the page; computing them in the ranking query
+            # would build one for every match before the sort
+            snippet_rows = {
+                row["rowid"]: self._conn.execute(
+                    f"SELECT {snippets} FROM documents_fts WHERE documents_fts MATCH ? AND rowid = ?",
+                    (match, row["rowid"])
+                ).fetchone()
+                for row in rows
+            }
+
+        hits = []
+        for row in rows:
+            snippet_row = snippet_rows[row["rowid"]]
+            highlights = {
+                field: _highlight(snippet_row[f"{field}_snippet"])
+                for field in TEXT_FIELDS
+                if _MARK_START in (snippet_row[f"{field}_snippet"] or "")
+            }
+            hits.append({
+                "kind": row["kind"],
+                "session_id": row["session_id"],
+                "workflow_id": row["workflow_id"],
+                "step_id": row["step_id"],
+                "timestamp": row["timestamp"],
+                # bm25() is lower for better matches; report it so that higher is better
+                "score": round(-row["score"], 6),
+                "highlights": highlights
+            })
+        next_offset = offset + len(hits) if offset + len(hits) < total else None
+        return {"hits": hits, "total": total, "next_offset": next_offset}
+
+    def get_stats(self):
+        """
+        Get index size without scanning it.
+
+        Returns:
+            dict: Database file size in bytes and whether a backfill is running
+        """
+        try:
+            size = os.path.getsize(self.db_path)
+        except OSError:
+            size = 0
+        return {"bytes": size, "backfilling": self.backfilling}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
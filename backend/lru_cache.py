@@ -0,0 +1,179 @@
+"""
+LRU cache module for the Agentic Software-Development tool.
+This module provides the bounded in-process cache the memory manager keeps loaded
+sessions and workflow memories in, so a long-running server's memory stays flat.
+"""
+import threading
+from collections import OrderedDict
+
+
+class BoundedLRUCache:
+    """
+    Thread-safe LRU mapping bounded by entry count and by approximate size in bytes.
+
+    Sizes are estimated by `sizeof` when an entry is stored and can be adjusted as the
+    entry grows. Least recently used entries are evicted once either bound is exceeded;
+    the most recently stored entry is always kept, even if it alone is over the byte
+    bound. Callers rehydrate evicted entries from their source of truth.
+    """
+
+    def __init__(self, name, max_entries=256, max_bytes=64 * 1024 * 1024, sizeof=None, on_evict=None):
+        """
+        Initialize the cache.
+
+        Args:
+            name (str): Name used in stats
+            max_entries (int): Maximum number of entries; 0 or None for no limit
+            max_bytes (int): Maximum total estimated size; 0 or None for no limit
+            sizeof (callable, optional): Estimates an entry's size in bytes (default 0)
+            on_evict (callable, optional): Called with (key, value) for each entry evicted
+                to stay within a bound, after the cache lock is released; not called for pop
+        """
+        self.name = name
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+        self.sizeof = sizeof or (lambda value: 0)
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Look up an entry and mark it most recently used.
+
+        Args:
+            key: The key
+            default: Returned on a miss
+
+        Returns:
+            The cached value, or default
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size=None):
+        """
+        Store an entry as the most recently used, evicting others if over a bound.
+
+        Args:
+            key: The key
+            value: The value
+            size (int, optional): The entry's size; estimated with sizeof if None
+        """
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            self._bytes += size - self._sizes.get(key, 0)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            evicted = self._evict()
+        self._notify(evicted)
+
+    def adjust(self, key, delta):
+        """
+        Change an entry's recorded size after it was modified in place.
+
+        Args:
+            key: The key
+            delta (int): Bytes added (or removed, if negative)
+        """
+        with self._lock:
+            if key not in self._entries:
+                return
+            self._sizes[key] += delta
+            self._bytes += delta
+            evicted = self._evict()
+        self._notify(evicted)
+
+    def pop(self, key, default=None):
+        """
+        Remove an entry without counting it as an eviction.
+
+        Args:
+            key: The key
+            default: Returned if the key is not cached
+
+        Returns:
+            The removed value, or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._bytes -= self._sizes.pop(key)
+            return self._entries.pop(key)
+
+    def _evict(self):
+        """
+        Drop least recently used entries while over a bound. Caller holds the lock.
+
+        Returns:
+            list: The evicted (key, value) pairs
+        """
+        evicted = []
+        while len(self._entries) > 1 and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            key, value = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _notify(self, evicted):
+        """Pass evicted entries to on_evict. Called without the cache lock held."""
+        if self.on_evict:
+            for key, value in evicted:
+                self.on_evict(key, value)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def keys(self):
+        """Get a snapshot of the keys, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self):
+        """
+        Get occupancy and eviction statistics.
+
+        Returns:
+            dict: Entries, estimated bytes, bounds, hits, misses and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
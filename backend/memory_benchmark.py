@@ -0,0 +1,399 @@
+"""
+Memory benchmark module for the Agentic Software-Development tool.
+This module times every public EnhancedMemoryManager operation against synthetic
+histories of increasing size (sessions x workflows x steps), for each storage backend,
+and reports per-operation latency and the bytes read from and written to storage.
+
+Usage:
+    python -m backend.memory_benchmark --sizes 10x5x10,50x10x20,200x10x40 --backend json,sqlite
+    python -m backend.memory_benchmark --sizes 100x10x50 --repeat 50 --json
+
+Histories are generated in a temporary directory (deterministically, from --seed) and
+the LLM is the offline mock provider, so no network access is needed.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import tempfile
+import argparse
+import logging
+from datetime import datetime
+from backend.api.metrics import STORAGE_BYTES
+from backend.benchmark import percentile
+from backend.memory_manager import EnhancedMemoryManager
+from backend.history_search import HistorySearchIndex
+from backend.storage.factory import create_storage, STORAGE_BACKENDS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Mock model so workflow memories and summaries never leave the process
+MOCK_LLM_CONFIG = {
+    "provider": "mock",
+    "model_name": "react",
+    "model_kwargs": {"temperature": 0.0},
+    "mock": {"latency": 0.0}
+}
+
+WORDS = (
+    "the file function class test error fix run shell python output import module return value "
+    "list dict config server request response session workflow step agent code line path build "
+    "install package version update create delete read write sort search index cache memory"
+).split()
+
+
+class HistoryGenerator:
+    """Deterministic synthetic session/workflow/step data of realistic sizes."""
+
+    def __init__(self, seed=0, human_chars=300, ai_chars=1500):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int): Random seed
+            human_chars (int): Mean length of a user message
+            ai_chars (int): Mean length of an assistant message
+        """
+        self.random = random.Random(seed)
+        self.human_chars = human_chars
+        self.ai_chars = ai_chars
+
+    def text(self, mean_chars):
+        """Generate roughly mean_chars characters of words (+/- 50%)."""
+        target = max(1, int(mean_chars * self.random.uniform(0.5, 1.5)))
+        words = []
+        length = 0
+        while length < target:
+            word = self.random.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)
+
+    def step(self, step_id):
+        """Generate a step."""
+        return {
+            "step_id": step_id,
+            "human": self.text(self.human_chars),
+            "ai": self.text(self.ai_chars),
+            "timestamp": datetime.now().timestamp()
+        }
+
+    def workflow(self, steps):
+        """Generate a workflow with the given number of steps."""
+        task = self.text(80)
+        return {
+            "id": str(uuid.UUID(int=self.random.getrandbits(128))),
+            "name": f"Task: {task[:50]}",
+            "task": task,
+            "created_at": datetime.now().timestamp(),
+            "steps": [self.step(step_id) for step_id in range(steps)]
+        }
+
+
+def populate(storage, generator, sessions, workflows, steps, summaries=200):
+    """
+    Write a synthetic history straight into a storage backend.
+
+    Backends with a bulk import (SQLite) use it; otherwise every workflow and step is
+    written through save_workflow/save_step.
+
+    Args:
+        storage (HistoryStorage): An empty backend
+        generator (HistoryGenerator): Data generator
+        sessions (int): Number of sessions
+        workflows (int): Workflows per session
+        steps (int): Steps per workflow
+        summaries (int): Maximum number of workflow summaries to store
+
+    Returns:
+        list: (session_id, [workflow_id, ...]) for every session
+    """
+    layout = []
+    summary_data = {}
+    for index in range(sessions):
+        session_id = f"bench-{index}"
+        entry = {"id": session_id, "name": f"Session {index + 1}", "created_at": datetime.now().timestamp(), "workflows": []}
+        session_data = {"id": session_id, "name": entry["name"], "workflows": [generator.workflow(steps) for _ in range(workflows)]}
+        if hasattr(storage, "import_session"):
+            storage.import_session(entry, session_data)
+        else:
+            storage.save_session_entry(entry)
+            for workflow in session_data["workflows"]:
+                storage.save_workflow(session_data, workflow)
+                for step in workflow["steps"]:
+                    storage.save_step(session_data, workflow, step)
+        for workflow in session_data["workflows"]:
+            if len(summary_data) < summaries:
+                summary_data[workflow["id"]] = {
+                    "name": workflow["name"],
+                    "task": workflow["task"],
+                    "summary": generator.text(600),
+                    "timestamp": time.time()
+                }
+        layout.append((session_id, [workflow["id"] for workflow in session_data["workflows"]]))
+
+    if hasattr(storage, "import_summaries"):
+        storage.import_summaries(summary_data)
+    else:
+        for workflow_id, summary in summary_data.items():
+            storage.save_summary(workflow_id, summary)
+    return layout
+
+
+def _storage_bytes(backend):
+    """Get the (read, written) byte counters for a backend."""
+    return (
+        STORAGE_BYTES.get(backend=backend, direction="read"),
+        STORAGE_BYTES.get(backend=backend, direction="write")
+    )
+
+
+def measure(name, backend, repeat, operation):
+    """
+    Time an operation and count the storage bytes it moves.
+
+    Args:
+        name (str): Operation label
+        backend (str): Storage metrics name, for the byte counters
+        repeat (int): Number of calls
+        operation (callable): Called with the repetition index
+
+    Returns:
+        dict: Latency statistics (ms) and mean bytes read/written per call
+    """
+    durations = []
+    bytes_before = _storage_bytes(backend)
+    for index in range(repeat):
+        started = time.perf_counter()
+        operation(index)
+        durations.append(time.perf_counter() - started)
+    bytes_after = _storage_bytes(backend)
+    return {
+        "operation": name,
+        "calls": repeat,
+        "mean_ms": round(1000 * sum(durations) / len(durations), 3),
+        "p50_ms": round(1000 * percentile(durations, 0.50), 3),
+        "p95_ms": round(1000 * percentile(durations, 0.95), 3),
+        "max_ms": round(1000 * max(durations), 3),
+        "bytes_read": int((bytes_after[0] - bytes_before[0]) / repeat),
+        "bytes_written": int((bytes_after[1] - bytes_before[1]) / repeat)
+    }
+
+
+def run_size(backend, sessions, workflows, steps, repeat, generator, history_root):
+    """
+    Benchmark one backend at one history size.
+
+    Args:
+        backend (str): "json" or "sqlite"
+        sessions (int): Number of sessions
+        workflows (int): Workflows per session
+        steps (int): Steps per workflow
+        repeat (int): Calls per operation
+        generator (HistoryGenerator): Data generator
+        history_root (str): Directory for the temporary history
+
+    Returns:
+        dict: History size, population time and per-operation results
+    """
+    history_path = tempfile.mkdtemp(prefix=f"{backend}-", dir=history_root)
+    storage = create_storage(backend, history_path)
+    started = time.perf_counter()
+    layout = populate(storage, generator, sessions, workflows, steps)
+    # Build the search index up front so its background backfill does not skew the timings
+    search_index = HistorySearchIndex(os.path.join(history_path, "search.db"))
+    search_index.backfill(storage)
+    populate_seconds = time.perf_counter() - started
+
+    # Summarization is left out (it is timed by omni_summarization_duration_seconds)
+    manager = EnhancedMemoryManager(
+        history_path=history_path,
+        max_buffer_workflows=10 ** 6,
+        llm_config=MOCK_LLM_CONFIG,
+        storage=storage,
+        search_index=search_index
+    )
+    name = manager.storage.backend_name
+
+    def target(index):
+        session_id, workflow_ids = layout[index % len(layout)]
+        return session_id, workflow_ids[index % len(workflow_ids)] if workflow_ids else None
+
+    new_workflows = [str(uuid.uuid4()) for _ in range(repeat)]
+    trace_ids = [uuid.uuid4().hex[:16] for _ in range(repeat)]
+
+    def start_workflow_existing(index):
+        session_id, workflow_id = target(index)
+        manager.start_session(session_id)
+        manager.start_workflow(workflow_id, session_id=session_id)
+
+    def save_trace(index):
+        session_id, workflow_id = target(index)
+        manager.save_trace(session_id, workflow_id, {
+            "id": trace_ids[index], "name": "chat", "started_at": time.time(), "duration": 0.1, "spans": []
+        })
+
+    operations = [
+        # Cold reads before anything is cached in the manager
+        ("get_all_sessions", lambda i: manager.get_all_sessions()),
+        ("list_sessions (page)", lambda i: manager.list_sessions(limit=50)),
+        ("get_session", lambda i: manager.get_session(target(i)[0])),
+        ("get_workflow", lambda i: manager.get_workflow(*target(i))),
+        ("start_session (existing)", lambda i: manager.start_session(target(i)[0])),
+        ("start_session (new)", lambda i: manager.start_session(f"bench-new-{uuid.uuid4().hex[:8]}")),
+        ("start_workflow (existing)", start_workflow_existing),
+        ("start_workflow (new)", lambda i: manager.start_workflow(
+            new_workflows[i], f"Task {i}", task=generator.text(80), session_id=target(i)[0]
+        )),
+        ("add_interaction (append)", lambda i: manager.add_interaction(
+            generator.text(generator.human_chars), generator.text(generator.ai_chars),
+            session_id=target(i)[0], workflow_id=target(i)[1]
+        )),
+        ("add_interaction (update)", lambda i: manager.add_interaction(
+            generator.text(generator.human_chars), generator.text(generator.ai_chars),
+            step_id=0, session_id=target(i)[0], workflow_id=target(i)[1]
+        )),
+        ("get_memory_for_llm", lambda i: manager.get_memory_for_llm(target(i)[1])),
+        ("get_relevant_summaries", lambda i: manager.get_relevant_summaries(generator.text(80))),
+        ("search_history", lambda i: manager.search_history(generator.text(12))),
+        ("save_trace", save_trace),
+        ("get_traces", lambda i: manager.get_traces(*target(i))),
+        ("get_trace", lambda i: manager.get_trace(*target(i), trace_ids[i])),
+        ("get_stats", lambda i: manager.get_stats())
+    ]
+
+    try:
+        results = [measure(label, name, repeat, operation) for label, operation in operations]
+    finally:
+        manager.close()
+        search_index.close()
+        if hasattr(storage, "close"):
+            storage.close()
+
+    return {
+        "backend": backend,
+        "sessions": sessions,
+        "workflows_per_session": workflows,
+        "steps_per_workflow": steps,
+        "total_steps": sessions * workflows * steps,
+        "history_bytes": _directory_size(history_path),
+        "populate_seconds": round(populate_seconds, 3),
+        "operations": results
+    }
+
+
+def _directory_size(path):
+    """Get the total size of the files under a directory."""
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(directory, name))
+    return total
+
+
+def parse_sizes(value):
+    """
+    Parse a size list like "10x5x10,50x10x20".
+
+    Args:
+        value (str): Comma-separated SESSIONSxWORKFLOWSxSTEPS triples
+
+    Returns:
+        list: (sessions, workflows, steps) tuples
+    """
+    sizes = []
+    for part in value.split(","):
+        counts = part.strip().lower().split("x")
+        if len(counts) != 3 or not all(count.isdigit() and int(count) > 0 for count in counts):
+            raise argparse.ArgumentTypeError(f"Invalid size {part!r}; expected SESSIONSxWORKFLOWSxSTEPS")
+        sizes.append(tuple(int(count) for count in counts))
+    return sizes
+
+
+def format_report(results):
+    """
+    Render results as one table per backend and size.
+
+    Args:
+        results (list): Dicts from run_size
+
+    Returns:
+        str: The report
+    """
+    lines = []
+    for result in results:
+        lines.append(
+            f"{result['backend']}: {result['sessions']} sessions x {result['workflows_per_session']} workflows x "
+            f"{result['steps_per_workflow']} steps ({result['total_steps']} steps, "
+            f"{result['history_bytes'] / 1024 / 1024:.1f} MB on disk, populated in {result['populate_seconds']:.1f}s)"
+        )
+        header = f"  {'operation':<28}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'read B/op':>12}{'write B/op':>12}"
+        lines.append(header)
+        lines.append("  " + "-" * (len(header) - 2))
+        for op in result["operations"]:
+            lines.append(
+                f"  {op['operation']:<28}{op['mean_ms']:>10.3f}{op['p50_ms']:>10.3f}{op['p95_ms']:>10.3f}"
+                f"{op['max_ms']:>10.3f}{op['bytes_read']:>12}{op['bytes_written']:>12}"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Run the memory benchmark from the command line.
+
+    Args:
+        argv (list, optional): Arguments (defaults to sys.argv)
+
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(description="Benchmark EnhancedMemoryManager operations against synthetic histories.")
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("10x5x10,50x10x20,200x10x40"),
+                        help="Comma-separated SESSIONSxWORKFLOWSxSTEPS history sizes")
+    parser.add_argument("--backend", default=",".join(STORAGE_BACKENDS),
+                        help=f"Comma-separated storage backends ({', '.join(STORAGE_BACKENDS)})")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per operation")
+    parser.add_argument("--human-chars", type=int, default=300, help="Mean user message length")
+    parser.add_argument("--ai-chars", type=int, default=1500, help="Mean assistant message length")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic history")
+    parser.add_argument("--dir", help="Directory for the temporary histories (default: system temp)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated histories")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    backends = [name.strip() for name in args.backend.split(",") if name.strip()]
+    unknown = [name for name in backends if name not in STORAGE_BACKENDS]
+    if unknown:
+        parser.error(f"Unknown backend(s): {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("backend").setLevel(logging.WARNING)
+    history_root = tempfile.mkdtemp(prefix="memory-benchmark-", dir=args.dir)
+    results = []
+    try:
+        for backend in backends:
+            for sessions, workflows, steps in args.sizes:
+                generator = HistoryGenerator(args.seed, args.human_chars, args.ai_chars)
+                result = run_size(backend, sessions, workflows, steps, max(1, args.repeat), generator, history_root)
+                results.append(result)
+                if not args.json:
+                    print(format_report([result]), flush=True)
+    finally:
+        if args.keep:
+            print(f"Histories kept in {history_root}", file=sys.stderr)
+        else:
+            shutil.rmtree(history_root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
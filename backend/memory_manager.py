@@ -3,23 +3,88 @@ Memory management module for the Agentic Software-Development tool.
 This module handles the combination of buffer and summary memory for efficient context management.
 """
 import os
-import json
 import logging
+import threading
 import time
+import uuid
 from datetime import datetime
-from langchain.memory import ConversationBufferMemory, ConversationSummaryMemory
+from langchain.memory import ConversationSummaryMemory
+from langchain.schema import SystemMessage
 from backend.api.llm_manager import get_llm, DEFAULT_CONFIGS
+from backend.api.rate_limiter import estimate_tokens
+from backend.storage.factory import create_storage
+from backend.storage.instrumented import instrument_storage
+from backend.summary_queue import SummarizationQueue
+from backend.summary_index import SummaryIndex
+from backend.context_assembler import ContextAssembler, BudgetedConversationMemory, make_token_counter
+from backend.lru_cache import BoundedLRUCache
+from backend.session_catalog import SessionCatalog, FIELDS as SESSION_FIELDS
+from backend.history_search import HistorySearchIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def _step_size(step):
+    """Approximate the in-memory size of a step by its message lengths."""
+    return len(step.get("human") or "") + len(step.get("ai") or "")
+
+def _workflow_size(workflow):
+    """Approximate the in-memory size of a workflow."""
+    return len(workflow.get("name") or "") + len(workflow.get("task") or "") + sum(
+        _step_size(step) for step in workflow.get("steps", [])
+    )
+
+def _session_size(session_data):
+    """Approximate the in-memory size of a loaded session."""
+    return sum(_workflow_size(workflow) for workflow in session_data.get("workflows", []))
+
+def _memory_size(memory):
+    """Approximate the in-memory size of a workflow's buffer memory."""
+    return sum(len(message.content) for message in memory.chat_memory.messages)
+
+class _SessionState:
+    """
+    A loaded session with lookup indexes over its workflows and steps.
+    
+    The indexes point into `data`, so updates made through them are what gets
+    persisted, and they are evicted from the session cache together with it.
+    """
+    
+    def __init__(self, data):
+        """
+        Index loaded session data.
+        
+        Args:
+            data (dict): Session data with workflows and steps
+        """
+        self.data = data
+        self.workflows = {}
+        self.steps = {}
+        self.next_step_ids = {}
+        for workflow in data.setdefault("workflows", []):
+            self.index_workflow(workflow)
+    
+    def index_workflow(self, workflow):
+        """Index a workflow and its steps."""
+        self.workflows[workflow["id"]] = workflow
+        for step in workflow.setdefault("steps", []):
+            self.index_step(workflow["id"], step)
+    
+    def index_step(self, workflow_id, step):
+        """Index a step and advance the workflow's next step ID past it."""
+        self.steps[(workflow_id, step.get("step_id"))] = step
+        step_id = step.get("step_id", 0)
+        if isinstance(step_id, int):
+            self.next_step_ids[workflow_id] = max(self.next_step_ids.get(workflow_id, 0), step_id + 1)
+
 class EnhancedMemoryManager:
     """
     Enhanced memory manager that combines buffer memory for recent workflows
     and summary memory for older workflows to optimize token usage.
     """
     
-    def __init__(self, history_path="/host_home/.agent_history", max_buffer_workflows=5, llm_config=None):
+    def __init__(self, history_path="/host_home/.agent_history", max_buffer_workflows=5, llm_config=None, storage=None,
+                 summary_top_k=3, summary_token_budget=1000, context_token_budget=None, search_index=None):
         """
         Initialize the memory manager.
         
@@ -27,23 +92,56 @@ class EnhancedMemoryManager:
             history_path (str): Path to store history files
             max_buffer_workflows (int): Maximum number of workflows to keep in buffer memory
             llm_config (dict, optional): Configuration for the LLM
+            storage (HistoryStorage, optional): Persistence backend. If None, the backend
+                                                named by AGENT_HISTORY_STORAGE ("json" or
+                                                "sqlite", default "sqlite") is created.
+            summary_top_k (int): Maximum number of previous workflow summaries injected
+                                 into a new workflow's memory
+            summary_token_budget (int): Approximate token budget for injected summaries
+            context_token_budget (int, optional): Token budget for the history handed to the
+                                                  LLM. Defaults to AGENT_CONTEXT_TOKEN_BUDGET or 3000.
+            search_index (HistorySearchIndex, optional): Full-text index over the history.
+                                                         If None, <history_path>/search.db is used.
         """
         self.history_path = history_path
         self.max_buffer_workflows = max_buffer_workflows
+        self.summary_top_k = summary_top_k
+        self.summary_token_budget = summary_token_budget
         self.current_session_id = None
         self.current_workflow_id = None
         
+        # Guards the in-memory session/workflow state shared by request threads
+        self._lock = threading.RLock()
+        
         # Create history directory if it doesn't exist
         os.makedirs(history_path, exist_ok=True)
         
+        # Persistence backend for sessions, workflows, steps and summaries, timed for /api/metrics
+        self.storage = instrument_storage(
+            storage or create_storage(os.environ.get("AGENT_HISTORY_STORAGE", "sqlite"), history_path)
+        )
+        
         # Use default config if none provided
         self.llm_config = llm_config or DEFAULT_CONFIGS["huggingface"]
         
         # Initialize the LLM for summary memory using the LiteLLM wrapper
         self.llm = get_llm(self.llm_config)
         
-        # Initialize memories - one buffer memory per workflow
-        self.workflow_memories = {}
+        # Keeps the history sent to the LLM under a token budget for the configured model
+        self.context_assembler = ContextAssembler(
+            make_token_counter(self.llm_config.get("provider"), self.llm_config.get("model_name")),
+            max_tokens=context_token_budget or int(os.environ.get("AGENT_CONTEXT_TOKEN_BUDGET", "3000"))
+        )
+        
+        # Initialize memories - one buffer memory per workflow, bounded by count and size.
+        # Evicted memories are rebuilt from the workflow's stored steps when next used.
+        self.workflow_memories = BoundedLRUCache(
+            "workflow_memories",
+            max_entries=int(os.environ.get("AGENT_MEMORY_CACHE_ENTRIES", "256")),
+            max_bytes=int(os.environ.get("AGENT_MEMORY_CACHE_BYTES", str(64 * 1024 * 1024))),
+            sizeof=_memory_size,
+            on_evict=lambda workflow_id, memory: self._forget_workflow_session(workflow_id)
+        )
         
         # Initialize summary memory for previous workflows
         self.summary_memory = ConversationSummaryMemory(
@@ -56,59 +154,147 @@ class EnhancedMemoryManager:
         self.workflow_order = []
         self.workflow_summaries = {}
         
-        # Session data
-        self.sessions = {}
+        # Relevance index over workflow summaries, used to pick context for new workflows
+        self.summary_index = SummaryIndex()
+        
+        # Loaded session data, bounded like the memories and reloaded from storage on a miss
+        self.sessions = BoundedLRUCache(
+            "sessions",
+            max_entries=int(os.environ.get("AGENT_SESSION_CACHE_ENTRIES", "64")),
+            max_bytes=int(os.environ.get("AGENT_SESSION_CACHE_BYTES", str(64 * 1024 * 1024))),
+            sizeof=lambda state: _session_size(state.data),
+            on_evict=self._forget_session
+        )
+        
+        # Session of each workflow whose session or memory is cached, so a workflow whose
+        # session was evicted can still be found; dropped once both are evicted
+        self.workflow_sessions = {}
+        
+        # Listing of sessions by last activity for the history UI, built on first use
+        self.session_catalog = SessionCatalog()
+        
+        # Versions of sessions and workflows written by this instance, for HTTP validators;
+        # the epoch changes on restart since writes before it were not counted. Each write
+        # takes the next sequence number. Sessions are kept in an LRU; an evicted session
+        # falls back to the floor, which is raised to the sequence at eviction so a version
+        # handed out before the eviction is never reused for different data.
+        self._version_epoch = uuid.uuid4().hex[:8]
+        self._version_seq = 0
+        self._version_floor = (0, time.time())
+        self._versions = BoundedLRUCache(
+            "versions",
+            max_entries=int(os.environ.get("AGENT_VERSION_CACHE_ENTRIES", "4096")),
+            max_bytes=0,
+            on_evict=self._forget_versions
+        )
+        
+        # Full-text index over workflow names/tasks and step messages, kept next to the history
+        self.search_index = search_index or HistorySearchIndex(os.path.join(history_path, "search.db"))
+        if not self.search_index.is_backfilled():
+            threading.Thread(target=self._backfill_search_index, name="history-search-backfill", daemon=True).start()
+        
+        # Number of run traces kept per workflow
+        self.max_traces_per_workflow = int(os.environ.get("AGENT_TRACE_LIMIT", "50"))
+        
+        # Background worker that summarizes workflows evicted from buffer memory
+        self.summary_queue = SummarizationQueue(self._summarize_workflow)
         
         logger.info(f"EnhancedMemoryManager initialized with history path: {history_path}")
         
         # Load existing workflow summaries
         self._load_workflow_summaries()
     
-    def get_session_file(self, session_id):
-        """Get the path to a session file."""
-        return os.path.join(self.history_path, f"session_{session_id}.json")
+    def _backfill_search_index(self):
+        """Import history written before the search index existed. Runs on its own thread."""
+        try:
+            self.search_index.backfill(self.storage)
+        except Exception as e:
+            logger.error(f"Error backfilling history search index: {str(e)}")
+    
+    def _index_for_search(self, session_id, workflow_id, workflow=None, step=None):
+        """
+        Update the search index after a write. Failures are logged, not raised,
+        since the index can be rebuilt and must not fail the write itself.
+        """
+        try:
+            if step is not None:
+                self.search_index.index_step(session_id, workflow_id, step)
+            else:
+                self.search_index.index_workflow(session_id, workflow)
+        except Exception as e:
+            logger.error(f"Error updating history search index for workflow {workflow_id}: {str(e)}")
     
-    def get_workflow_file(self, session_id, workflow_id):
-        """Get the path to a workflow file."""
-        session_dir = os.path.join(self.history_path, f"session_{session_id}")
-        os.makedirs(session_dir, exist_ok=True)
-        return os.path.join(session_dir, f"workflow_{workflow_id}.json")
-        
-    def get_summaries_file(self):
-        """Get the path to the workflow summaries file."""
-        return os.path.join(self.history_path, "workflow_summaries.json")
-        
     def _load_workflow_summaries(self):
-        """Load existing workflow summaries from file."""
-        summaries_file = self.get_summaries_file()
-        if os.path.exists(summaries_file):
-            try:
-                with open(summaries_file, 'r') as f:
-                    self.workflow_summaries = json.load(f)
-                logger.info(f"Loaded {len(self.workflow_summaries)} workflow summaries")
-            except Exception as e:
-                logger.error(f"Error loading workflow summaries: {str(e)}")
-                self.workflow_summaries = {}
-        else:
-            logger.info("No workflow summaries file found, starting with empty summaries")
+        """Load existing workflow summaries from storage."""
+        try:
+            self.workflow_summaries = self.storage.load_summaries()
+            for workflow_id, summary in self.workflow_summaries.items():
+                self.summary_index.add(workflow_id, self._summary_text(summary))
+            logger.info(f"Loaded {len(self.workflow_summaries)} workflow summaries")
+        except Exception as e:
+            logger.error(f"Error loading workflow summaries: {str(e)}")
             self.workflow_summaries = {}
     
     def load_session_index(self):
-        """Load the session index file."""
-        index_path = os.path.join(self.history_path, "session_index.json")
-        if os.path.exists(index_path):
-            try:
-                with open(index_path, 'r') as f:
-                    return json.load(f)
-            except:
-                return {"sessions": []}
-        return {"sessions": []}
+        """Load the session index."""
+        return {"sessions": self.storage.list_sessions()}
     
     def save_session_index(self, index_data):
-        """Save the session index file."""
-        index_path = os.path.join(self.history_path, "session_index.json")
-        with open(index_path, 'w') as f:
-            json.dump(index_data, f)
+        """Save the session index."""
+        for entry in index_data.get("sessions", []):
+            self.storage.save_session_entry(entry)
+            with self._lock:
+                self._bump_version(entry["id"])
+    
+    def _bump_version(self, session_id, workflow_id=None):
+        """Record a write to a session and, if given, one of its workflows. Caller holds the lock."""
+        self._version_seq += 1
+        versions = self._versions.get(session_id)
+        if versions is None:
+            versions = {}
+            self._versions.put(session_id, versions)
+        version = (self._version_seq, time.time())
+        versions[None] = version
+        if workflow_id:
+            versions[workflow_id] = version
+    
+    def _forget_versions(self, session_id, versions):
+        """Raise the version floor when a session's versions are evicted."""
+        with self._lock:
+            self._version_floor = (self._version_seq, time.time())
+    
+    def _forget_session(self, session_id, state):
+        """Drop the workflow mappings of an evicted session whose memories are not cached either."""
+        with self._lock:
+            for workflow_id in state.workflows:
+                if self.workflow_sessions.get(workflow_id) == session_id and workflow_id not in self.workflow_memories:
+                    del self.workflow_sessions[workflow_id]
+    
+    def _forget_workflow_session(self, workflow_id):
+        """Drop the mapping of a workflow whose memory was removed, unless its session is cached."""
+        with self._lock:
+            session_id = self.workflow_sessions.get(workflow_id)
+            if session_id is not None and session_id not in self.sessions:
+                del self.workflow_sessions[workflow_id]
+    
+    def get_version(self, session_id, workflow_id=None):
+        """
+        Get the current version of a session or workflow without loading it.
+        
+        Every write through this manager changes the version, so a client holding the
+        same version has the same data.
+        
+        Args:
+            session_id (str): The session ID
+            workflow_id (str, optional): The workflow ID; None for the whole session
+            
+        Returns:
+            tuple: (version string, Unix time it was last written or this manager started)
+        """
+        with self._lock:
+            versions = self._versions.get(session_id) or {}
+            count, changed_at = versions.get(workflow_id, self._version_floor)
+        return f"{self._version_epoch}-{count}", changed_at
     
     def start_session(self, session_id, session_name=None):
         """
@@ -118,42 +304,74 @@ class EnhancedMemoryManager:
             session_id (str): The session ID
             session_name (str, optional): A human-readable name for the session
         """
-        self.current_session_id = session_id
-        
+        with self._lock:
+            self.current_session_id = session_id
+            self._start_session(session_id, session_name)
+    
+    def _start_session(self, session_id, session_name=None):
+        """Update the session index and load the session data. Caller holds the lock."""
         # Update session index
-        index = self.load_session_index()
-        session_exists = False
-        
-        for session in index["sessions"]:
-            if session["id"] == session_id:
-                session_exists = True
-                if session_name and not session.get("name"):
-                    session["name"] = session_name
-                break
+        entry = self.storage.get_session_entry(session_id)
         
-        if not session_exists:
-            index["sessions"].append({
+        if entry is None:
+            entry = {
                 "id": session_id,
-                "name": session_name or f"Session {len(index['sessions']) + 1}",
-                "created_at": os.path.getmtime(self.get_session_file(session_id)) if os.path.exists(self.get_session_file(session_id)) else None,
-                "workflows": []
-            })
-            
-        self.save_session_index(index)
-        
-        # Load session data
-        session_file = self.get_session_file(session_id)
-        if os.path.exists(session_file):
-            with open(session_file, 'r') as f:
-                self.sessions[session_id] = json.load(f)
-        else:
-            self.sessions[session_id] = {
-                "id": session_id,
-                "name": session_name or f"Session {len(index['sessions'])}",
+                "name": session_name or f"Session {self.storage.count_sessions() + 1}",
+                "created_at": datetime.now().timestamp(),
                 "workflows": []
             }
+            self.storage.save_session_entry(entry)
+            self.session_catalog.update_session(session_id, entry["name"], entry["created_at"])
+            self._bump_version(session_id)
+        elif session_name and not entry.get("name"):
+            entry["name"] = session_name
+            self.storage.save_session_entry(entry)
+            self.session_catalog.update_session(session_id, entry["name"])
+            self._bump_version(session_id)
+        
+        # Load session data unless it is already cached (every write goes through the cache)
+        if session_id not in self.sessions:
+            session_data = self.storage.load_session(session_id)
+            if session_data is None:
+                session_data = {
+                    "id": session_id,
+                    "name": entry["name"],
+                    "workflows": []
+                }
+            self._cache_session(session_id, session_data)
+    
+    def _cache_session(self, session_id, session_data):
+        """
+        Index loaded session data and put it in the session cache. Caller holds the lock.
+        
+        Returns:
+            _SessionState: The cached session
+        """
+        session_data.setdefault("id", session_id)
+        state = _SessionState(session_data)
+        self.sessions.put(session_id, state)
+        for workflow_id in state.workflows:
+            self.workflow_sessions[workflow_id] = session_id
+        return state
     
-    def start_workflow(self, workflow_id, workflow_name=None, task=None):
+    def _get_session_state(self, session_id):
+        """
+        Get a session from the cache, reloading it from storage if it was evicted.
+        Caller holds the lock.
+        
+        Args:
+            session_id (str): The session ID
+            
+        Returns:
+            _SessionState: The session (empty for a session that was never saved)
+        """
+        state = self.sessions.get(session_id)
+        if state is None:
+            session_data = self.storage.load_session(session_id) or {"id": session_id, "workflows": []}
+            state = self._cache_session(session_id, session_data)
+        return state
+    
+    def start_workflow(self, workflow_id, workflow_name=None, task=None, session_id=None):
         """
         Start a new workflow or continue an existing one.
         
@@ -161,112 +379,109 @@ class EnhancedMemoryManager:
             workflow_id (str): The workflow ID
             workflow_name (str, optional): A human-readable name for the workflow
             task (str, optional): The task description for this workflow
+            session_id (str, optional): The session the workflow belongs to.
+                                        If None, uses the current session.
         """
-        if not self.current_session_id:
-            raise ValueError("No active session. Call start_session first.")
-        
-        self.current_workflow_id = workflow_id
-        logger.info(f"Starting workflow: {workflow_id} - {workflow_name}")
-        
-        # Update session data
-        session_data = self.sessions.get(self.current_session_id, {"workflows": []})
-        
-        workflow_exists = False
-        for workflow in session_data["workflows"]:
-            if workflow["id"] == workflow_id:
-                workflow_exists = True
-                if workflow_name and not workflow.get("name"):
-                    workflow["name"] = workflow_name
-                if task and not workflow.get("task"):
-                    workflow["task"] = task
-                break
-        
-        if not workflow_exists:
-            # Create a new workflow with timestamp
-            timestamp = datetime.now().timestamp()
-            new_workflow = {
-                "id": workflow_id,
-                "name": workflow_name or f"Workflow {len(session_data['workflows']) + 1}",
-                "task": task or "",
-                "created_at": timestamp,
-                "steps": []
-            }
-            session_data["workflows"].append(new_workflow)
-            logger.info(f"Created new workflow: {workflow_id} - {workflow_name}")
+        with self._lock:
+            session_id = session_id or self.current_session_id
+            if not session_id:
+                raise ValueError("No active session. Call start_session first.")
             
-        self.sessions[self.current_session_id] = session_data
-        
-        # Save session data
-        with open(self.get_session_file(self.current_session_id), 'w') as f:
-            json.dump(session_data, f)
-        
-        # Create a new buffer memory for this workflow if it doesn't exist
-        if workflow_id not in self.workflow_memories:
-            self.workflow_memories[workflow_id] = ConversationBufferMemory(
-                memory_key="chat_history", 
-                return_messages=True
-            )
+            self.current_workflow_id = workflow_id
+            logger.info(f"Starting workflow: {workflow_id} - {workflow_name}")
             
-            # If we have previous workflow summaries, add them to the context
-            if self.workflow_summaries:
-                # Add previous workflow summaries to the memory
-                previous_summaries = "\n\n".join([
-                    f"Previous workflow '{summary.get('name', wid)}': {summary.get('summary', '')}"
-                    for wid, summary in self.workflow_summaries.items()
-                    if wid != workflow_id
-                ])
-                
-                if previous_summaries:
-                    logger.info(f"Adding {len(self.workflow_summaries)} previous workflow summaries to context")
-                    self.workflow_memories[workflow_id].chat_memory.add_system_message(
-                        f"Context from previous workflows:\n{previous_summaries}"
-                    )
-        
-        # Update workflow order
-        if workflow_id in self.workflow_order:
-            self.workflow_order.remove(workflow_id)
-        self.workflow_order.append(workflow_id)
-        
-        # If we have more workflows than our buffer limit, summarize the oldest one
-        if len(self.workflow_order) > self.max_buffer_workflows:
-            oldest_workflow_id = self.workflow_order[0]
-            self._summarize_workflow(oldest_workflow_id)
-            self.workflow_order.pop(0)
+            # Update session data
+            state = self._get_session_state(session_id)
+            session_data = state.data
+            
+            current_workflow = state.workflows.get(workflow_id)
+            changed = current_workflow is None
+            if current_workflow is not None:
+                if workflow_name and not current_workflow.get("name"):
+                    current_workflow["name"] = workflow_name
+                    changed = True
+                if task and not current_workflow.get("task"):
+                    current_workflow["task"] = task
+                    changed = True
+            else:
+                # Create a new workflow with timestamp
+                timestamp = datetime.now().timestamp()
+                new_workflow = {
+                    "id": workflow_id,
+                    "name": workflow_name or f"Workflow {len(session_data['workflows']) + 1}",
+                    "task": task or "",
+                    "created_at": timestamp,
+                    "steps": []
+                }
+                session_data["workflows"].append(new_workflow)
+                state.index_workflow(new_workflow)
+                current_workflow = new_workflow
+                self.sessions.adjust(session_id, _workflow_size(new_workflow))
+                logger.info(f"Created new workflow: {workflow_id} - {workflow_name}")
+            self.workflow_sessions[workflow_id] = session_id
+            
+            # Save workflow data only when it changed; continuing a workflow (every file
+            # read or shell command does) must not append to the journal or reindex it
+            if changed:
+                self.storage.save_workflow(session_data, current_workflow)
+                self.session_catalog.update_workflow(session_id, current_workflow)
+                self._index_for_search(session_id, workflow_id, workflow=current_workflow)
+                self._bump_version(session_id, workflow_id)
+            
+            # Create a new buffer memory for this workflow if it doesn't exist
+            self._get_workflow_memory(workflow_id, current_workflow)
+            
+            # Update workflow order
+            if workflow_id in self.workflow_order:
+                self.workflow_order.remove(workflow_id)
+            self.workflow_order.append(workflow_id)
+            
+            # If we have more workflows than our buffer limit, pick the oldest one to summarize
+            oldest_workflow_id = None
+            if len(self.workflow_order) > self.max_buffer_workflows:
+                oldest_workflow_id = self.workflow_order.pop(0)
+        
+        # Summarize in the background so the request does not wait on the LLM call
+        if oldest_workflow_id:
+            self.summary_queue.submit(oldest_workflow_id, session_id)
     
-    def _summarize_workflow(self, workflow_id):
+    def _summarize_workflow(self, workflow_id, session_id=None):
         """
         Summarize a workflow and move it from buffer to summary memory.
+        Runs on the summarization queue's worker thread.
         
         Args:
             workflow_id (str): The workflow ID to summarize
+            session_id (str, optional): The session most likely to contain the workflow
+            
+        Raises:
+            RuntimeError: If the LLM call fails, so the queue can retry the job
         """
+        if workflow_id in self.workflow_order:
+            logger.info(f"Workflow {workflow_id} is back in buffer memory, skipping summary")
+            return
+        
         logger.info(f"Summarizing workflow: {workflow_id}")
         
         # Find the session that contains this workflow
-        session_id = self.current_session_id
+        session_id = session_id or self.current_session_id
         workflow_data = None
         workflow_name = f"Workflow {workflow_id}"
         workflow_task = ""
         
-        # Try to find the workflow in all sessions if not in current session
-        if not session_id or not self._workflow_in_session(session_id, workflow_id):
-            for sid in self.sessions:
-                if self._workflow_in_session(sid, workflow_id):
-                    session_id = sid
-                    break
+        # Prefer the session the workflow is known to belong to
+        with self._lock:
+            if not session_id or not self._workflow_in_session(session_id, workflow_id):
+                session_id = self.workflow_sessions.get(workflow_id, session_id)
         
         if session_id:
-            workflow_file = self.get_workflow_file(session_id, workflow_id)
-            
-            if os.path.exists(workflow_file):
-                try:
-                    with open(workflow_file, 'r') as f:
-                        workflow_data = json.load(f)
-                    
+            try:
+                workflow_data = self.storage.load_workflow(session_id, workflow_id)
+                if workflow_data:
                     workflow_name = workflow_data.get("name", workflow_name)
                     workflow_task = workflow_data.get("task", "")
-                except Exception as e:
-                    logger.error(f"Error loading workflow file: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error loading workflow data: {str(e)}")
         
         if not workflow_data:
             logger.warning(f"Could not find workflow data for {workflow_id}")
@@ -286,23 +501,25 @@ class EnhancedMemoryManager:
             logger.warning(f"No messages found in workflow {workflow_id}")
             return
         
-        try:
-            # Generate a summary using the LLM
-            summary_prompt = f"""
-            Please summarize the following conversation about a task. 
-            Focus on the key actions taken, code written, and results achieved.
-            
-            Task: {workflow_task}
-            
-            Conversation:
-            {workflow_text}
-            
-            Summary:
-            """
-            
-            logger.info(f"Generating summary for workflow {workflow_id}")
-            summary = self.llm(summary_prompt)
-            
+        # Generate a summary using the LLM
+        summary_prompt = f"""
+        Please summarize the following conversation about a task. 
+        Focus on the key actions taken, code written, and results achieved.
+        
+        Task: {workflow_task}
+        
+        Conversation:
+        {workflow_text}
+        
+        Summary:
+        """
+        
+        logger.info(f"Generating summary for workflow {workflow_id}")
+        summary = self.llm(summary_prompt)
+        if summary.startswith("Error calling LLM"):
+            raise RuntimeError(summary)
+        
+        with self._lock:
             # Store the summary
             self.workflow_summaries[workflow_id] = {
                 "name": workflow_name,
@@ -311,89 +528,201 @@ class EnhancedMemoryManager:
                 "timestamp": time.time()
             }
             
-            # Save summaries to file
-            with open(self.get_summaries_file(), 'w') as f:
-                json.dump(self.workflow_summaries, f)
+            # Save summary to storage and make it retrievable for new workflows
+            self.storage.save_summary(workflow_id, self.workflow_summaries[workflow_id])
+            self.summary_index.add(workflow_id, self._summary_text(self.workflow_summaries[workflow_id]))
             
             logger.info(f"Workflow {workflow_id} summarized and saved")
             
-            # Remove the workflow memory to free up resources
-            if workflow_id in self.workflow_memories:
-                del self.workflow_memories[workflow_id]
-                
-        except Exception as e:
-            logger.error(f"Error summarizing workflow: {str(e)}", exc_info=True)
+            # Remove the workflow memory to free up resources, unless it became active again
+            if workflow_id not in self.workflow_order:
+                self.workflow_memories.pop(workflow_id)
+                self._forget_workflow_session(workflow_id)
     
-    def _workflow_in_session(self, session_id, workflow_id):
-        """Check if a workflow exists in a session."""
-        if session_id in self.sessions:
-            for workflow in self.sessions[session_id].get("workflows", []):
-                if workflow.get("id") == workflow_id:
-                    return True
-        return False
+    def _summary_text(self, summary):
+        """Get the indexed text of a workflow summary."""
+        return " ".join([summary.get("name") or "", summary.get("task") or "", summary.get("summary") or ""])
     
-    def add_interaction(self, human_message, ai_message, step_id):
+    def _find_workflow(self, workflow_id, session_id=None):
         """
-        Add a human-AI interaction to the current workflow.
+        Find a workflow in its loaded session, or in storage if the session was evicted.
+        Caller holds the lock.
         
         Args:
-            human_message (str): The user's message
-            ai_message (str): The assistant's response
-            step_id (int): The step ID within the workflow
+            workflow_id (str): The workflow ID
+            session_id (str, optional): The session to look in if the workflow's session is not known
+        """
+        session_id = self.workflow_sessions.get(workflow_id, session_id)
+        if session_id is None:
+            return None
+        state = self.sessions.get(session_id)
+        if state is None:
+            return self.storage.load_workflow(session_id, workflow_id)
+        return state.workflows.get(workflow_id)
+    
+    def get_relevant_summaries(self, query, exclude_workflow_id=None):
         """
-        if not self.current_session_id or not self.current_workflow_id:
-            raise ValueError("No active session or workflow. Call start_session and start_workflow first.")
+        Select the previous workflow summaries most relevant to a task.
         
-        logger.info(f"Adding interaction to workflow {self.current_workflow_id}, step {step_id}")
+        Summaries are ranked with the BM25 summary index and taken in order until
+        summary_top_k or summary_token_budget is reached. Without a query (or without
+        any match) the most recent summaries are used instead.
         
-        # Add to workflow-specific buffer memory
-        if self.current_workflow_id not in self.workflow_memories:
-            self.workflow_memories[self.current_workflow_id] = ConversationBufferMemory(
-                memory_key="chat_history", 
-                return_messages=True
-            )
+        Args:
+            query (str, optional): The task or workflow name to match against
+            exclude_workflow_id (str, optional): Workflow to leave out (usually the new one)
             
-        self.workflow_memories[self.current_workflow_id].chat_memory.add_user_message(human_message)
-        self.workflow_memories[self.current_workflow_id].chat_memory.add_ai_message(ai_message)
-        
-        # Update session data
-        session_data = self.sessions.get(self.current_session_id, {"workflows": []})
-        
-        for workflow in session_data["workflows"]:
-            if workflow["id"] == self.current_workflow_id:
-                step_exists = False
-                for step in workflow.get("steps", []):
-                    if step.get("step_id") == step_id:
-                        step["human"] = human_message
-                        step["ai"] = ai_message
-                        step_exists = True
-                        break
-                
-                if not step_exists:
-                    if "steps" not in workflow:
-                        workflow["steps"] = []
-                    workflow["steps"].append({
-                        "step_id": step_id,
-                        "human": human_message,
-                        "ai": ai_message,
-                        "timestamp": datetime.now().timestamp()
-                    })
+        Returns:
+            list: (workflow_id, summary) tuples, most relevant first
+        """
+        ranked = [wid for wid, _ in self.summary_index.search(
+            query, top_k=self.summary_top_k, exclude=[exclude_workflow_id]
+        )] if query else []
+        if not ranked:
+            ranked = [
+                wid for wid, _ in sorted(
+                    self.workflow_summaries.items(),
+                    key=lambda item: item[1].get("timestamp") or 0,
+                    reverse=True
+                )
+                if wid != exclude_workflow_id
+            ][:self.summary_top_k]
+        
+        selected = []
+        used_tokens = 0
+        for wid in ranked:
+            summary = self.workflow_summaries.get(wid)
+            if not summary:
+                continue
+            tokens = estimate_tokens(summary.get("summary", ""))
+            if selected and used_tokens + tokens > self.summary_token_budget:
                 break
+            selected.append((wid, summary))
+            used_tokens += tokens
+        return selected
+    
+    def _new_buffer_memory(self):
+        """Create an empty buffer memory that is assembled under the context token budget."""
+        return BudgetedConversationMemory(
+            memory_key="chat_history",
+            return_messages=True,
+            assembler=self.context_assembler
+        )
+    
+    def _create_workflow_memory(self, workflow_id, query=None):
+        """
+        Create a buffer memory for a workflow, seeded with relevant previous summaries.
         
-        self.sessions[self.current_session_id] = session_data
+        Args:
+            workflow_id (str): The workflow ID
+            query (str, optional): The workflow's task, used to rank previous summaries
+            
+        Returns:
+            BudgetedConversationMemory: The new memory
+        """
+        memory = self._new_buffer_memory()
+        
+        # If we have previous workflow summaries, add the relevant ones to the context
+        if self.workflow_summaries:
+            relevant = self.get_relevant_summaries(query, exclude_workflow_id=workflow_id)
+            previous_summaries = "\n\n".join([
+                f"Previous workflow '{summary.get('name', wid)}': {summary.get('summary', '')}"
+                for wid, summary in relevant
+            ])
+            
+            if previous_summaries:
+                logger.info(f"Adding {len(relevant)} of {len(self.workflow_summaries)} previous workflow summaries to context")
+                memory.chat_memory.add_message(SystemMessage(
+                    content=f"Context from previous workflows:\n{previous_summaries}"
+                ))
         
-        # Save session data
-        with open(self.get_session_file(self.current_session_id), 'w') as f:
-            json.dump(session_data, f)
+        return memory
+    
+    def _get_workflow_memory(self, workflow_id, workflow=None, session_id=None):
+        """
+        Get a workflow's buffer memory, creating it (or rebuilding it after eviction)
+        from the workflow's stored steps. Caller holds the lock.
         
-        # Save workflow data separately for easier access
-        workflow_file = self.get_workflow_file(self.current_session_id, self.current_workflow_id)
+        Args:
+            workflow_id (str): The workflow ID
+            workflow (dict, optional): The workflow data, if the caller has it
+            session_id (str, optional): The workflow's session, if the caller knows it
+            
+        Returns:
+            BudgetedConversationMemory: The memory
+        """
+        memory = self.workflow_memories.get(workflow_id)
+        if memory is None:
+            workflow = workflow or self._find_workflow(workflow_id, session_id) or {}
+            memory = self._create_workflow_memory(workflow_id, workflow.get("task") or workflow.get("name"))
+            for step in workflow.get("steps", []):
+                memory.chat_memory.add_user_message(step.get("human", ""))
+                memory.chat_memory.add_ai_message(step.get("ai", ""))
+            self.workflow_memories.put(workflow_id, memory)
+        return memory
+    
+    def _workflow_in_session(self, session_id, workflow_id):
+        """Check if a workflow exists in a session."""
+        return self.workflow_sessions.get(workflow_id) == session_id
+    
+    def add_interaction(self, human_message, ai_message, step_id=None, session_id=None, workflow_id=None):
+        """
+        Add a human-AI interaction to a workflow.
         
-        for workflow in session_data["workflows"]:
-            if workflow["id"] == self.current_workflow_id:
-                with open(workflow_file, 'w') as f:
-                    json.dump(workflow, f)
-                break
+        Args:
+            human_message (str): The user's message
+            ai_message (str): The assistant's response
+            step_id (int, optional): The step ID within the workflow.
+                                     If None, the interaction is appended as a new step.
+            session_id (str, optional): The session ID. If None, uses the current session.
+            workflow_id (str, optional): The workflow ID. If None, uses the current workflow.
+        """
+        with self._lock:
+            session_id = session_id or self.current_session_id
+            workflow_id = workflow_id or self.current_workflow_id
+            if not session_id or not workflow_id:
+                raise ValueError("No active session or workflow. Call start_session and start_workflow first.")
+            
+            logger.info(f"Adding interaction to workflow {workflow_id}, step {step_id}")
+            
+            # Add to workflow-specific buffer memory
+            memory = self._get_workflow_memory(workflow_id, session_id=session_id)
+            memory.chat_memory.add_user_message(human_message)
+            memory.chat_memory.add_ai_message(ai_message)
+            self.workflow_memories.adjust(workflow_id, len(human_message) + len(ai_message))
+            
+            # Update session data
+            state = self._get_session_state(session_id)
+            workflow = state.workflows.get(workflow_id)
+            if workflow is None:
+                return
+            if step_id is None:
+                step_id = state.next_step_ids.get(workflow_id, 0)
+            
+            current_step = state.steps.get((workflow_id, step_id))
+            if current_step is not None:
+                previous_size = _step_size(current_step)
+                current_step["human"] = human_message
+                current_step["ai"] = ai_message
+                self.sessions.adjust(session_id, _step_size(current_step) - previous_size)
+                activity = datetime.now().timestamp()
+            else:
+                current_step = {
+                    "step_id": step_id,
+                    "human": human_message,
+                    "ai": ai_message,
+                    "timestamp": datetime.now().timestamp()
+                }
+                workflow["steps"].append(current_step)
+                state.index_step(workflow_id, current_step)
+                self.sessions.adjust(session_id, _step_size(current_step))
+                activity = current_step["timestamp"]
+            
+            # Save step data
+            self.storage.save_step(state.data, workflow, current_step)
+            self.session_catalog.record_activity(session_id, activity)
+            self._index_for_search(session_id, workflow_id, step=current_step)
+            self._bump_version(session_id, workflow_id)
     
     def get_memory_for_llm(self, workflow_id=None):
         """
@@ -404,35 +733,17 @@ class EnhancedMemoryManager:
                                         If None, uses the current workflow.
         
         Returns:
-            ConversationBufferMemory: The memory object to use with the LLM
+            BudgetedConversationMemory: The memory object to use with the LLM
         """
         wid = workflow_id or self.current_workflow_id
         
         if not wid:
             logger.warning("No workflow ID provided and no current workflow. Returning empty memory.")
-            return ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-            
-        # If we don't have a memory for this workflow yet, create one
-        if wid not in self.workflow_memories:
-            self.workflow_memories[wid] = ConversationBufferMemory(
-                memory_key="chat_history", 
-                return_messages=True
-            )
-            
-            # If we have previous workflow summaries, add them to the context
-            if self.workflow_summaries:
-                previous_summaries = "\n\n".join([
-                    f"Previous workflow '{summary.get('name', w_id)}': {summary.get('summary', '')}"
-                    for w_id, summary in self.workflow_summaries.items()
-                    if w_id != wid
-                ])
-                
-                if previous_summaries:
-                    self.workflow_memories[wid].chat_memory.add_system_message(
-                        f"Context from previous workflows:\n{previous_summaries}"
-                    )
-        
-        return self.workflow_memories[wid]
+            return self._new_buffer_memory()
+        
+        with self._lock:
+            # Create the memory for this workflow, or rebuild it if it was evicted
+            return self._get_workflow_memory(wid, session_id=self.current_session_id)
     
     def get_all_sessions(self):
         """
@@ -441,7 +752,54 @@ class EnhancedMemoryManager:
         Returns:
             list: List of session data
         """
-        return self.load_session_index()["sessions"]
+        return self.storage.list_sessions()
+    
+    def list_sessions(self, limit=50, cursor=None, sort="last_activity", descending=True, query=None,
+                      fields=SESSION_FIELDS):
+        """
+        Get one page of sessions for the history UI from the session catalog.
+        
+        Args:
+            limit (int): Maximum number of sessions
+            cursor (str, optional): The next_cursor of the previous page
+            sort (str): "last_activity", "created_at" or "name"
+            descending (bool): Whether to list the largest values first
+            query (str, optional): Case-insensitive substring the session name must contain
+            fields (iterable): Fields to include, from id, name, created_at, last_activity,
+                               workflow_count and workflows
+            
+        Returns:
+            dict: {"sessions": [...], "next_cursor": str or None, "total": int}
+        """
+        if not self.session_catalog.loaded:
+            # Build under the manager lock so no write lands between the read and the load
+            with self._lock:
+                if not self.session_catalog.loaded:
+                    self.session_catalog.load(self.storage.list_session_activity())
+                    logger.info(f"Built session catalog with {len(self.session_catalog)} sessions")
+        return self.session_catalog.page(
+            limit=limit, cursor=cursor, sort=sort, descending=descending, query=query, fields=fields
+        )
+    
+    def search_history(self, query, limit=20, offset=0, session_id=None, workflow_id=None):
+        """
+        Full-text search over workflow names/tasks and step messages.
+        
+        Args:
+            query (str): The search text
+            limit (int): Maximum number of hits
+            offset (int): Number of hits to skip
+            session_id (str, optional): Only search this session
+            workflow_id (str, optional): Only search this workflow
+            
+        Returns:
+            dict: {"hits": [...], "total": int, "next_offset": int or None, "indexing": bool}
+        """
+        results = self.search_index.search(
+            query, limit=limit, offset=offset, session_id=session_id, workflow_id=workflow_id
+        )
+        results["indexing"] = not self.search_index.is_backfilled()
+        return results
     
     def get_session(self, session_id):
         """
@@ -453,11 +811,7 @@ class EnhancedMemoryManager:
         Returns:
             dict: Session data
         """
-        session_file = self.get_session_file(session_id)
-        if os.path.exists(session_file):
-            with open(session_file, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.load_session(session_id)
     
     def get_workflow(self, session_id, workflow_id):
         """
@@ -470,8 +824,94 @@ class EnhancedMemoryManager:
         Returns:
             dict: Workflow data
         """
-        workflow_file = self.get_workflow_file(session_id, workflow_id)
-        if os.path.exists(workflow_file):
-            with open(workflow_file, 'r') as f:
-                return json.load(f)
-        return None
\ No newline at end of file
+        return self.storage.load_workflow(session_id, workflow_id)
+    
+    def save_trace(self, session_id, workflow_id, trace):
+        """
+        Store a run trace alongside its workflow.
+        
+        Args:
+            session_id (str): The session ID
+            workflow_id (str): The workflow ID
+            trace (dict): The serialized trace
+        """
+        try:
+            self.storage.save_trace(session_id, workflow_id, trace, keep=self.max_traces_per_workflow)
+        except Exception as e:
+            logger.error(f"Error saving trace {trace.get('id')}: {str(e)}")
+    
+    def get_traces(self, session_id, workflow_id):
+        """
+        Get a workflow's run traces, oldest first.
+        
+        Args:
+            session_id (str): The session ID
+            workflow_id (str): The workflow ID
+            
+        Returns:
+            list: Stored traces
+        """
+        return self.storage.list_traces(session_id, workflow_id)
+    
+    def get_trace(self, session_id, workflow_id, trace_id):
+        """
+        Get one run trace of a workflow.
+        
+        Args:
+            session_id (str): The session ID
+            workflow_id (str): The workflow ID
+            trace_id (str): The trace ID
+            
+        Returns:
+            dict: The stored trace, or None
+        """
+        return self.storage.load_trace(session_id, workflow_id, trace_id)
+    
+    def get_stats(self):
+        """
+        Get memory manager statistics.
+        
+        Returns:
+            dict: Buffer occupancy, cache occupancy and evictions, summarization queue,
+                  search index and context assembly stats
+        """
+        with self._lock:
+            stats = {
+                "buffer_workflows": len(self.workflow_order),
+                "workflow_memories": len(self.workflow_memories),
+                "workflow_summaries": len(self.workflow_summaries),
+                "loaded_sessions": len(self.sessions),
+                "caches": {
+                    "sessions": self.sessions.get_stats(),
+                    "workflow_memories": self.workflow_memories.get_stats(),
+                    "versions": self._versions.get_stats()
+                }
+            }
+        stats["summary_queue"] = self.summary_queue.get_stats()
+        stats["search_index"] = self.search_index.get_stats()
+        stats["context"] = self.context_assembler.get_stats()
+        return stats
+    
+    def set_llm_config(self, llm_config):
+        """
+        Switch the LLM used for summaries and the token counter used for context assembly.
+        
+        The manager is updated in place rather than replaced, so requests already holding
+        it (and the memories it handed out) keep working against the same caches.
+        
+        Args:
+            llm_config (dict): The new LLM configuration
+        """
+        # Creating the client can be slow, so it happens outside the lock
+        llm = get_llm(llm_config)
+        token_counter = make_token_counter(llm_config.get("provider"), llm_config.get("model_name"))
+        with self._lock:
+            self.llm_config = llm_config
+            self.llm = llm
+            self.summary_memory.llm = llm
+            self.context_assembler.token_counter = token_counter
+        logger.info(f"Memory manager switched to {llm_config.get('provider')}/{llm_config.get('model_name')}")
+    
+    def close(self):
+        """Stop background work. Queued summaries that have not started are dropped."""
+        self.summary_queue.stop()
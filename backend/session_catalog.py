@@ -0,0 +1,254 @@
+"""
+Session catalog module for the Agentic Software-Development tool.
+This module keeps an in-memory listing of sessions with their last activity and workflow
+names, so the history UI can page through sessions by keyset cursor without loading
+every session from storage on each request.
+"""
+import json
+import base64
+import bisect
+import threading
+
+# Orderings the catalog can page through
+SORT_KEYS = ("last_activity", "created_at", "name")
+
+# Fields a listing can project; "workflows" is the only one that grows with the session
+FIELDS = ("id", "name", "created_at", "last_activity", "workflow_count", "workflows")
+
+
+def encode_cursor(sort, key):
+    """
+    Encode a sort key as an opaque URL-safe cursor.
+
+    Args:
+        sort (str): The ordering the key belongs to, from SORT_KEYS
+        key (tuple): (sort value, session ID) of the last listed session
+
+    Returns:
+        str: The cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps([sort, *key]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, sort):
+    """
+    Decode a cursor produced by encode_cursor for the same ordering.
+
+    Args:
+        cursor (str): The cursor
+        sort (str): The ordering being paged through
+
+    Returns:
+        tuple: (sort value, session ID)
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another ordering
+    """
+    try:
+        cursor_sort, value, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor does not belong to sort {sort}")
+    # The value is compared with the ordering's keys, so it must have the same type
+    if sort == "name":
+        valid_value = isinstance(value, str)
+    else:
+        valid_value = isinstance(value, (int, float)) and not isinstance(value, bool)
+    if not valid_value or not isinstance(session_id, str):
+        raise ValueError("Invalid cursor")
+    return value, session_id
+
+
+class SessionCatalog:
+    """
+    Listing index over sessions keyed by session ID.
+
+    Entries are updated one at a time as sessions, workflows and steps are written.
+    Each ordering is kept as a sorted key list that is rebuilt lazily after a change,
+    so pages are found by bisecting on the cursor instead of scanning from the start.
+    """
+
+    def __init__(self):
+        """Initialize an empty catalog."""
+        self._entries = {}
+        self._sorted = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, entries):
+        """
+        Replace the catalog contents.
+
+        Args:
+            entries (list): Dicts {"id", "name", "created_at", "last_activity", "workflows"},
+                            workflows being dicts {"id", "name", "created_at"}
+        """
+        with self._lock:
+            self._entries = {}
+            for entry in entries:
+                self._entries[entry["id"]] = {
+                    "id": entry["id"],
+                    "name": entry.get("name"),
+                    "created_at": entry.get("created_at"),
+                    "last_activity": entry.get("last_activity") or entry.get("created_at"),
+                    "workflows": [dict(workflow) for workflow in entry.get("workflows", [])]
+                }
+            self._sorted = {}
+            self.loaded = True
+
+    def _sort_key(self, entry, sort):
+        """Get an entry's key in an ordering. Missing values sort first."""
+        value = entry.get(sort)
+        if sort == "name":
+            return (value or "").lower(), entry["id"]
+        return value or 0, entry["id"]
+
+    def _touch(self, entry, timestamp):
+        """Move an entry's last activity forward. Caller holds the lock."""
+        if timestamp and timestamp > (entry["last_activity"] or 0):
+            entry["last_activity"] = timestamp
+            self._sorted.pop("last_activity", None)
+
+    def update_session(self, session_id, name=None, created_at=None):
+        """
+        Add a session or update its name.
+
+        Args:
+            session_id (str): The session ID
+            name (str, optional): The session name
+            created_at (float, optional): Creation timestamp, used for new sessions
+        """
+        with self._lock:
+            if not self.loaded:
+                return
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self._entries[session_id] = {
+                    "id": session_id,
+                    "name": name,
+                    "created_at": created_at,
+                    "last_activity": created_at,
+                    "workflows": []
+                }
+                self._sorted = {}
+            elif name is not None and name != entry["name"]:
+                entry["name"] = name
+                self._sorted.pop("name", None)
+
+    def update_workflow(self, session_id, workflow):
+        """
+        Add a workflow to a session or update its name.
+
+        Args:
+            session_id (str): The session ID
+            workflow (dict): The workflow {"id", "name", "created_at", ...}
+        """
+        with self._lock:
+            entry = self._entries.get(session_id) if self.loaded else None
+            if entry is None:
+                return
+            for listed in entry["workflows"]:
+                if listed["id"] == workflow["id"]:
+                    listed["name"] = workflow.get("name")
+                    return
+            entry["workflows"].append({
+                "id": workflow["id"],
+                "name": workflow.get("name"),
+                "created_at": workflow.get("created_at")
+            })
+            self._touch(entry, workflow.get("created_at"))
+
+    def record_activity(self, session_id, timestamp):
+        """
+        Record that a session was written to.
+
+        Args:
+            session_id (str): The session ID
+            timestamp (float): When the write happened
+        """
+        with self._lock:
+            entry = self._entries.get(session_id) if self.loaded else None
+            if entry is not None:
+                self._touch(entry, timestamp)
+
+    def _ordering(self, sort):
+        """Get the ascending (keys, session IDs) of an ordering. Caller holds the lock."""
+        ordering = self._sorted.get(sort)
+        if ordering is None:
+            pairs = sorted((self._sort_key(entry, sort), session_id) for session_id, entry in self._entries.items())
+            ordering = ([key for key, _ in pairs], [session_id for _, session_id in pairs])
+            self._sorted[sort] = ordering
+        return ordering
+
+    def _project(self, entry, fields):
+        """Copy the requested fields of an entry."""
+        item = {}
+        for field in fields:
+            if field == "workflow_count":
+                item[field] = len(entry["workflows"])
+            elif field == "workflows":
+                item[field] = [dict(workflow) for workflow in entry["workflows"]]
+            else:
+                item[field] = entry[field]
+        return item
+
+    def page(self, limit=50, cursor=None, sort="last_activity", descending=True, query=None, fields=FIELDS):
+        """
+        Get one page of sessions.
+
+        Args:
+            limit (int): Maximum number of sessions
+            cursor (str, optional): The next_cursor of the previous page
+            sort (str): One of SORT_KEYS
+            descending (bool): Whether to list the largest values first
+            query (str, optional): Case-insensitive substring the session name must contain
+            fields (iterable): Fields to include, from FIELDS
+
+        Returns:
+            dict: {"sessions": [...], "next_cursor": str or None, "total": int}
+
+        Raises:
+            ValueError: If sort or a field is unknown, or the cursor is malformed or from another sort
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        after = decode_cursor(cursor, sort) if cursor else None
+        needle = (query or "").lower()
+
+        with self._lock:
+            keys, session_ids = self._ordering(sort)
+            if descending:
+                start = bisect.bisect_left(keys, after) - 1 if after is not None else len(keys) - 1
+                positions = range(start, -1, -1)
+            else:
+                start = bisect.bisect_right(keys, after) if after is not None else 0
+                positions = range(start, len(keys))
+
+            sessions = []
+            next_cursor = None
+            last_position = None
+            for position in positions:
+                entry = self._entries[session_ids[position]]
+                if needle and needle not in (entry["name"] or "").lower():
+                    continue
+                if len(sessions) == limit:
+                    # Another match exists, so hand out the key of the last one listed
+                    if last_position is not None:
+                        next_cursor = encode_cursor(sort, keys[last_position])
+                    break
+                sessions.append(self._project(entry, fields))
+                last_position = position
+
+            if needle:
+                total = sum(1 for entry in self._entries.values() if needle in (entry["name"] or "").lower())
+            else:
+                total = len(self._entries)
+
+        return {"sessions": sessions, "next_cursor": next_cursor, "total": total}
@@ -0,0 +1,100 @@
+"""
+History storage interface for the Agentic Software-Development tool.
+This module defines the operations EnhancedMemoryManager needs from a persistence backend.
+"""
+
+
+class HistoryStorage:
+    """
+    Base class for session/workflow history backends.
+
+    Sessions are dicts {"id", "name", "workflows": [...]}, workflows are dicts
+    {"id", "name", "task", "created_at", "steps": [...]} and steps are dicts
+    {"step_id", "human", "ai", "timestamp"}. Session index entries are
+    {"id", "name", "created_at", "workflows"}.
+
+    Write methods receive the caller's in-memory session data together with the
+    changed record, so each backend can persist as much or as little as it needs.
+    """
+
+    def list_sessions(self):
+        """Return all session index entries in creation order."""
+        raise NotImplementedError
+
+    def get_session_entry(self, session_id):
+        """Return the index entry for a session, or None."""
+        raise NotImplementedError
+
+    def count_sessions(self):
+        """Return the number of sessions in the index."""
+        raise NotImplementedError
+
+    def save_session_entry(self, entry):
+        """Insert or update a session index entry."""
+        raise NotImplementedError
+
+    def list_session_activity(self):
+        """
+        Return every session index entry with its last activity and workflow names,
+        as {"id", "name", "created_at", "last_activity", "workflows": [{"id", "name", "created_at"}]}.
+
+        Backends that can aggregate this without loading whole sessions should override it.
+        """
+        entries = []
+        for entry in self.list_sessions():
+            session_data = self.load_session(entry["id"]) or {}
+            workflows = session_data.get("workflows", [])
+            timestamps = [entry.get("created_at") or 0]
+            for workflow in workflows:
+                timestamps.append(workflow.get("created_at") or 0)
+                timestamps.extend(step.get("timestamp") or 0 for step in workflow.get("steps", []))
+            entries.append({
+                "id": entry["id"],
+                "name": entry.get("name"),
+                "created_at": entry.get("created_at"),
+                "last_activity": max(timestamps),
+                "workflows": [
+                    {"id": workflow["id"], "name": workflow.get("name"), "created_at": workflow.get("created_at")}
+                    for workflow in workflows
+                ]
+            })
+        return entries
+
+    def load_session(self, session_id):
+        """Return the full session data including workflows and steps, or None."""
+        raise NotImplementedError
+
+    def load_workflow(self, session_id, workflow_id):
+        """Return a workflow including its steps, or None."""
+        raise NotImplementedError
+
+    def save_workflow(self, session_data, workflow):
+        """Persist a new or updated workflow's metadata."""
+        raise NotImplementedError
+
+    def save_step(self, session_data, workflow, step):
+        """Persist a new or updated step of a workflow."""
+        raise NotImplementedError
+
+    def load_summaries(self):
+        """Return all workflow summaries keyed by workflow ID."""
+        raise NotImplementedError
+
+    def save_summary(self, workflow_id, summary):
+        """Insert or update the summary of a workflow."""
+        raise NotImplementedError
+
+    def save_trace(self, session_id, workflow_id, trace, keep=50):
+        """Persist a run trace of a workflow, keeping only the newest `keep` traces."""
+        raise NotImplementedError
+
+    def list_traces(self, session_id, workflow_id):
+        """Return the stored traces of a workflow, oldest first."""
+        raise NotImplementedError
+
+    def load_trace(self, session_id, workflow_id, trace_id):
+        """Return one stored trace, or None."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend."""
@@ -0,0 +1,40 @@
+"""
+Storage factory for the Agentic Software-Development tool.
+This module selects the history storage backend by name.
+"""
+import os
+import logging
+from backend.storage.json_store import JSONHistoryStorage
+from backend.storage.sqlite_store import SQLiteHistoryStorage
+from backend.storage.migrate import migrate_json_to_sqlite
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ("json", "sqlite")
+
+
+def create_storage(backend, history_path):
+    """
+    Create a history storage backend.
+
+    The SQLite backend lives at <history_path>/history.db and imports the existing
+    JSON tree the first time it is opened.
+
+    Args:
+        backend (str): "json" or "sqlite"
+        history_path (str): Directory holding the history files
+
+    Returns:
+        HistoryStorage: The storage backend
+    """
+    backend = (backend or "json").lower()
+    if backend == "json":
+        return JSONHistoryStorage(history_path)
+    if backend == "sqlite":
+        store = SQLiteHistoryStorage(os.path.join(history_path, "history.db"))
+        stats = migrate_json_to_sqlite(history_path, store)
+        if not stats["skipped"]:
+            logger.info(f"Imported JSON history into SQLite: {stats}")
+        return store
+    raise ValueError(f"Unknown storage backend: {backend}. Must be one of {', '.join(STORAGE_BACKENDS)}.")
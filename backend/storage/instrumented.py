@@ -0,0 +1,68 @@
+"""
+Instrumented storage wrapper for the Agentic Software-Development tool.
+This module times every history storage call for the metrics endpoint, and for the
+active run trace, without the backends having to know about it.
+"""
+import time
+import functools
+from backend.api.metrics import STORAGE_DURATION
+from backend.api.tracing import record_span
+
+# Storage operations that are timed; anything else is passed through untouched
+TIMED_OPERATIONS = frozenset({
+    "list_sessions", "list_session_activity", "get_session_entry", "count_sessions", "save_session_entry",
+    "load_session", "load_workflow", "save_workflow", "save_step", "load_summaries", "save_summary",
+    "save_trace", "list_traces", "load_trace"
+})
+
+
+class InstrumentedHistoryStorage:
+    """
+    Wraps a HistoryStorage backend and records each operation's duration.
+
+    Backend-specific methods and attributes are delegated unchanged.
+    """
+
+    def __init__(self, storage):
+        """
+        Initialize the wrapper.
+
+        Args:
+            storage (HistoryStorage): The backend to wrap
+        """
+        self.storage = storage
+        self.backend_name = getattr(storage, "metrics_name", type(storage).__name__)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.storage, name)
+        if name not in TIMED_OPERATIONS:
+            return attribute
+
+        @functools.wraps(attribute)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - started
+                STORAGE_DURATION.observe(duration, backend=self.backend_name, operation=name)
+                record_span(f"storage.{name}", "memory", duration, backend=self.backend_name)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        self.__dict__[name] = timed
+        return timed
+
+
+def instrument_storage(storage):
+    """
+    Wrap a storage backend for metrics unless it is already wrapped.
+
+    Args:
+        storage (HistoryStorage): The backend
+
+    Returns:
+        InstrumentedHistoryStorage: The wrapped backend
+    """
+    if isinstance(storage, InstrumentedHistoryStorage):
+        return storage
+    return InstrumentedHistoryStorage(storage)
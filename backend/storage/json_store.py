@@ -0,0 +1,442 @@
+"""
+JSON file storage backend for the Agentic Software-Development tool.
+This module keeps history in the original file layout under the history directory:
+session_index.json, session_<id>.json, session_<id>/workflow_<id>.json,
+session_<id>/traces_<workflow id>/<trace id>.json and workflow_summaries.json.
+
+Workflow and step writes are appended to a per-workflow journal,
+session_<id>/journal_<workflow id>.jsonl, and folded into the session and workflow
+files once the journal grows past a threshold, on close and on startup.
+"""
+import os
+import json
+import time
+import threading
+import logging
+from backend.storage.base import HistoryStorage
+from backend.api.metrics import STORAGE_BYTES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class JSONHistoryStorage(HistoryStorage):
+    """
+    History backend that stores each session and workflow as a JSON document.
+
+    Steps and workflow updates are appended to the workflow's journal, so a write
+    costs O(step size) rather than O(session size). Reads replay the journals over the
+    snapshot documents, and compaction folds a session's journals into them once any
+    of them reaches `compact_threshold` records. Journals are fsynced at most every
+    `fsync_interval` seconds: an append that comes sooner schedules a deferred sync, so
+    no write stays unsynced for much longer than that even if nothing follows it.
+    """
+
+    metrics_name = "json"
+
+    def __init__(self, history_path, compact_threshold=None, fsync_interval=None):
+        """
+        Initialize the JSON storage and recover any journals left by a previous run.
+
+        Args:
+            history_path (str): Directory holding the history files
+            compact_threshold (int, optional): Journal records before a session is compacted.
+                                               Defaults to AGENT_JOURNAL_COMPACT_STEPS or 100.
+            fsync_interval (float, optional): Seconds between journal fsyncs; 0 syncs every
+                                              write. Defaults to AGENT_JOURNAL_FSYNC_INTERVAL or 1.0.
+        """
+        self.history_path = history_path
+        os.makedirs(history_path, exist_ok=True)
+        self._summaries = None
+        
+        # Parsed session index with an ID -> position map, reloaded when the file changes
+        self._index = None
+        self._index_positions = {}
+        self._index_signature = None
+        self._index_lock = threading.RLock()
+        
+        self.compact_threshold = compact_threshold or int(os.environ.get("AGENT_JOURNAL_COMPACT_STEPS", "100"))
+        self.fsync_interval = fsync_interval if fsync_interval is not None else float(
+            os.environ.get("AGENT_JOURNAL_FSYNC_INTERVAL", "1.0")
+        )
+        
+        # Serializes journal appends with the reads and compactions that depend on them
+        self._journal_lock = threading.RLock()
+        self._journal_records = {}
+        self._unsynced = set()
+        self._last_sync = time.monotonic()
+        self._sync_timer = None
+        
+        recovered = self.compact()
+        if recovered:
+            logger.info(f"Replayed {recovered} workflow journals into {history_path}")
+
+    def get_index_file(self):
+        """Get the path to the session index file."""
+        return os.path.join(self.history_path, "session_index.json")
+
+    def get_session_file(self, session_id):
+        """Get the path to a session file."""
+        return os.path.join(self.history_path, f"session_{session_id}.json")
+
+    def get_workflow_file(self, session_id, workflow_id):
+        """Get the path to a workflow file."""
+        return os.path.join(self.history_path, f"session_{session_id}", f"workflow_{workflow_id}.json")
+
+    def get_journal_file(self, session_id, workflow_id):
+        """Get the path to a workflow's journal."""
+        return os.path.join(self.history_path, f"session_{session_id}", f"journal_{workflow_id}.jsonl")
+
+    def get_traces_dir(self, session_id, workflow_id):
+        """Get the directory holding a workflow's run traces."""
+        return os.path.join(self.history_path, f"session_{session_id}", f"traces_{workflow_id}")
+
+    def get_summaries_file(self):
+        """Get the path to the workflow summaries file."""
+        return os.path.join(self.history_path, "workflow_summaries.json")
+
+    def _read_json(self, path, default=None):
+        """Read a JSON file, returning default if it is missing or unreadable."""
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'r') as f:
+                data = f.read()
+            STORAGE_BYTES.inc(len(data), backend=self.metrics_name, direction="read")
+            return json.loads(data)
+        except Exception as e:
+            logger.error(f"Error reading {path}: {str(e)}")
+            return default
+
+    def _write_json(self, path, data, durable=False):
+        """
+        Write a JSON file atomically, creating its directory if needed.
+
+        Args:
+            path (str): The file path
+            data: JSON-serializable data
+            durable (bool): fsync the file before it replaces the old one
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(data)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        STORAGE_BYTES.inc(len(data), backend=self.metrics_name, direction="write")
+
+    def _append_journal(self, session_id, workflow_id, record):
+        """
+        Append a record to a workflow's journal, compacting it once it is long enough.
+
+        Args:
+            session_id (str): The session ID
+            workflow_id (str): The workflow ID
+            record (dict): {"workflow": metadata} or {"step": step}
+        """
+        path = self.get_journal_file(session_id, workflow_id)
+        line = json.dumps(record) + "\n"
+        with self._journal_lock:
+            if path not in self._journal_records:
+                self._journal_records[path] = len(self._read_journal(path)) if os.path.exists(path) else 0
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a') as f:
+                f.write(line)
+            STORAGE_BYTES.inc(len(line), backend=self.metrics_name, direction="write")
+            self._journal_records[path] += 1
+            self._unsynced.add(path)
+            
+            elapsed = time.monotonic() - self._last_sync
+            if elapsed >= self.fsync_interval:
+                self.sync()
+            elif self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.fsync_interval - elapsed, self._deferred_sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+            if self._journal_records[path] >= self.compact_threshold:
+                self.compact_session(session_id)
+
+    def _read_journal(self, path):
+        """
+        Read a journal's records, skipping a torn final line left by a crash.
+
+        Args:
+            path (str): The journal path
+
+        Returns:
+            list: The records in write order
+        """
+        try:
+            with open(path, 'r') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        STORAGE_BYTES.inc(len(data), backend=self.metrics_name, direction="read")
+        records = []
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping unreadable journal record in {path}")
+        return records
+
+    def _session_journals(self, session_id):
+        """Get {workflow_id: journal path} for a session's journals."""
+        directory = os.path.join(self.history_path, f"session_{session_id}")
+        if not os.path.isdir(directory):
+            return {}
+        return {
+            name[len("journal_"):-len(".jsonl")]: os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.startswith("journal_") and name.endswith(".jsonl")
+        }
+
+    def _apply_journal(self, session_data, workflow_id, records):
+        """
+        Apply journal records to a workflow in session data, creating it if needed.
+
+        Args:
+            session_data (dict): Session data to update in place
+            workflow_id (str): The workflow ID
+            records (list): Journal records
+
+        Returns:
+            dict: The updated workflow, or None if it exists nowhere
+        """
+        workflows = session_data.setdefault("workflows", [])
+        workflow = next((w for w in workflows if w.get("id") == workflow_id), None)
+        if workflow is None:
+            if not records:
+                return None
+            workflow = {"id": workflow_id, "steps": []}
+            workflows.append(workflow)
+        steps = workflow.setdefault("steps", [])
+        positions = {step.get("step_id"): i for i, step in enumerate(steps)}
+        for record in records:
+            if "workflow" in record:
+                workflow.update({key: value for key, value in record["workflow"].items() if key != "steps"})
+            if "step" in record:
+                step = record["step"]
+                position = positions.get(step.get("step_id"))
+                if position is None:
+                    positions[step.get("step_id")] = len(steps)
+                    steps.append(step)
+                else:
+                    steps[position] = {**steps[position], **step}
+        return workflow
+
+    def _replay_session(self, session_data, journals):
+        """
+        Apply a session's journals to its snapshot data.
+
+        Workflows that exist only in journals are appended in creation order.
+
+        Args:
+            session_data (dict): Session data to update in place
+            journals (dict): {workflow_id: journal path}
+        """
+        known = {workflow.get("id") for workflow in session_data.get("workflows", [])}
+        records = {workflow_id: self._read_journal(path) for workflow_id, path in journals.items()}
+
+        def created_at(workflow_id):
+            for record in records[workflow_id]:
+                if "workflow" in record:
+                    return record["workflow"].get("created_at") or 0
+            return 0
+
+        ordered = [wid for wid in records if wid in known]
+        ordered += sorted((wid for wid in records if wid not in known), key=created_at)
+        for workflow_id in ordered:
+            self._apply_journal(session_data, workflow_id, records[workflow_id])
+
+    def _deferred_sync(self):
+        """Run a sync scheduled by an append that came too soon after the last one."""
+        try:
+            self.sync()
+        except Exception as e:
+            logger.error(f"Deferred journal sync failed: {str(e)}", exc_info=True)
+
+    def sync(self):
+        """fsync every journal written since the last sync."""
+        with self._journal_lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            for path in self._unsynced:
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    continue
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            self._unsynced.clear()
+            self._last_sync = time.monotonic()
+
+    def compact_session(self, session_id):
+        """
+        Fold a session's journals into its session and workflow files and remove them.
+
+        The snapshots are made durable before the journals are removed, and replaying a
+        journal twice is harmless, so a crash at any point loses nothing.
+
+        Args:
+            session_id (str): The session ID
+        """
+        with self._journal_lock:
+            journals = self._session_journals(session_id)
+            if not journals:
+                return
+            session_data = self._read_json(self.get_session_file(session_id)) or {"id": session_id, "workflows": []}
+            self._replay_session(session_data, journals)
+            for workflow in session_data["workflows"]:
+                if workflow.get("id") in journals:
+                    self._write_json(self.get_workflow_file(session_id, workflow["id"]), workflow, durable=True)
+            self._write_json(self.get_session_file(session_id), session_data, durable=True)
+            for path in journals.values():
+                os.remove(path)
+                self._journal_records.pop(path, None)
+                self._unsynced.discard(path)
+
+    def compact(self):
+        """
+        Compact every journal in the history directory.
+
+        Returns:
+            int: Number of journals compacted
+        """
+        compacted = 0
+        with self._journal_lock:
+            for name in os.listdir(self.history_path):
+                if not name.startswith("session_") or not os.path.isdir(os.path.join(self.history_path, name)):
+                    continue
+                session_id = name[len("session_"):]
+                journals = len(self._session_journals(session_id))
+                if journals:
+                    self.compact_session(session_id)
+                    compacted += journals
+        return compacted
+
+    def _index_file_signature(self):
+        """Get the session index file's (mtime, size), or None if it does not exist."""
+        try:
+            stat = os.stat(self.get_index_file())
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_index(self):
+        """
+        Get the session index, re-reading the file only if it changed since it was cached.
+        Caller holds the index lock.
+        """
+        signature = self._index_file_signature()
+        if self._index is None or signature != self._index_signature:
+            index = self._read_json(self.get_index_file())
+            if not isinstance(index, dict) or "sessions" not in index:
+                index = {"sessions": []}
+            self._index = index
+            self._index_positions = {entry["id"]: i for i, entry in enumerate(index["sessions"])}
+            self._index_signature = signature
+        return self._index
+
+    def list_sessions(self):
+        with self._index_lock:
+            return list(self._load_index()["sessions"])
+
+    def get_session_entry(self, session_id):
+        with self._index_lock:
+            index = self._load_index()
+            position = self._index_positions.get(session_id)
+            return index["sessions"][position] if position is not None else None
+
+    def count_sessions(self):
+        with self._index_lock:
+            return len(self._load_index()["sessions"])
+
+    def save_session_entry(self, entry):
+        with self._index_lock:
+            index = self._load_index()
+            position = self._index_positions.get(entry["id"])
+            if position is None:
+                self._index_positions[entry["id"]] = len(index["sessions"])
+                index["sessions"].append(entry)
+            else:
+                index["sessions"][position] = entry
+            self._write_json(self.get_index_file(), index)
+            self._index_signature = self._index_file_signature()
+
+    def load_session(self, session_id):
+        with self._journal_lock:
+            session_data = self._read_json(self.get_session_file(session_id))
+            journals = self._session_journals(session_id)
+            if journals:
+                if session_data is None:
+                    session_data = {"id": session_id, "workflows": []}
+                self._replay_session(session_data, journals)
+            return session_data
+
+    def load_workflow(self, session_id, workflow_id):
+        with self._journal_lock:
+            workflow = self._read_json(self.get_workflow_file(session_id, workflow_id))
+            path = self.get_journal_file(session_id, workflow_id)
+            if not os.path.exists(path):
+                return workflow
+            session_data = {"workflows": [workflow] if workflow else []}
+            return self._apply_journal(session_data, workflow_id, self._read_journal(path))
+
+    def save_workflow(self, session_data, workflow):
+        session_file = self.get_session_file(session_data["id"])
+        if not os.path.exists(session_file):
+            self._write_json(session_file, {"id": session_data["id"], "name": session_data.get("name"), "workflows": []})
+        self._append_journal(session_data["id"], workflow["id"], {
+            "workflow": {key: value for key, value in workflow.items() if key != "steps"}
+        })
+
+    def save_step(self, session_data, workflow, step):
+        self._append_journal(session_data["id"], workflow["id"], {"step": step})
+
+    def load_summaries(self):
+        if self._summaries is None:
+            summaries = self._read_json(self.get_summaries_file(), {})
+            self._summaries = summaries if isinstance(summaries, dict) else {}
+        return dict(self._summaries)
+
+    def save_summary(self, workflow_id, summary):
+        if self._summaries is None:
+            self.load_summaries()
+        self._summaries[workflow_id] = summary
+        self._write_json(self.get_summaries_file(), self._summaries)
+
+    def _trace_files(self, session_id, workflow_id):
+        """Get a workflow's trace files, oldest first."""
+        directory = self.get_traces_dir(session_id, workflow_id)
+        if not os.path.isdir(directory):
+            return []
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+        return sorted(paths, key=os.path.getmtime)
+
+    def save_trace(self, session_id, workflow_id, trace, keep=50):
+        self._write_json(os.path.join(self.get_traces_dir(session_id, workflow_id), f"{trace['id']}.json"), trace)
+        paths = self._trace_files(session_id, workflow_id)
+        for path in paths[:max(len(paths) - keep, 0)]:
+            os.remove(path)
+
+    def list_traces(self, session_id, workflow_id):
+        traces = [self._read_json(path) for path in self._trace_files(session_id, workflow_id)]
+        return [trace for trace in traces if trace]
+
+    def load_trace(self, session_id, workflow_id, trace_id):
+        if os.path.basename(trace_id) != trace_id:
+            return None
+        return self._read_json(os.path.join(self.get_traces_dir(session_id, workflow_id), f"{trace_id}.json"))
+
+    def close(self):
+        self.sync()
+        self.compact()
@@ -0,0 +1,112 @@
+"""
+Migration module for the Agentic Software-Development tool.
+This module copies the JSON history tree into the SQLite storage backend.
+
+Usage:
+    python -m backend.storage.migrate [--history-path /host_home/.agent_history] [--db-path PATH] [--force]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from backend.storage.json_store import JSONHistoryStorage
+from backend.storage.sqlite_store import SQLiteHistoryStorage
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MIGRATION_KEY = "migrated_from_json"
+
+
+def _merge_workflow_files(json_store, session_id, session_data):
+    """
+    Prefer the per-workflow files where they hold more steps than the session file.
+
+    Args:
+        json_store (JSONHistoryStorage): The source storage
+        session_id (str): The session ID
+        session_data (dict): Session data loaded from session_<id>.json
+    """
+    for i, workflow in enumerate(session_data.get("workflows", [])):
+        workflow_data = json_store.load_workflow(session_id, workflow.get("id"))
+        if workflow_data and len(workflow_data.get("steps", [])) > len(workflow.get("steps", [])):
+            session_data["workflows"][i] = workflow_data
+
+
+def migrate_json_to_sqlite(history_path, sqlite_store, force=False):
+    """
+    Import every session, workflow, step and summary from the JSON tree.
+
+    The migration runs once per database; later calls are no-ops unless forced.
+    Imports are upserts, so re-running with force does not duplicate rows.
+
+    Args:
+        history_path (str): Directory holding the JSON history files
+        sqlite_store (SQLiteHistoryStorage): The destination storage
+        force (bool): Re-run even if the database was already migrated
+
+    Returns:
+        dict: Counts of migrated sessions, workflows, steps and summaries
+    """
+    stats = {"sessions": 0, "workflows": 0, "steps": 0, "summaries": 0, "skipped": False}
+    if sqlite_store.get_meta(MIGRATION_KEY) and not force:
+        stats["skipped"] = True
+        return stats
+
+    json_store = JSONHistoryStorage(history_path)
+    entries = {entry["id"]: entry for entry in json_store.list_sessions()}
+
+    # Pick up session files that never made it into the index
+    for filename in sorted(os.listdir(history_path)):
+        if filename.startswith("session_") and filename.endswith(".json") and filename != "session_index.json":
+            session_id = filename[len("session_"):-len(".json")]
+            if session_id not in entries:
+                entries[session_id] = {"id": session_id, "name": None, "created_at": None, "workflows": []}
+
+    for session_id, entry in entries.items():
+        session_data = json_store.load_session(session_id) or {"id": session_id, "workflows": []}
+        if not entry.get("name"):
+            entry["name"] = session_data.get("name") or f"Session {stats['sessions'] + 1}"
+        _merge_workflow_files(json_store, session_id, session_data)
+
+        sqlite_store.import_session(entry, session_data)
+        stats["sessions"] += 1
+        stats["workflows"] += len(session_data.get("workflows", []))
+        stats["steps"] += sum(len(w.get("steps", [])) for w in session_data.get("workflows", []))
+
+    summaries = json_store.load_summaries()
+    sqlite_store.import_summaries(summaries)
+    stats["summaries"] = len(summaries)
+
+    sqlite_store.set_meta(MIGRATION_KEY, json.dumps({"timestamp": time.time(), **stats}))
+    logger.info(f"Migrated JSON history from {history_path}: {stats}")
+    return stats
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Migrate JSON agent history into SQLite")
+    parser.add_argument("--history-path", default="/host_home/.agent_history")
+    parser.add_argument("--db-path", default=None, help="Defaults to <history-path>/history.db")
+    parser.add_argument("--force", action="store_true", help="Re-run even if already migrated")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    store = SQLiteHistoryStorage(args.db_path or os.path.join(args.history_path, "history.db"))
+    try:
+        stats = migrate_json_to_sqlite(args.history_path, store, force=args.force)
+    finally:
+        store.close()
+
+    if stats["skipped"]:
+        print("Database already migrated; use --force to re-run")
+    else:
+        print(f"Migrated {stats['sessions']} sessions, {stats['workflows']} workflows, "
+              f"{stats['steps']} steps and {stats['summaries']} summaries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
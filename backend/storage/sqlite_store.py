@@ -0,0 +1,382 @@
+"""
+SQLite storage backend for the Agentic Software-Development tool.
+This module stores history in a single WAL-mode SQLite database so appending a step is
+a single-row insert and session/workflow lookups are indexed queries.
+"""
+import os
+import json
+import sqlite3
+import threading
+import contextlib
+import logging
+from backend.storage.base import HistoryStorage
+from backend.api.metrics import STORAGE_BYTES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS workflows (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    task TEXT,
+    created_at REAL,
+    UNIQUE (session_id, id)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    step_id INTEGER,
+    human TEXT,
+    ai TEXT,
+    timestamp REAL,
+    UNIQUE (session_id, workflow_id, step_id)
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    workflow_id TEXT PRIMARY KEY,
+    name TEXT,
+    task TEXT,
+    summary TEXT,
+    timestamp REAL
+);
+CREATE TABLE IF NOT EXISTS traces (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    session_id TEXT NOT NULL,
+    workflow_id TEXT NOT NULL,
+    started_at REAL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_workflows_session ON workflows (session_id, seq);
+CREATE INDEX IF NOT EXISTS idx_steps_workflow ON steps (session_id, workflow_id, seq);
+CREATE INDEX IF NOT EXISTS idx_traces_workflow ON traces (session_id, workflow_id, seq);
+"""
+
+
+def _text_bytes(*values):
+    """Count the UTF-8 bytes of the text columns of a row."""
+    return sum(len(value.encode("utf-8")) for value in values if isinstance(value, str))
+
+
+class SQLiteHistoryStorage(HistoryStorage):
+    """
+    History backend backed by SQLite in WAL mode.
+
+    Each storage call borrows a connection from a small pool and returns it when done,
+    so short-lived request threads do not each keep one open. WAL lets readers proceed
+    while a writer commits.
+    """
+
+    metrics_name = "sqlite"
+
+    def __init__(self, db_path, pool_size=None):
+        """
+        Initialize the SQLite storage and create the schema if needed.
+
+        Args:
+            db_path (str): Path to the database file
+            pool_size (int, optional): Idle connections kept for reuse; more are opened
+                                       under load and closed when returned. Defaults to
+                                       AGENT_SQLITE_POOL_SIZE or 8.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.pool_size = pool_size or int(os.environ.get("AGENT_SQLITE_POOL_SIZE", "8"))
+        self._idle = []
+        self._pool_lock = threading.Lock()
+        self._closed = False
+
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+        logger.info(f"SQLite history storage opened at {db_path}")
+
+    def _open(self):
+        """Open a new connection."""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=OFF")
+        return conn
+
+    @contextlib.contextmanager
+    def _connection(self):
+        """Borrow a connection for one storage call, returning it to the pool afterwards."""
+        with self._pool_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._pool_lock:
+                if not self._closed and len(self._idle) < self.pool_size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def _session_entry(self, row):
+        """Convert a sessions row to an index entry."""
+        return {"id": row["id"], "name": row["name"], "created_at": row["created_at"], "workflows": []}
+
+    def _step(self, row):
+        """Convert a steps row to a step dict."""
+        STORAGE_BYTES.inc(_text_bytes(row["human"], row["ai"]), backend=self.metrics_name, direction="read")
+        return {"step_id": row["step_id"], "human": row["human"], "ai": row["ai"], "timestamp": row["timestamp"]}
+
+    def _workflow(self, row, steps):
+        """Convert a workflows row and its steps to a workflow dict."""
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "task": row["task"],
+            "created_at": row["created_at"],
+            "steps": steps
+        }
+
+    def list_sessions(self):
+        with self._connection() as conn:
+            rows = conn.execute("SELECT id, name, created_at FROM sessions ORDER BY seq").fetchall()
+        return [self._session_entry(row) for row in rows]
+
+    def get_session_entry(self, session_id):
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT id, name, created_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        return self._session_entry(row) if row else None
+
+    def count_sessions(self):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def save_session_entry(self, entry):
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO sessions (id, name, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, created_at = excluded.created_at",
+                    (entry["id"], entry.get("name"), entry.get("created_at"))
+                )
+
+    def list_session_activity(self):
+        with self._connection() as conn:
+            workflows = {}
+            last_step = {}
+            for row in conn.execute("SELECT session_id, id, name, created_at FROM workflows ORDER BY seq"):
+                workflows.setdefault(row["session_id"], []).append(
+                    {"id": row["id"], "name": row["name"], "created_at": row["created_at"]}
+                )
+            for row in conn.execute("SELECT session_id, MAX(timestamp) AS last FROM steps GROUP BY session_id"):
+                last_step[row["session_id"]] = row["last"]
+
+            entries = []
+            for row in conn.execute("SELECT id, name, created_at FROM sessions ORDER BY seq"):
+                session_workflows = workflows.get(row["id"], [])
+                timestamps = [row["created_at"] or 0, last_step.get(row["id"]) or 0]
+                timestamps.extend(workflow["created_at"] or 0 for workflow in session_workflows)
+                entries.append({
+                    "id": row["id"],
+                    "name": row["name"],
+                    "created_at": row["created_at"],
+                    "last_activity": max(timestamps),
+                    "workflows": session_workflows
+                })
+            return entries
+
+    def load_session(self, session_id):
+        with self._connection() as conn:
+            session = conn.execute("SELECT id, name FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            workflow_rows = conn.execute(
+                "SELECT id, name, task, created_at FROM workflows WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+            if session is None and not workflow_rows:
+                return None
+
+            steps_by_workflow = {}
+            for row in conn.execute(
+                "SELECT workflow_id, step_id, human, ai, timestamp FROM steps WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            ):
+                steps_by_workflow.setdefault(row["workflow_id"], []).append(self._step(row))
+
+            return {
+                "id": session_id,
+                "name": session["name"] if session else None,
+                "workflows": [self._workflow(row, steps_by_workflow.get(row["id"], [])) for row in workflow_rows]
+            }
+
+    def load_workflow(self, session_id, workflow_id):
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT id, name, task, created_at FROM workflows WHERE session_id = ? AND id = ?",
+                (session_id, workflow_id)
+            ).fetchone()
+            if row is None:
+                return None
+            steps = [self._step(step) for step in conn.execute(
+                "SELECT step_id, human, ai, timestamp FROM steps WHERE session_id = ? AND workflow_id = ? ORDER BY seq",
+                (session_id, workflow_id)
+            )]
+            return self._workflow(row, steps)
+
+    def save_workflow(self, session_data, workflow):
+        with self._connection() as conn:
+            with conn:
+                self._upsert_workflow(conn, session_data["id"], workflow)
+
+    def _upsert_workflow(self, conn, session_id, workflow):
+        """Insert or update a workflow row."""
+        conn.execute(
+            "INSERT INTO workflows (session_id, id, name, task, created_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (session_id, id) DO UPDATE SET name = excluded.name, task = excluded.task",
+            (session_id, workflow["id"], workflow.get("name"), workflow.get("task"), workflow.get("created_at"))
+        )
+
+    def save_step(self, session_data, workflow, step):
+        with self._connection() as conn:
+            with conn:
+                self._upsert_step(conn, session_data["id"], workflow["id"], step)
+
+    def _upsert_step(self, conn, session_id, workflow_id, step):
+        """Insert or update a step row."""
+        STORAGE_BYTES.inc(_text_bytes(step.get("human"), step.get("ai")), backend=self.metrics_name, direction="write")
+        conn.execute(
+            "INSERT INTO steps (session_id, workflow_id, step_id, human, ai, timestamp) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (session_id, workflow_id, step_id) DO UPDATE SET human = excluded.human, ai = excluded.ai",
+            (session_id, workflow_id, step.get("step_id"), step.get("human"), step.get("ai"), step.get("timestamp"))
+        )
+
+    def load_summaries(self):
+        with self._connection() as conn:
+            rows = conn.execute("SELECT workflow_id, name, task, summary, timestamp FROM summaries").fetchall()
+        return {
+            row["workflow_id"]: {
+                "name": row["name"],
+                "task": row["task"],
+                "summary": row["summary"],
+                "timestamp": row["timestamp"]
+            }
+            for row in rows
+        }
+
+    def save_summary(self, workflow_id, summary):
+        with self._connection() as conn:
+            with conn:
+                self._upsert_summary(conn, workflow_id, summary)
+
+    def _upsert_summary(self, conn, workflow_id, summary):
+        """Insert or update a summary row."""
+        STORAGE_BYTES.inc(_text_bytes(summary.get("summary")), backend=self.metrics_name, direction="write")
+        conn.execute(
+            "INSERT INTO summaries (workflow_id, name, task, summary, timestamp) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (workflow_id) DO UPDATE SET name = excluded.name, task = excluded.task, "
+            "summary = excluded.summary, timestamp = excluded.timestamp",
+            (workflow_id, summary.get("name"), summary.get("task"), summary.get("summary"), summary.get("timestamp"))
+        )
+
+    def save_trace(self, session_id, workflow_id, trace, keep=50):
+        data = json.dumps(trace)
+        STORAGE_BYTES.inc(len(data), backend=self.metrics_name, direction="write")
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO traces (id, session_id, workflow_id, started_at, data) VALUES (?, ?, ?, ?, ?)",
+                    (trace["id"], session_id, workflow_id, trace.get("started_at"), data)
+                )
+                conn.execute(
+                    "DELETE FROM traces WHERE session_id = ? AND workflow_id = ? AND seq NOT IN ("
+                    "SELECT seq FROM traces WHERE session_id = ? AND workflow_id = ? ORDER BY seq DESC LIMIT ?)",
+                    (session_id, workflow_id, session_id, workflow_id, keep)
+                )
+
+    def list_traces(self, session_id, workflow_id):
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT data FROM traces WHERE session_id = ? AND workflow_id = ? ORDER BY seq",
+                (session_id, workflow_id)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def load_trace(self, session_id, workflow_id, trace_id):
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM traces WHERE session_id = ? AND workflow_id = ? AND id = ?",
+                (session_id, workflow_id, trace_id)
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def get_meta(self, key):
+        """Get a value from the meta table, or None."""
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key, value):
+        """Set a value in the meta table."""
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    (key, value)
+                )
+
+    def import_session(self, entry, session_data):
+        """
+        Bulk-import a session, its workflows and steps in one transaction.
+
+        Args:
+            entry (dict): The session index entry
+            session_data (dict, optional): Full session data with workflows and steps
+        """
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO sessions (id, name, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, created_at = excluded.created_at",
+                    (entry["id"], entry.get("name"), entry.get("created_at"))
+                )
+                for workflow in (session_data or {}).get("workflows", []):
+                    self._upsert_workflow(conn, entry["id"], workflow)
+                    for step in workflow.get("steps", []):
+                        self._upsert_step(conn, entry["id"], workflow["id"], step)
+
+    def import_summaries(self, summaries):
+        """
+        Bulk-import workflow summaries in one transaction.
+
+        Args:
+            summaries (dict): Summaries keyed by workflow ID
+        """
+        with self._connection() as conn:
+            with conn:
+                for workflow_id, summary in summaries.items():
+                    self._upsert_summary(conn, workflow_id, summary)
+
+    def close(self):
+        with self._pool_lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        # Connections still borrowed are closed when they are returned
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
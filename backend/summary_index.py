@@ -0,0 +1,132 @@
+"""
+Summary index module for the Agentic Software-Development tool.
+This module ranks previous workflow summaries by relevance to a new task with an
+incrementally updated BM25 inverted index, so only the most useful context is injected
+into a workflow's memory. It runs fully offline.
+"""
+import math
+import re
+import threading
+from collections import Counter
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# Common words that carry no signal for matching tasks
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have how i in is it its me my of on or
+please so that the this to was we were what when where which will with you your
+""".split())
+
+
+def tokenize(text):
+    """
+    Split text into lowercase index terms.
+
+    Args:
+        text (str): The text to tokenize
+
+    Returns:
+        list: Terms with stopwords and single characters removed
+    """
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class SummaryIndex:
+    """
+    BM25 index over workflow summaries keyed by workflow ID.
+
+    Documents can be added or replaced one at a time; scores are computed from the
+    postings at query time, so no rebuild is needed as summaries arrive.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1 (float): BM25 term frequency saturation
+            b (float): BM25 length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._doc_terms = {}
+        self._doc_len = {}
+        self._total_len = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def add(self, doc_id, text):
+        """
+        Add or replace a document.
+
+        Args:
+            doc_id (str): The document ID (workflow ID)
+            text (str): The text to index
+        """
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            self._doc_terms[doc_id] = list(terms)
+            self._doc_len[doc_id] = sum(terms.values())
+            self._total_len += self._doc_len[doc_id]
+
+    def remove(self, doc_id):
+        """
+        Remove a document if present.
+
+        Args:
+            doc_id (str): The document ID
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        """Remove a document. Caller holds the lock."""
+        if doc_id not in self._doc_len:
+            return
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def search(self, query, top_k=5, exclude=None):
+        """
+        Rank documents against a query.
+
+        Args:
+            query (str): The query text
+            top_k (int): Maximum number of results
+            exclude (iterable, optional): Document IDs to leave out
+
+        Returns:
+            list: (doc_id, score) tuples, best first
+        """
+        exclude = set(exclude or ())
+        query_terms = set(tokenize(query))
+        with self._lock:
+            num_docs = len(self._doc_len)
+            if not num_docs or not query_terms:
+                return []
+            avg_len = self._total_len / num_docs or 1.0
+
+            scores = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if doc_id in exclude:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
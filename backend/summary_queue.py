@@ -0,0 +1,184 @@
+"""
+Summarization queue module for the Agentic Software-Development tool.
+This module runs workflow summarization on background worker threads so requests that
+evict a workflow from buffer memory never wait on the summary LLM call.
+"""
+import queue
+import threading
+import time
+import logging
+from backend.api.metrics import SUMMARY_DURATION
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SummarizationJob:
+    """A pending summarization of one workflow."""
+
+    def __init__(self, workflow_id, session_id=None):
+        self.workflow_id = workflow_id
+        self.session_id = session_id
+        self.attempts = 0
+        self.enqueued_at = time.time()
+
+
+class SummarizationQueue:
+    """
+    Bounded, deduplicating background queue for workflow summarization.
+
+    Jobs for a workflow that is already queued or running are ignored. Failed jobs are
+    retried with linear backoff up to max_retries times.
+    """
+
+    def __init__(self, summarize_fn, max_size=100, max_retries=3, retry_delay=5.0, num_workers=1):
+        """
+        Initialize the queue and start its worker threads.
+
+        Args:
+            summarize_fn (callable): Called as summarize_fn(workflow_id, session_id); raises on failure
+            max_size (int): Maximum number of queued jobs
+            max_retries (int): Retries after the first failed attempt
+            retry_delay (float): Seconds before the first retry; later retries wait longer
+            num_workers (int): Number of worker threads
+        """
+        self.summarize_fn = summarize_fn
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=max_size)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # Stats
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.deduplicated = 0
+        self.in_flight = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.last_run_seconds = None
+
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(target=self._worker, name=f"summarizer-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, workflow_id, session_id=None):
+        """
+        Queue a workflow for summarization.
+
+        Args:
+            workflow_id (str): The workflow ID to summarize
+            session_id (str, optional): The session most likely to contain the workflow
+
+        Returns:
+            bool: True if the job was queued, False if it was a duplicate or the queue is full
+        """
+        with self._lock:
+            if self._stopped:
+                return False
+            if workflow_id in self._pending:
+                self.deduplicated += 1
+                return False
+            try:
+                self._queue.put_nowait(SummarizationJob(workflow_id, session_id))
+            except queue.Full:
+                self.dropped += 1
+                logger.warning(f"Summarization queue full, dropping workflow {workflow_id}")
+                return False
+            self._pending.add(workflow_id)
+            self.submitted += 1
+        logger.info(f"Queued workflow {workflow_id} for summarization")
+        return True
+
+    def _requeue(self, job):
+        """Put a job back on the queue for another attempt."""
+        with self._lock:
+            if self._stopped:
+                self._pending.discard(job.workflow_id)
+                return
+            try:
+                self._queue.put_nowait(job)
+                self.retried += 1
+            except queue.Full:
+                self._pending.discard(job.workflow_id)
+                self.dropped += 1
+                logger.warning(f"Summarization queue full, dropping retry of workflow {job.workflow_id}")
+
+    def _worker(self):
+        """Process jobs until stopped."""
+        while not self._stopped:
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            job.attempts += 1
+            with self._lock:
+                self.in_flight += 1
+            started = time.time()
+            try:
+                self.summarize_fn(job.workflow_id, job.session_id)
+            except Exception as e:
+                SUMMARY_DURATION.observe(time.time() - started, status="error")
+                with self._lock:
+                    self.in_flight -= 1
+                if job.attempts <= self.max_retries:
+                    delay = self.retry_delay * job.attempts
+                    logger.warning(f"Summarizing workflow {job.workflow_id} failed (attempt {job.attempts}), "
+                                   f"retrying in {delay:.1f}s: {str(e)}")
+                    timer = threading.Timer(delay, self._requeue, args=(job,))
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    logger.error(f"Giving up on summarizing workflow {job.workflow_id} after {job.attempts} attempts: {str(e)}")
+                    with self._lock:
+                        self.failed += 1
+                        self._pending.discard(job.workflow_id)
+                continue
+
+            finished = time.time()
+            SUMMARY_DURATION.observe(finished - started, status="ok")
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self._pending.discard(job.workflow_id)
+                self.last_run_seconds = finished - started
+                self.last_latency = finished - job.enqueued_at
+                self.total_latency += self.last_latency
+                self.max_latency = max(self.max_latency, self.last_latency)
+
+    def get_stats(self):
+        """
+        Get queue depth and job latency.
+
+        Returns:
+            dict: Queue counters; latencies are seconds from submission to completion
+        """
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "pending": len(self._pending),
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "deduplicated": self.deduplicated,
+                "last_latency_seconds": round(self.last_latency, 3) if self.last_latency is not None else None,
+                "avg_latency_seconds": round(self.total_latency / self.completed, 3) if self.completed else None,
+                "max_latency_seconds": round(self.max_latency, 3),
+                "last_run_seconds": round(self.last_run_seconds, 3) if self.last_run_seconds is not None else None
+            }
+
+    def stop(self):
+        """Stop accepting jobs and let the workers exit after their current job."""
+        with self._lock:
+            self._stopped = True
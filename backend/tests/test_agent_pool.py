@@ -0,0 +1,45 @@
+"""
+Tests for AgentPool: agents are built outside the pool lock and pooled once per workflow.
+"""
+import threading
+from types import SimpleNamespace
+from backend.api import agent_pool as agent_pool_module
+from backend.api.agent_pool import AgentPool
+
+
+class _Memories:
+    def get_memory_for_llm(self, workflow_id):
+        return f"memory-{workflow_id}"
+
+
+def test_agents_are_built_outside_the_pool_lock(monkeypatch):
+    pool = AgentPool(tools=[], memory_manager=_Memories(), llm_config={"name": "first"})
+    started = threading.Event()
+    release = threading.Event()
+    built = []
+
+    def create_agent(tools, memory, llm_config):
+        assert not pool._lock.locked()
+        built.append(llm_config["name"])
+        started.set()
+        release.wait(5)
+        return SimpleNamespace(memory=memory, llm_config=llm_config)
+
+    monkeypatch.setattr(agent_pool_module, "create_agent", create_agent)
+    thread = threading.Thread(target=pool._get_entry, args=("w1",))
+    thread.start()
+    assert started.wait(5)
+
+    # Other workflows and the stats are not blocked by the build
+    assert pool.get_stats()["size"] == 0
+    pool.reconfigure({"name": "second"})
+    release.set()
+    thread.join(5)
+
+    # The agent built for the old configuration is not pooled
+    assert pool.get_stats()["size"] == 0
+    with pool.lease("w1") as agent:
+        assert agent.llm_config["name"] == "second"
+        assert agent.memory == "memory-w1"
+    assert built == ["first", "second"]
+    assert pool.get_stats()["size"] == 1
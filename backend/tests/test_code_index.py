@@ -0,0 +1,116 @@
+"""
+Tests for the trigram code index: indexed regex searches must find exactly what a
+plain re scan of the tree finds.
+"""
+import os
+import re
+import pytest
+from backend.tools.code_index import CodeIndex, regex_literals
+
+FILES = {
+    "a.py": "class Shell:\n    def run(self, command):\n        return self.execute(command)\n",
+    "b.py": "xyz = 1\nabcabcxyz = 2\n",
+    "c.txt": "just xyz here\nfoooobar\n",
+    "d.js": "function handler(name) {\n  return hello(name);\n}\n",
+    "sub/e.py": "def helper(self):\n    pass\n# TODO: remove foobar\n",
+    "sub/f.md": "Hello World\nabc then xyz\n",
+}
+
+PATTERNS = [
+    r"(abc)*xyz",
+    r"(?:self)",
+    r"(?P<name>xyz)",
+    r"(?i)hello",
+    r"(?=abc)abcxyz",
+    r"(?<!abc)xyz",
+    r"foo+bar",
+    r"def (\w+)\(self",
+    r"(abc)?xyz",
+    r"x(abc)+",
+    r"[^]x]yz",
+    r"a.c",
+    r"return (self|hello)",
+    r"TODO:\s+\w+",
+    r"(?P<word>xyz) = \d",
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path, content in FILES.items():
+        full_path = tmp_path / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+    return tmp_path
+
+
+def _re_matches(pattern):
+    compiled = re.compile(pattern, re.IGNORECASE)
+    matches = set()
+    for path, content in FILES.items():
+        for number, line in enumerate(content.splitlines()):
+            if compiled.search(line):
+                matches.add((os.path.normpath(path), number + 1))
+    return matches
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_regex_search_matches_plain_re(tree, pattern):
+    index = CodeIndex(root=str(tree))
+    index.refresh()
+    result = index.search(pattern, regex=True, max_results=1000, max_per_file=1000)
+    found = {(item["file"], item["line"]) for item in result["results"]}
+    assert found == _re_matches(pattern)
+
+
+def test_literal_search_matches_plain_re(tree):
+    index = CodeIndex(root=str(tree))
+    index.refresh()
+    result = index.search("xyz", max_results=1000, max_per_file=1000)
+    found = {(item["file"], item["line"]) for item in result["results"]}
+    assert found == _re_matches("xyz")
+
+
+def test_index_narrows_candidates(tree):
+    index = CodeIndex(root=str(tree))
+    index.refresh()
+    result = index.search("handler", regex=True)
+    assert result["files_scanned"] == 1
+
+
+@pytest.mark.parametrize("pattern, literals", [
+    (r"(abc)*xyz", ["xyz"]),
+    (r"(?:self)", ["self"]),
+    (r"(?P<name>xyz)", ["xyz"]),
+    (r"(?=abc)def", ["def"]),
+    (r"(abc)?defg{2}", ["def"]),
+    (r"foo|bar", []),
+    (r"(?x)a b c", []),
+    (r"(?P=name)abc", []),
+])
+def test_regex_literals(pattern, literals):
+    assert regex_literals(pattern) == literals
+
+
+def test_search_does_not_wait_for_a_walk(tree):
+    index = CodeIndex(root=str(tree), refresh_interval=60)
+    # Simulate a long walk in progress
+    index._refresh_lock.acquire()
+    try:
+        result = index.search("xyz")
+        assert result["index_building"] is True
+        assert result["results"] == []
+        assert index.candidate_files(["xyz"]) is None
+
+        # Writes made during the walk are queued instead of waiting for it
+        index.update_file("b.py")
+        assert "b.py" not in index.files
+    finally:
+        index._refresh_lock.release()
+
+    index.refresh()
+    assert "b.py" in index.files
+    result = index.search("xyz")
+    assert result["index_building"] is False
+    assert result["total_matches"] == len(_re_matches("xyz"))
+    index.stop()
@@ -0,0 +1,59 @@
+"""
+Tests for the command executor: head/tail output capping and timeouts.
+"""
+import time
+import pytest
+from backend.tools.executor import HeadTailBuffer, run_command, TIMEOUT_EXIT_CODE
+
+
+def test_buffer_keeps_everything_under_the_cap():
+    buffer = HeadTailBuffer(10)
+    buffer.write(b"hello")
+    buffer.write(b"\xc3")
+    buffer.write(b"\xa9")
+    assert not buffer.truncated
+    assert buffer.getvalue() == "helloé"
+
+
+@pytest.mark.parametrize("chunks", [
+    [b"0123456789abcdefghij"],
+    [bytes([byte]) for byte in b"0123456789abcdefghij"],
+    [b"0123", b"456789abcdefg", b"hij"],
+])
+def test_buffer_keeps_head_and_tail(chunks):
+    buffer = HeadTailBuffer(8)
+    for chunk in chunks:
+        buffer.write(chunk)
+    assert buffer.total_bytes == 20
+    assert buffer.truncated
+    assert buffer.omitted_bytes == 12
+    assert buffer.getvalue() == "0123\n[... 12 bytes truncated ...]\nghij"
+
+
+def test_run_command_caps_output_and_streams_it():
+    streamed = []
+    result = run_command("seq 1 20000; echo oops >&2; exit 3", cwd="/tmp", max_output_bytes=64,
+                         on_output=lambda stream, text: streamed.append((stream, text)))
+    assert result["exit_code"] == 3
+    assert result["truncated"]
+    assert result["stdout"].startswith("1\n2\n3\n")
+    assert result["stdout"].endswith("19999\n20000\n")
+    assert result["stdout_bytes"] == len("".join(f"{i}\n" for i in range(1, 20001)))
+    assert result["stderr"] == "oops\n"
+    assert "".join(text for stream, text in streamed if stream == "stdout").endswith("20000\n")
+
+
+def test_run_command_wall_timeout_kills_the_process_group():
+    started = time.time()
+    result = run_command("sleep 30 & sleep 30", cwd="/tmp", timeout=0.5, idle_timeout=10)
+    assert time.time() - started < 10
+    assert result["exit_code"] == TIMEOUT_EXIT_CODE
+    assert result["timed_out"] == "wall"
+    assert "exceeded 0.5s time limit" in result["stderr"]
+
+
+def test_run_command_idle_timeout():
+    result = run_command("echo start; sleep 30", cwd="/tmp", timeout=10, idle_timeout=0.5)
+    assert result["timed_out"] == "idle"
+    assert result["stdout"] == "start\n"
+    assert "no output for 0.5s" in result["stderr"]
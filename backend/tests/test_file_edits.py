@@ -0,0 +1,116 @@
+"""
+Tests for the file edit helpers behind the CodeEditor tool.
+"""
+import pytest
+from backend.tools.file_edits import EditError, read_range, apply_replacements, insert_lines, \
+    apply_unified_diff, changed_line_ranges
+
+CONTENT = "one\ntwo\nthree\nfour\nfive\n"
+
+
+def test_apply_patch():
+    patch = "--- a/f.txt\n+++ b/f.txt\n@@ -2,2 +2,2 @@\n two\n-three\n+THREE\n"
+    assert apply_unified_diff(CONTENT, patch) == "one\ntwo\nTHREE\nfour\nfive\n"
+
+
+def test_apply_patch_multiple_hunks():
+    patch = "@@ -1,1 +1,2 @@\n one\n+one and a half\n@@ -4,1 +5,1 @@\n-four\n+FOUR\n"
+    assert apply_unified_diff(CONTENT, patch) == "one\none and a half\ntwo\nthree\nFOUR\nfive\n"
+
+
+def test_apply_patch_with_stale_line_numbers():
+    # The hunk claims line 1 but its context is at line 4
+    patch = "@@ -1,2 +1,2 @@\n four\n-five\n+FIVE\n"
+    assert apply_unified_diff(CONTENT, patch) == "one\ntwo\nthree\nfour\nFIVE\n"
+
+
+def test_apply_patch_rejects_hunk_that_does_not_match():
+    patch = "@@ -2,1 +2,1 @@\n-not in the file\n+x\n"
+    with pytest.raises(EditError):
+        apply_unified_diff(CONTENT, patch)
+
+
+def test_apply_patch_rejects_patch_without_hunks():
+    with pytest.raises(EditError):
+        apply_unified_diff(CONTENT, "just text\n")
+
+
+def test_apply_patch_keeps_crlf():
+    content = CONTENT.replace("\n", "\r\n")
+    patch = "@@ -2,1 +2,1 @@\n-two\n+TWO\n"
+    assert apply_unified_diff(content, patch) == "one\r\nTWO\r\nthree\r\nfour\r\nfive\r\n"
+
+
+def test_replace_keeps_crlf():
+    content = "one\r\ntwo\r\nthree\r\n"
+    assert apply_replacements(content, [{"search": "two", "replace": "TWO"}]) == "one\r\nTWO\r\nthree\r\n"
+    # Multi-line search and replace texts written with \n match and produce CRLF
+    edits = [{"search": "one\ntwo", "replace": "1\n2\n2.5"}]
+    assert apply_replacements(content, edits) == "1\r\n2\r\n2.5\r\nthree\r\n"
+
+
+def test_replace_requires_unique_match():
+    with pytest.raises(EditError):
+        apply_replacements("a\na\n", [{"search": "a", "replace": "b"}])
+    assert apply_replacements("a\na\n", [{"search": "a", "replace": "b", "all": True}]) == "b\nb\n"
+
+
+def test_replace_missing_search_text():
+    with pytest.raises(EditError):
+        apply_replacements(CONTENT, [{"search": "six", "replace": "6"}])
+
+
+def test_insert_keeps_crlf():
+    assert insert_lines("a\r\nb\r\n", 2, "x\n") == "a\r\nx\r\nb\r\n"
+
+
+def test_insert_rejects_out_of_range_line():
+    with pytest.raises(EditError):
+        insert_lines(CONTENT, 7, "x")
+
+
+def test_read_line_range():
+    selection = read_range(CONTENT, start_line=2, end_line=3)
+    assert selection["content"] == "two\nthree\n"
+    assert selection["total_lines"] == 5
+
+
+def test_read_byte_range_counts_raw_bytes():
+    data = "one\r\ntwo\r\nthree\r\n".encode("utf-8")
+    selection = read_range(data, offset=5, length=5)
+    assert selection["content"] == "two\r\n"
+    assert selection["total_bytes"] == 17
+    assert selection["total_lines"] == 3
+
+
+def test_changed_line_ranges():
+    assert changed_line_ranges(CONTENT, CONTENT.replace("three", "THREE")) == [(3, 3)]
+
+
+def test_form_feeds_and_unicode_separators_stay_inside_lines():
+    content = 'a = 1\n\x0c\nb = "x y\x85z\x1c"\n'
+    assert insert_lines(content, 1, "import os\n") == "import os\n" + content
+    patch = "@@ -1,1 +1,1 @@\n-a = 1\n+a = 2\n"
+    assert apply_unified_diff(content, patch) == content.replace("a = 1", "a = 2")
+    assert read_range(content, start_line=3)["content"] == 'b = "x y\x85z\x1c"\n'
+
+
+def test_mixed_line_endings_are_kept_per_line():
+    content = "x\r\ny\nz\n"
+    assert apply_unified_diff(content, "@@ -2,1 +2,1 @@\n-y\n+Y\n") == "x\r\nY\nz\n"
+    assert insert_lines(content, 3, "w\n") == "x\r\ny\nw\nz\n"
+
+
+def test_patch_controls_final_newline():
+    removes = "@@ -1,2 +1,2 @@\n a\n-b\n+c\n\\ No newline at end of file\n"
+    assert apply_unified_diff("a\nb\n", removes) == "a\nc"
+    adds = "@@ -1,2 +1,2 @@\n a\n-b\n\\ No newline at end of file\n+c\n"
+    assert apply_unified_diff("a\nb", adds) == "a\nc\n"
+    # Without a marker the file keeps its final newline state
+    assert apply_unified_diff("a\nb", "@@ -1,2 +1,2 @@\n a\n-b\n+c\n") == "a\nc"
+
+
+def test_insert_at_end_takes_final_newline_from_text():
+    assert insert_lines("a\n", 2, "x") == "a\nx"
+    assert insert_lines("a", 2, "x\n") == "a\nx\n"
+    assert insert_lines("", 1, "x\n") == "x\n"
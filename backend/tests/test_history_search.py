@@ -0,0 +1,51 @@
+"""
+Tests for the full-text history search index: matching, ranking and safe highlights.
+"""
+import pytest
+from backend.history_search import HistorySearchIndex, build_match_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = HistorySearchIndex(str(tmp_path / "search.db"))
+    yield index
+    index.close()
+
+
+def test_build_match_query():
+    assert build_match_query("") == ""
+    assert build_match_query("  !!  ") == ""
+    assert build_match_query('fix "login" bug') == '"fix" "login" "bug"*'
+
+
+def test_every_term_must_match_and_the_last_is_a_prefix(index):
+    index.index_workflow("s1", {"id": "w1", "name": "Fix login bug", "task": "users cannot sign in"})
+    index.index_step("s1", "w2", {"step_id": 0, "human": "refactor the login form", "ai": "done", "timestamp": 1})
+
+    assert {hit["workflow_id"] for hit in index.search("login")["hits"]} == {"w1", "w2"}
+    assert [hit["workflow_id"] for hit in index.search("login bu")["hits"]] == ["w1"]
+    assert index.search("login", workflow_id="w2")["total"] == 1
+    assert index.search("nothing here")["total"] == 0
+
+    # Re-indexing a step replaces it
+    index.index_step("s1", "w2", {"step_id": 0, "human": "rename a variable", "ai": "done", "timestamp": 2})
+    assert [hit["workflow_id"] for hit in index.search("login")["hits"]] == ["w1"]
+
+
+def test_highlights_escape_user_text(index):
+    index.index_step("s1", "w1", {
+        "step_id": 0,
+        "human": "why does <script>alert('x')</script> render & break the page?",
+        "ai": "the \x02 sentinel \x03 characters are not marks",
+        "timestamp": 1
+    })
+
+    hit = index.search("script")["hits"][0]
+    human = hit["highlights"]["human"]
+    assert "<script>" not in human
+    assert "&lt;<mark>script</mark>&gt;alert(&#x27;x&#x27;)&lt;/<mark>script</mark>&gt;" in human
+    assert "&amp; break" in human
+
+    ai = index.search("sentinel")["hits"][0]["highlights"]["ai"]
+    assert ai.count("<mark>") == 1 and ai.count("</mark>") == 1
+    assert "<mark>sentinel</mark>" in ai
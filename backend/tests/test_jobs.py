@@ -0,0 +1,135 @@
+"""
+Tests for background jobs: lifecycle, cancellation (including mid-stream) and the
+bounded event buffer.
+"""
+import threading
+import pytest
+from langchain.callbacks.base import BaseCallbackHandler
+from backend.api.jobs import Job, JobManager, JobEventHandler, JobCancelled, SUCCEEDED, FAILED, CANCELLED
+from backend.api.mock_llm import MockLLM
+
+
+def _wait_finished(job, timeout=10):
+    seq = 0
+    while not job.finished:
+        events = job.events_after(seq, timeout=timeout)
+        assert events, "job made no progress"
+        seq = events[-1][0]
+    return job
+
+
+def _event_names(job):
+    return [event for _, event, _ in job.events_after(0)]
+
+
+def test_job_succeeds_and_records_events():
+    manager = JobManager(run_fn=lambda job, handler: {"response": job.params["message"].upper()}, num_workers=1)
+    try:
+        job = _wait_finished(manager.submit({"message": "hi"}, provider="mock"))
+        assert job.status == SUCCEEDED
+        assert job.result == {"response": "HI"}
+        assert _event_names(job) == ["queued", "running", "final"]
+        assert manager.get_stats()["succeeded"] == 1
+    finally:
+        manager.stop()
+
+
+def test_failed_job_reports_error():
+    def run(job, handler):
+        raise RuntimeError("boom")
+
+    manager = JobManager(run_fn=run, num_workers=1)
+    try:
+        job = _wait_finished(manager.submit({}, provider="mock"))
+        assert job.status == FAILED
+        assert job.error == "boom"
+        assert _event_names(job)[-1] == "error"
+    finally:
+        manager.stop()
+
+
+def test_cancel_queued_job():
+    # No workers, so the job stays queued
+    manager = JobManager(run_fn=lambda job, handler: {}, num_workers=0)
+    job = manager.submit({}, provider="mock")
+    assert manager.queue_position(job.id) == 1
+    manager.cancel(job.id)
+    assert job.status == CANCELLED
+    assert manager.queue_position(job.id) is None
+
+
+def test_cancel_running_job_stops_at_next_callback():
+    started = threading.Event()
+
+    def run(job, handler):
+        started.set()
+        job.cancel_requested.wait(5)
+        handler.on_tool_start({}, "ls")
+        return {"response": "not reached"}
+
+    manager = JobManager(run_fn=run, num_workers=1)
+    try:
+        job = manager.submit({}, provider="mock")
+        assert started.wait(5)
+        manager.cancel(job.id)
+        _wait_finished(job)
+        assert job.status == CANCELLED
+        assert job.result is None
+    finally:
+        manager.stop()
+
+
+class _CancelOnFirstToken(BaseCallbackHandler):
+    """Requests cancellation as soon as the first token arrives."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.job.cancel_requested.set()
+
+
+def test_cancel_during_streaming_stops_the_llm_call():
+    job = Job({}, "mock")
+    llm = MockLLM(provider="mock", model_name="react", streaming=True,
+                  mock={"latency": 0, "text": "a long streamed answer " * 20})
+    with pytest.raises(JobCancelled):
+        llm("Summarize the workflow", callbacks=[_CancelOnFirstToken(job), JobEventHandler(job)])
+    # The call stopped at the first token instead of streaming the rest
+    assert job.events_after(0, timeout=0) == []
+
+
+def test_cancel_during_streaming_cancels_the_job():
+    llm = MockLLM(provider="mock", model_name="react", streaming=True,
+                  mock={"latency": 0, "tokens_per_second": 200, "text": "a long streamed answer " * 20})
+    first_token = threading.Event()
+
+    class FirstToken(BaseCallbackHandler):
+        def on_llm_new_token(self, token, **kwargs):
+            first_token.set()
+
+    def run(job, handler):
+        return {"response": llm("Summarize the workflow", callbacks=[FirstToken(), handler])}
+
+    manager = JobManager(run_fn=run, num_workers=1)
+    try:
+        job = manager.submit({}, provider="mock")
+        assert first_token.wait(5)
+        manager.cancel(job.id)
+        _wait_finished(job)
+        assert job.status == CANCELLED
+        tokens = [data["token"] for _, event, data in job.events_after(0) if event == "token"]
+        assert len("".join(tokens)) < len("a long streamed answer " * 20)
+    finally:
+        manager.stop()
+
+
+def test_reader_behind_the_buffer_gets_truncated_event():
+    job = Job({}, "mock", max_events=3)
+    for i in range(5):
+        job.emit("token", {"token": str(i)})
+    events = job.events_after(0)
+    assert events[0] == (2, "truncated", {"job_id": job.id, "dropped": 2, "first_event": 3})
+    assert [data["token"] for _, event, data in events[1:]] == ["2", "3", "4"]
+    # A reader that is caught up sees no marker
+    assert [event for _, event, _ in job.events_after(3)] == ["token", "token"]
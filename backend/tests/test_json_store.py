@@ -0,0 +1,28 @@
+"""
+Tests for the JSON history backend's journal syncing.
+"""
+import time
+from backend.storage.json_store import JSONHistoryStorage
+
+
+def test_append_after_recent_sync_is_synced_later(tmp_path):
+    storage = JSONHistoryStorage(str(tmp_path), fsync_interval=0.2)
+    storage.sync()
+    storage._append_journal("s1", "w1", {"step": {"step_id": 1}})
+    assert storage._unsynced
+
+    # Nothing else is written, so the deferred sync has to pick it up
+    deadline = time.monotonic() + 5
+    while storage._unsynced and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not storage._unsynced
+    assert storage._sync_timer is None
+    storage.close()
+
+
+def test_zero_interval_syncs_every_append(tmp_path):
+    storage = JSONHistoryStorage(str(tmp_path), fsync_interval=0)
+    storage._append_journal("s1", "w1", {"step": {"step_id": 1}})
+    assert not storage._unsynced
+    assert storage._sync_timer is None
+    storage.close()
@@ -0,0 +1,97 @@
+"""
+Tests for EnhancedMemoryManager's write path and cache bookkeeping.
+"""
+import os
+import pytest
+from backend.memory_manager import EnhancedMemoryManager
+from backend.storage.json_store import JSONHistoryStorage
+
+MOCK_LLM_CONFIG = {
+    "provider": "mock",
+    "model_name": "react",
+    "model_kwargs": {"temperature": 0.0},
+    "mock": {"latency": 0.0}
+}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    storage = JSONHistoryStorage(str(tmp_path), fsync_interval=0)
+    manager = EnhancedMemoryManager(history_path=str(tmp_path), llm_config=MOCK_LLM_CONFIG, storage=storage)
+    yield manager
+    manager.close()
+
+
+def _journal_records(tmp_path, session_id, workflow_id):
+    path = os.path.join(str(tmp_path), f"session_{session_id}", f"journal_{workflow_id}.jsonl")
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+def test_continuing_a_workflow_does_not_rewrite_it(manager, tmp_path):
+    manager.start_session("s1")
+    manager.start_workflow("w1", "Workflow", "task", session_id="s1")
+    records = _journal_records(tmp_path, "s1", "w1")
+    version = manager.get_version("s1", "w1")
+
+    # File reads and shell commands call start_workflow on every request
+    for _ in range(5):
+        manager.start_workflow("w1", session_id="s1")
+    assert _journal_records(tmp_path, "s1", "w1") == records
+    assert manager.get_version("s1", "w1") == version
+
+    # Filling in a missing field is still saved
+    manager.start_workflow("w2", session_id="s1")
+    manager.start_workflow("w2", task="given later", session_id="s1")
+    assert manager.storage.load_workflow("s1", "w2")["task"] == "given later"
+
+    manager.add_interaction("hi", "hello", session_id="s1", workflow_id="w1")
+    assert _journal_records(tmp_path, "s1", "w1") == records + 1
+
+
+def test_workflow_bookkeeping_stays_bounded(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_SESSION_CACHE_ENTRIES", "2")
+    monkeypatch.setenv("AGENT_MEMORY_CACHE_ENTRIES", "2")
+    monkeypatch.setenv("AGENT_VERSION_CACHE_ENTRIES", "2")
+    storage = JSONHistoryStorage(str(tmp_path), fsync_interval=0)
+    manager = EnhancedMemoryManager(history_path=str(tmp_path), llm_config=MOCK_LLM_CONFIG, storage=storage)
+    try:
+        manager.start_session("s0")
+        manager.start_workflow("w0", "Workflow", "task", session_id="s0")
+        manager.add_interaction("first", "reply", session_id="s0", workflow_id="w0")
+        old_version = manager.get_version("s0", "w0")
+
+        for i in range(1, 20):
+            manager.start_session(f"s{i}")
+            manager.start_workflow(f"w{i}", "Workflow", "task", session_id=f"s{i}")
+        assert len(manager.workflow_sessions) <= 4
+        assert len(manager._versions) <= 2
+
+        # An evicted workflow is rebuilt from the session it is used with
+        manager.add_interaction("second", "reply", session_id="s0", workflow_id="w0")
+        messages = [m.content for m in manager.workflow_memories.get("w0").chat_memory.messages]
+        assert "first" in messages and "second" in messages
+        new_version = manager.get_version("s0", "w0")
+        assert new_version[0] != old_version[0]
+
+        # Evicting the session's versions never takes it back to an earlier version
+        for i in range(1, 4):
+            manager.start_workflow(f"w{i}", task="changed", session_id=f"s{i}")
+        assert manager.get_version("s0", "w0")[0] not in (old_version[0], "%s-0" % old_version[0].split("-")[0])
+    finally:
+        manager.close()
+
+
+def test_set_llm_config_keeps_the_manager_state(manager):
+    manager.start_session("s1")
+    manager.start_workflow("w1", "Workflow", "task", session_id="s1")
+    memory = manager.get_memory_for_llm("w1")
+    assembler = manager.context_assembler
+
+    manager.set_llm_config({**MOCK_LLM_CONFIG, "model_name": "other"})
+    assert manager.llm_config["model_name"] == "other"
+    assert manager.summary_memory.llm is manager.llm
+    assert manager.context_assembler is assembler
+    assert manager.get_memory_for_llm("w1") is memory
@@ -0,0 +1,38 @@
+"""
+Tests for rate limit budget validation.
+"""
+import pytest
+from backend.api.rate_limiter import RateLimiter, RateLimiterRegistry, validate_rate_limit
+
+
+def test_budgets_are_coerced_to_numbers():
+    assert validate_rate_limit({"requests_per_minute": "60", "tokens_per_minute": 1500.5}) == {
+        "requests_per_minute": 60, "tokens_per_minute": 1500.5
+    }
+    assert validate_rate_limit({"tokens_per_minute": None}) == {"tokens_per_minute": None}
+
+    limiter = RateLimiter(requests_per_minute="60")
+    assert limiter.requests_per_minute == 60
+    assert limiter.acquire() == 0.0
+
+
+@pytest.mark.parametrize("rate_limit", [
+    {"requests_per_minute": 0},
+    {"requests_per_minute": -5},
+    {"tokens_per_minute": "abc"},
+    {"tokens_per_minute": True},
+    {"tokens_per_minute": float("inf")},
+    {"rpm": 60},
+    [60],
+])
+def test_invalid_budgets_are_rejected(rate_limit):
+    with pytest.raises(ValueError):
+        validate_rate_limit(rate_limit)
+
+
+def test_registry_reuses_a_limiter_for_equal_budgets():
+    registry = RateLimiterRegistry()
+    limiter = registry.get("openai", "gpt-4", requests_per_minute="60")
+    assert registry.get("openai", "gpt-4", requests_per_minute=60) is limiter
+    with pytest.raises(ValueError):
+        registry.get("openai", "gpt-4", requests_per_minute=-1)
@@ -0,0 +1,35 @@
+"""
+Tests for the two-tier LLM response cache.
+"""
+import os
+from backend.api import response_cache as response_cache_module
+from backend.api.response_cache import ResponseCache, make_cache_key
+
+
+def test_round_trip_through_the_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.db")
+    key = make_cache_key("openai", "gpt-4", "prompt", stop=["\n"], model_kwargs={"temperature": 0})
+    assert key.startswith("openai/gpt-4:")
+    ResponseCache(disk_path=path).set(key, "answer")
+
+    cache = ResponseCache(disk_path=path)
+    assert cache.get(key) == "answer"
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.get(key) == "answer"
+    assert cache.get_stats()["memory_hits"] == 1
+
+
+def test_ttl_zero_is_not_the_default(tmp_path):
+    cache = ResponseCache(disk_path=str(tmp_path / "cache.db"), default_ttl=3600)
+    cache.set("k0", "v", ttl=0)
+    cache.set("k1", "v")
+    assert cache.get("k0") is None
+    assert cache.get("k1") == "v"
+
+
+def test_disk_tier_defaults_to_the_history_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    monkeypatch.setenv("AGENT_HISTORY_PATH", str(tmp_path))
+    monkeypatch.setattr(response_cache_module, "_response_cache", None)
+    cache = response_cache_module.get_response_cache()
+    assert cache.disk_path == os.path.join(str(tmp_path), "llm_cache.db")
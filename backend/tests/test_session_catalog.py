@@ -0,0 +1,57 @@
+"""
+Tests for keyset paging over the session catalog.
+"""
+import json
+import base64
+import pytest
+from backend.session_catalog import SessionCatalog, SORT_KEYS, encode_cursor
+
+
+@pytest.fixture
+def catalog():
+    catalog = SessionCatalog()
+    catalog.load([
+        {"id": f"s{i}", "name": f"Session {i % 4}", "created_at": 100 + i, "last_activity": 200 + (i * 7) % 10}
+        for i in range(10)
+    ])
+    return catalog
+
+
+def _all_pages(catalog, sort, descending):
+    ids, cursor = [], None
+    while True:
+        page = catalog.page(limit=3, cursor=cursor, sort=sort, descending=descending, fields=("id",))
+        ids.extend(session["id"] for session in page["sessions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort", SORT_KEYS)
+@pytest.mark.parametrize("descending", [True, False])
+def test_pages_cover_every_session_once(catalog, sort, descending):
+    expected = catalog.page(limit=100, sort=sort, descending=descending, fields=("id",))["sessions"]
+    assert _all_pages(catalog, sort, descending) == [session["id"] for session in expected]
+
+
+def test_cursor_from_another_sort_is_rejected(catalog):
+    cursor = catalog.page(limit=2, sort="name")["next_cursor"]
+    with pytest.raises(ValueError):
+        catalog.page(limit=2, cursor=cursor, sort="created_at")
+
+
+@pytest.mark.parametrize("sort, key", [
+    ("created_at", ("Session 1", "s1")),
+    ("name", (104, "s4")),
+    ("last_activity", (True, "s1")),
+])
+def test_cursor_with_wrong_value_type_is_rejected(catalog, sort, key):
+    with pytest.raises(ValueError):
+        catalog.page(limit=2, cursor=encode_cursor(sort, key), sort=sort)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", base64.urlsafe_b64encode(b"[1, 2]").decode(),
+                                    base64.urlsafe_b64encode(json.dumps([104, "s4"]).encode()).decode()])
+def test_malformed_cursor_is_rejected(catalog, cursor):
+    with pytest.raises(ValueError):
+        catalog.page(limit=2, cursor=cursor, sort="created_at")
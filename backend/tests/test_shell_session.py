@@ -0,0 +1,40 @@
+"""
+Tests for ShellSessionManager's bookkeeping: a session handed out for a command must
+not be reaped or evicted before the command takes it.
+"""
+import pytest
+from backend.tools.shell_session import ShellSessionManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ShellSessionManager(cwd=str(tmp_path), idle_ttl=3600, max_sessions=1, reap_interval=3600)
+    yield manager
+    manager.shutdown()
+
+
+def test_acquired_session_is_not_reaped(manager):
+    session = manager.acquire("w1")
+    manager.idle_ttl = 0
+    manager.reap_idle()
+    assert session.alive
+    assert manager.find("w1") is session
+    assert session.run("echo still here")["stdout"].strip() == "still here"
+    manager.release(session)
+
+    manager.reap_idle()
+    assert not session.alive
+    assert manager.find("w1") is None
+
+
+def test_acquired_session_is_not_evicted(manager):
+    first = manager.acquire("w1")
+    second = manager.acquire("w2")
+    assert first.alive and second.alive
+    assert manager.get_stats()["open"] == 2
+    manager.release(first)
+    manager.release(second)
+
+    assert manager.run("w3", "echo three")["stdout"].strip() == "three"
+    assert not first.alive and not second.alive
+    assert [session["key"] for session in manager.get_stats()["sessions"]] == ["w3"]
@@ -0,0 +1,97 @@
+"""
+Tests for the SQLite history backend and the JSON-to-SQLite migration.
+"""
+import threading
+import pytest
+from backend.storage.json_store import JSONHistoryStorage
+from backend.storage.sqlite_store import SQLiteHistoryStorage
+from backend.storage.migrate import migrate_json_to_sqlite
+
+
+def _fill(storage):
+    """Write one session with two workflows, three steps and a summary."""
+    storage.save_session_entry({"id": "s1", "name": "First", "created_at": 1.0})
+    session_data = {"id": "s1", "workflows": []}
+    for workflow_id, steps in (("w1", 2), ("w2", 1)):
+        workflow = {"id": workflow_id, "name": f"Workflow {workflow_id}", "task": "task", "created_at": 2.0, "steps": []}
+        storage.save_workflow(session_data, workflow)
+        for step_id in range(steps):
+            step = {"step_id": step_id, "human": f"question {step_id}", "ai": f"answer {step_id}", "timestamp": 3.0 + step_id}
+            storage.save_step(session_data, workflow, step)
+    storage.save_summary("w1", {"name": "Workflow w1", "task": "task", "summary": "did things", "timestamp": 4.0})
+
+
+@pytest.fixture
+def store(tmp_path):
+    storage = SQLiteHistoryStorage(str(tmp_path / "history.db"), pool_size=2)
+    yield storage
+    storage.close()
+
+
+def test_round_trip(store):
+    _fill(store)
+    assert [entry["id"] for entry in store.list_sessions()] == ["s1"]
+    session = store.load_session("s1")
+    assert [workflow["id"] for workflow in session["workflows"]] == ["w1", "w2"]
+    assert [step["ai"] for step in store.load_workflow("s1", "w1")["steps"]] == ["answer 0", "answer 1"]
+    assert store.load_summaries()["w1"]["summary"] == "did things"
+    assert store.list_session_activity()[0]["last_activity"] == 4.0
+
+
+def test_traces_are_capped(store):
+    for i in range(5):
+        store.save_trace("s1", "w1", {"id": f"t{i}", "started_at": i}, keep=3)
+    assert [trace["id"] for trace in store.list_traces("s1", "w1")] == ["t2", "t3", "t4"]
+    assert store.load_trace("s1", "w1", "t4") == {"id": "t4", "started_at": 4}
+
+
+def test_short_lived_threads_do_not_keep_connections(store):
+    opened = []
+    original_open = store._open
+
+    def counting_open():
+        conn = original_open()
+        opened.append(conn)
+        return conn
+
+    store._open = counting_open
+
+    def work(i):
+        store.save_session_entry({"id": f"t{i}", "name": None, "created_at": float(i)})
+        store.count_sessions()
+
+    for batch in range(5):
+        threads = [threading.Thread(target=work, args=(batch * 10 + i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert store.count_sessions() == 50
+    assert len(store._idle) <= store.pool_size
+    # Every connection beyond the idle pool was closed when it was returned
+    still_open = [conn for conn in opened if conn not in store._idle]
+    for conn in still_open:
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+
+
+def test_migration_imports_json_history_once(tmp_path):
+    json_store = JSONHistoryStorage(str(tmp_path))
+    _fill(json_store)
+    json_store.close()
+
+    store = SQLiteHistoryStorage(str(tmp_path / "history.db"))
+    try:
+        stats = migrate_json_to_sqlite(str(tmp_path), store)
+        assert stats == {"sessions": 1, "workflows": 2, "steps": 3, "summaries": 1, "skipped": False}
+        assert [step["human"] for step in store.load_workflow("s1", "w1")["steps"]] == ["question 0", "question 1"]
+        assert store.load_summaries()["w1"]["summary"] == "did things"
+
+        assert migrate_json_to_sqlite(str(tmp_path), store)["skipped"]
+        # Forced re-runs upsert instead of duplicating rows
+        migrate_json_to_sqlite(str(tmp_path), store, force=True)
+        assert len(store.load_session("s1")["workflows"]) == 2
+        assert len(store.load_workflow("s1", "w1")["steps"]) == 2
+    finally:
+        store.close()
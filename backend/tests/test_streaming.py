@@ -0,0 +1,67 @@
+"""
+Tests for the Server-Sent Events stream of agent runs.
+"""
+import json
+import threading
+from langchain.tools import Tool
+from backend.api.agent import create_agent
+from backend.api.streaming import SSEEventHandler, format_sse
+
+MOCK_LLM_CONFIG = {
+    "provider": "mock",
+    "model_name": "react",
+    "model_kwargs": {"temperature": 0.0},
+    "mock": {
+        "latency": 0.0,
+        "script": [
+            {"action": "Echo", "action_input": "ping"},
+            {"action": "Final Answer", "action_input": "done"}
+        ]
+    }
+}
+
+
+def _parse(frame):
+    """Split an SSE frame into (event, data), or (None, comment) for a comment line."""
+    if frame.startswith(":"):
+        return None, frame[1:].strip()
+    fields = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_format_sse():
+    assert format_sse("token", {"token": "a\nb"}) == 'event: token\ndata: {"token": "a\\nb"}\n\n'
+    assert format_sse("final", {}, event_id=7) == "id: 7\nevent: final\ndata: {}\n\n"
+
+
+def test_agent_run_streams_tokens_steps_and_answer():
+    tool = Tool(name="Echo", func=lambda text: f"echo: {text}", description="Echo the input back.")
+    agent = create_agent([tool], llm_config=MOCK_LLM_CONFIG)
+    handler = SSEEventHandler()
+
+    def run():
+        try:
+            response = agent.run("say ping", callbacks=[handler])
+            handler.emit("final", {"response": response})
+        finally:
+            handler.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    events = [_parse(frame) for frame in handler.events()]
+    names = [event for event, _ in events]
+
+    assert "token" in names
+    action = next(data for event, data in events if event == "action")
+    assert action["tool"] == "Echo" and action["tool_input"] == "ping"
+    assert next(data for event, data in events if event == "observation") == {"observation": "echo: ping"}
+    assert names.index("action") < names.index("observation") < names.index("agent_finish")
+    assert events[-1] == ("final", {"response": "done"})
+
+
+def test_keep_alive_while_the_agent_is_silent():
+    handler = SSEEventHandler(heartbeat_interval=0.01)
+    frames = handler.events()
+    assert _parse(next(frames)) == (None, "keep-alive")
+    handler.emit("token", {"token": "x"})
+    handler.close()
+    assert [_parse(frame) for frame in frames] == [("token", {"token": "x"})]
@@ -0,0 +1,74 @@
+"""
+Tests for the background summarization queue: deduplication, bounds and retries.
+"""
+import threading
+import time
+from backend.summary_queue import SummarizationQueue
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_jobs_run_in_the_background_and_are_deduplicated():
+    release = threading.Event()
+    done = []
+
+    def summarize(workflow_id, session_id):
+        release.wait(5)
+        done.append((workflow_id, session_id))
+
+    summaries = SummarizationQueue(summarize)
+    try:
+        assert summaries.submit("w1", "s1")
+        # Already pending, whether queued or running
+        assert not summaries.submit("w1", "s1")
+        release.set()
+        assert _wait_for(lambda: summaries.get_stats()["completed"] == 1)
+        assert done == [("w1", "s1")]
+        stats = summaries.get_stats()
+        assert stats["deduplicated"] == 1 and stats["pending"] == 0
+
+        # Once finished the workflow can be queued again
+        assert summaries.submit("w1", "s1")
+        assert _wait_for(lambda: summaries.get_stats()["completed"] == 2)
+    finally:
+        summaries.stop()
+
+
+def test_full_queue_drops_jobs():
+    summaries = SummarizationQueue(lambda workflow_id, session_id: None, max_size=1, num_workers=0)
+    assert summaries.submit("w1")
+    assert not summaries.submit("w2")
+    assert summaries.get_stats()["dropped"] == 1
+    assert summaries.get_stats()["depth"] == 1
+    summaries.stop()
+    assert not summaries.submit("w3")
+
+
+def test_failed_jobs_are_retried_then_given_up():
+    attempts = []
+
+    def summarize(workflow_id, session_id):
+        attempts.append(workflow_id)
+        if workflow_id == "flaky" and attempts.count("flaky") == 1:
+            raise RuntimeError("provider unavailable")
+        if workflow_id == "broken":
+            raise RuntimeError("always fails")
+
+    summaries = SummarizationQueue(summarize, max_retries=2, retry_delay=0.01)
+    try:
+        summaries.submit("flaky")
+        summaries.submit("broken")
+        assert _wait_for(lambda: summaries.get_stats()["completed"] == 1 and summaries.get_stats()["failed"] == 1)
+        assert attempts.count("flaky") == 2
+        assert attempts.count("broken") == 3
+        stats = summaries.get_stats()
+        assert stats["retried"] == 3 and stats["pending"] == 0
+    finally:
+        summaries.stop()
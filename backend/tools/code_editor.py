@@ -1,33 +1,64 @@
 """
 CodeEditor tool for the Agentic Software-Development tool.
-This tool allows reading and writing files in the mounted filesystem.
+This tool allows reading and writing files in the mounted filesystem, including partial
+reads and targeted edits that only return the changed region.
 """
 import os
 import json
+import tempfile
+from typing import Any
 from langchain.tools import BaseTool
+from backend.api.metrics import timed_tool
+from backend.tools.file_edits import EditError, read_range, apply_replacements, insert_lines, \
+    apply_unified_diff, changed_line_ranges, changed_regions, check_syntax, split_lines
 
 class CodeEditorTool(BaseTool):
     name = "CodeEditor"
     description = """
-    Read or write files under /sandbox/code which is volume-mounted to the user's $HOME.
+    Read or edit files under /sandbox/code which is volume-mounted to the user's $HOME.
+    Prefer "replace", "insert" or "apply_patch" over "write" for existing files: only the
+    changed lines are sent and only the changed region is returned.
     
     Input should be a JSON object with the following fields:
-    - "action": "read" or "write"
+    - "action": "read", "write", "replace", "insert" or "apply_patch"
     - "file_path": The path to the file (can be relative or absolute)
-    - "content": (Only for "write" action) The content to write to the file
+    - "start_line"/"end_line": (Optional for "read") 1-based inclusive line range to read
+    - "offset"/"length": (Optional for "read") byte range to read
+    - "content": (For "write" and "insert") The text to write or insert
+    - "line": (For "insert") The line number the inserted text will start at
+    - "edits": (For "replace") A list of {"search": exact text, "replace": new text}; each search
+      text must occur exactly once unless "all": true is set
+    - "patch": (For "apply_patch") A unified diff against the file
     
     Output will be a JSON object with:
     - "status": "success" or "error"
     - "message": A message describing the result
-    - "content": (Only for "read" action) The content of the file
+    - "content": (Only for "read" action) The content of the file or of the requested range
+    - "changes": (For edits) The changed regions with line numbers and a few lines of context
+    - "warning": (For edits) A syntax error introduced by the edit, if any
     
     Example (write file):
     {"action":"write","file_path":"insertion_sort.py","content":"def insertion_sort(arr):\\n    for i in range(1,len(arr)):\\n        key=arr[i]\\n        j=i-1\\n        while j>=0 and arr[j]>key:\\n            arr[j+1]=arr[j]\\n            j-=1\\n        arr[j+1]=key\\n    return arr\\n\\nif __name__=='__main__':\\n    print(insertion_sort([5,2,9,1,5,6]))\\n"}
     
     Example (read file):
     {"action":"read","file_path":"insertion_sort.py"}
+    
+    Example (read lines 10-40):
+    {"action":"read","file_path":"app.py","start_line":10,"end_line":40}
+    
+    Example (replace):
+    {"action":"replace","file_path":"insertion_sort.py","edits":[{"search":"print(insertion_sort([5,2,9,1,5,6]))","replace":"print(insertion_sort([3,1,2]))"}]}
+    
+    Example (insert at line 1):
+    {"action":"insert","file_path":"insertion_sort.py","line":1,"content":"import sys\\n"}
+    
+    Example (apply_patch):
+    {"action":"apply_patch","file_path":"insertion_sort.py","patch":"@@ -2,2 +2,2 @@\\n     for i in range(1,len(arr)):\\n-        key=arr[i]\\n+        key = arr[i]\\n"}
     """
+    # Optional CodeIndex kept in sync with writes
+    code_index: Any = None
     
+    @timed_tool
     def _run(self, input_str):
         """
         Run the CodeEditor tool.
@@ -51,12 +82,30 @@ class CodeEditorTool(BaseTool):
             # Handle read action
             if action == "read":
                 try:
-                    with open(file_path, 'r') as f:
+                    ranged = any(input_data.get(key) is not None for key in ("start_line", "end_line", "offset", "length"))
+                    if not ranged:
+                        # newline='' keeps the file's own line endings
+                        with open(file_path, 'r', newline='') as f:
+                            content = f.read()
+                        return json.dumps({
+                            "status": "success",
+                            "message": f"File {file_path} read successfully",
+                            "content": content
+                        })
+                    # Ranges are taken from the raw bytes so offsets match the file on disk
+                    with open(file_path, 'rb') as f:
                         content = f.read()
+                    selection = read_range(
+                        content,
+                        start_line=input_data.get("start_line"),
+                        end_line=input_data.get("end_line"),
+                        offset=input_data.get("offset"),
+                        length=input_data.get("length")
+                    )
                     return json.dumps({
                         "status": "success",
                         "message": f"File {file_path} read successfully",
-                        "content": content
+                        **selection
                     })
                 except Exception as e:
                     return json.dumps({
@@ -74,6 +123,7 @@ class CodeEditorTool(BaseTool):
                     
                     with open(file_path, 'w') as f:
                         f.write(content)
+                    self._index_update(file_path)
                     
                     return json.dumps({
                         "status": "success",
@@ -85,11 +135,15 @@ class CodeEditorTool(BaseTool):
                         "message": f"Error writing file: {str(e)}"
                     })
             
+            # Handle targeted edit actions
+            elif action in ("replace", "insert", "apply_patch"):
+                return json.dumps(self._edit(action, file_path, input_data))
+            
             # Handle invalid action
             else:
                 return json.dumps({
                     "status": "error",
-                    "message": f"Invalid action: {action}. Must be 'read' or 'write'."
+                    "message": f"Invalid action: {action}. Must be 'read', 'write', 'replace', 'insert' or 'apply_patch'."
                 })
                 
         except Exception as e:
@@ -98,6 +152,87 @@ class CodeEditorTool(BaseTool):
                 "message": f"Error parsing input: {str(e)}"
             })
     
+    def _edit(self, action, file_path, input_data):
+        """
+        Apply a targeted edit and write the file atomically.
+        
+        Args:
+            action (str): "replace", "insert" or "apply_patch"
+            file_path (str): The absolute file path
+            input_data (dict): The tool input
+            
+        Returns:
+            dict: status, message, the changed regions and any syntax warning
+        """
+        try:
+            # newline='' so edits keep the file's line endings (CRLF stays CRLF)
+            with open(file_path, 'r', newline='') as f:
+                old_content = f.read()
+        except FileNotFoundError:
+            if action == "replace":
+                return {"status": "error", "message": f"File not found: {file_path}"}
+            old_content = ""
+        except Exception as e:
+            return {"status": "error", "message": f"Error reading file: {str(e)}"}
+        
+        try:
+            if action == "replace":
+                edits = input_data.get("edits")
+                if edits is None:
+                    edits = [{key: input_data[key] for key in ("search", "replace", "all") if key in input_data}]
+                new_content = apply_replacements(old_content, edits)
+            elif action == "insert":
+                new_content = insert_lines(old_content, input_data.get("line", 1), input_data.get("content", ""))
+            else:
+                new_content = apply_unified_diff(old_content, input_data.get("patch", ""))
+        except EditError as e:
+            return {"status": "error", "message": f"Edit not applied: {str(e)}"}
+        
+        if new_content == old_content:
+            return {"status": "success", "message": f"No changes to {os.path.basename(file_path)}", "changes": []}
+        
+        temp_path = None
+        try:
+            # Write to a temporary file first so a failed write never leaves a partial file
+            directory = os.path.dirname(file_path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".edit-")
+            with os.fdopen(fd, 'w', newline='') as f:
+                f.write(new_content)
+            if os.path.exists(file_path):
+                os.chmod(temp_path, os.stat(file_path).st_mode & 0o7777)
+            os.replace(temp_path, file_path)
+        except Exception as e:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            return {"status": "error", "message": f"Error writing file: {str(e)}"}
+        self._index_update(file_path)
+        
+        result = {
+            "status": "success",
+            "message": f"Edited {os.path.basename(file_path)}",
+            "total_lines": len(split_lines(new_content)[0]),
+            "changes": changed_regions(new_content, changed_line_ranges(old_content, new_content))
+        }
+        # Report, but don't block, edits that break a file that used to parse
+        warning = check_syntax(file_path, new_content)
+        if warning and not check_syntax(file_path, old_content):
+            result["warning"] = warning
+        return result
+    
+    def _index_update(self, file_path):
+        """Re-index a written file so searches see it immediately."""
+        if self.code_index is None:
+            return
+        try:
+            self.code_index.update_file(file_path)
+        except Exception:
+            # The periodic refresh picks the file up later
+            pass
+    
     def _arun(self, query):
         """
         Async version of _run (not implemented).
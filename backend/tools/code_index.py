@@ -0,0 +1,566 @@
+"""
+Code index module for the Agentic Software-Development tool.
+This module keeps a persistent trigram index over the files under /sandbox/code so
+literal and regex searches only open files that can contain a match. The index is
+refreshed incrementally by a background thread comparing file mtimes and sizes, so
+searches never wait on a walk of the tree.
+"""
+import os
+import re
+import math
+import time
+import fnmatch
+import sqlite3
+import threading
+import logging
+from array import array
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directories that are never worth searching
+SKIP_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", "env", ".tox",
+    ".mypy_cache", ".pytest_cache", ".idea", ".vscode", "dist", "build", ".next", ".cache"
+})
+
+MAX_FILE_BYTES = int(os.environ.get("CODE_INDEX_MAX_FILE_BYTES", str(1024 * 1024)))
+
+# Files indexed per transaction during a refresh
+COMMIT_BATCH = 200
+
+_DEFINITION_RE = re.compile(r"^\s*(def|class|function|async def|export|const|let|var|interface|type)\b")
+
+
+def file_trigrams(data):
+    """
+    Get the distinct trigrams of a file's lowercased bytes.
+
+    Args:
+        data (bytes): The file contents
+
+    Returns:
+        set: Trigrams encoded as integers
+    """
+    data = data.lower()
+    return {int.from_bytes(data[i:i + 3], "big") for i in range(len(data) - 2)}
+
+
+def query_trigrams(fragments):
+    """
+    Get the trigrams every match of a query must contain.
+
+    Args:
+        fragments (list): Literal strings that appear in every match
+
+    Returns:
+        set: Trigrams encoded as integers
+    """
+    trigrams = set()
+    for fragment in fragments:
+        # Lowercase bytes the same way files are indexed; non-ASCII trigrams are skipped
+        # because case-insensitive matches may differ from them byte for byte
+        data = fragment.encode("utf-8").lower()
+        trigrams.update(int.from_bytes(data[i:i + 3], "big") for i in range(len(data) - 2)
+                        if max(data[i:i + 3]) < 128)
+    return trigrams
+
+
+def _class_end(pattern, start):
+    """Get the index just past the character class opening at start, or None if it is unclosed."""
+    i = start + 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        # A leading ] is a literal member of the class
+        i += 1
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i += 2
+            continue
+        if pattern[i] == "]":
+            return i + 1
+        i += 1
+    return None
+
+
+def _group_start(pattern, start):
+    """
+    Parse the opening of a group.
+
+    Args:
+        pattern (str): The regular expression
+        start (int): Index of the "("
+
+    Returns:
+        tuple: (index of the group body, kind) where kind is "group" for a group that is
+               part of the match, "assertion" for a lookaround or comment, "flags" for a
+               global inline flag group such as (?i), or None if the syntax is not understood
+    """
+    i = start + 1
+    if not pattern.startswith("?", i):
+        return i, "group"
+    i += 1
+    if pattern.startswith("P<", i) or (pattern.startswith("<", i) and not pattern.startswith(("<=", "<!"), i)):
+        close = pattern.find(">", i)
+        return (close + 1, "group") if close != -1 else (None, None)
+    if pattern.startswith(("=", "!", "#"), i):
+        return i + 1, "assertion"
+    if pattern.startswith(("<=", "<!"), i):
+        return i + 2, "assertion"
+    flags = re.match(r"[aiLmsux-]*", pattern[i:]).group()
+    if "x" in flags:
+        # Verbose mode changes what whitespace and # mean
+        return None, None
+    i += len(flags)
+    if pattern.startswith(":", i):
+        return i + 1, "group"
+    if flags and pattern.startswith(")", i):
+        return i + 1, "flags"
+    # Backreferences (?P=name), conditionals and anything newer
+    return None, None
+
+
+def regex_literals(pattern):
+    """
+    Extract literal fragments that every match of a regex must contain.
+
+    This is deliberately conservative: patterns with alternation or syntax it does not
+    understand yield nothing, and characters or groups made optional by ?, * or {...}
+    are dropped along with everything inside them, as are lookarounds.
+
+    Args:
+        pattern (str): The regular expression
+
+    Returns:
+        list: Literal fragments
+    """
+    if "|" in pattern:
+        return []
+    # One fragment list per open group; a group's fragments join its parent's on close
+    groups = [([], "group")]
+    current = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isalnum():
+                # Character class escape such as \w or \d, or a backreference
+                groups[-1][0].append(current)
+                current = ""
+            else:
+                current += escaped
+            continue
+        if char == "(":
+            groups[-1][0].append(current)
+            current = ""
+            i, kind = _group_start(pattern, i)
+            if kind is None:
+                return []
+            if kind != "flags":
+                groups.append(([], kind))
+            continue
+        if char == ")":
+            if len(groups) == 1:
+                return []
+            fragments, kind = groups.pop()
+            fragments.append(current)
+            current = ""
+            i += 1
+            if i < len(pattern) and pattern[i] in "?*{":
+                # The whole group is optional
+                if pattern[i] == "{":
+                    close = pattern.find("}", i)
+                    i = close + 1 if close != -1 else i + 1
+                else:
+                    i += 1
+            elif kind == "group":
+                groups[-1][0].extend(fragments)
+            continue
+        if char in "?*{":
+            # The previous character is optional
+            current = current[:-1]
+            groups[-1][0].append(current)
+            current = ""
+            if char == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close != -1 else i + 1
+                continue
+        elif char == "[":
+            groups[-1][0].append(current)
+            current = ""
+            i = _class_end(pattern, i)
+            if i is None:
+                return []
+            continue
+        elif char in "+.^$":
+            groups[-1][0].append(current)
+            current = ""
+        else:
+            current += char
+        i += 1
+    if len(groups) != 1:
+        return []
+    fragments = groups[0][0] + [current]
+    return [fragment for fragment in fragments if len(fragment) >= 3]
+
+
+class CodeIndex:
+    """
+    Persistent trigram index over a source tree.
+
+    The postings live in SQLite (one row per trigram/file pair); the list of indexed
+    files with their mtimes is kept in memory so a refresh only needs a stat walk.
+    Refreshes run on a background thread started by start() (or by the first search);
+    searches use whatever is indexed so far and report when the first build is not done.
+    """
+
+    def __init__(self, root="/sandbox/code", db_path=None, refresh_interval=None):
+        """
+        Initialize the index.
+
+        Args:
+            root (str): Directory to index
+            db_path (str, optional): SQLite file for the index; defaults to an in-memory database
+            refresh_interval (float, optional): Seconds between background refresh walks;
+                defaults to CODE_INDEX_REFRESH_INTERVAL or 2
+        """
+        self.root = root
+        self.db_path = db_path or ":memory:"
+        if refresh_interval is None:
+            refresh_interval = float(os.environ.get("CODE_INDEX_REFRESH_INTERVAL", "2.0"))
+        self.refresh_interval = refresh_interval
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending = set()
+        self._built = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.files = {}
+
+        self.searches = 0
+        self.last_refresh_seconds = None
+        self.last_search_ms = None
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        if self.db_path == ":memory:":
+            # In-memory databases are per connection, so share one
+            self._shared = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self._shared = None
+
+        conn = self._conn()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS files ("
+                         "id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime_ns INTEGER, size INTEGER, trigrams BLOB)")
+            conn.execute("CREATE TABLE IF NOT EXISTS postings ("
+                         "tri INTEGER, file_id INTEGER, PRIMARY KEY (tri, file_id)) WITHOUT ROWID")
+        for file_id, path, mtime_ns, size in conn.execute("SELECT id, path, mtime_ns, size FROM files"):
+            self.files[path] = (file_id, mtime_ns, size)
+
+    def _conn(self):
+        """Get this thread's database connection."""
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _walk(self):
+        """Yield (relative path, stat) for every indexable file under the root."""
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for filename in filenames:
+                full_path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(full_path)
+                except OSError:
+                    continue
+                if stat.st_size > MAX_FILE_BYTES or not os.path.isfile(full_path):
+                    continue
+                yield os.path.relpath(full_path, self.root), stat
+
+    def refresh(self):
+        """
+        Bring the index up to date with the tree, blocking until the walk is done.
+
+        Only files whose mtime or size changed are re-read. The background thread calls
+        this every refresh_interval seconds; searches never do.
+
+        Returns:
+            dict: Counts of added, updated and removed files
+        """
+        with self._refresh_lock:
+            started = time.time()
+            conn = self._conn()
+            seen = set()
+            added = updated = 0
+            for path, stat in self._walk():
+                seen.add(path)
+                known = self.files.get(path)
+                if known and known[1] == stat.st_mtime_ns and known[2] == stat.st_size:
+                    continue
+                if self._index_file(conn, path, stat, known):
+                    if known:
+                        updated += 1
+                    else:
+                        added += 1
+                    # Commit in batches; a transaction per file dominates the initial build
+                    if (added + updated) % COMMIT_BATCH == 0:
+                        conn.commit()
+
+            removed = [path for path in self.files if path not in seen]
+            for path in removed:
+                self._remove_file(conn, path)
+            self._update_pending(conn)
+            conn.commit()
+
+            self.last_refresh_seconds = time.time() - started
+            self._built.set()
+            if added or updated or removed:
+                logger.info(f"Code index refreshed in {self.last_refresh_seconds:.2f}s: "
+                            f"{added} added, {updated} updated, {len(removed)} removed")
+            return {"added": added, "updated": updated, "removed": len(removed)}
+
+    def update_file(self, file_path):
+        """
+        Re-index a single file right after it was written (or remove it if it is gone),
+        so searches see the change without waiting for the next refresh walk. If a walk
+        is running the file is queued and indexed when the walk ends, so the caller
+        never waits on it.
+
+        Args:
+            file_path (str): Absolute path, or path relative to the root
+        """
+        full_path = os.path.abspath(os.path.join(self.root, file_path))
+        path = os.path.relpath(full_path, os.path.abspath(self.root))
+        if path.startswith(".."):
+            return
+        with self._pending_lock:
+            self._pending.add(path)
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            conn = self._conn()
+            self._update_pending(conn)
+            conn.commit()
+        finally:
+            self._refresh_lock.release()
+
+    def _update_pending(self, conn):
+        """Re-index the files queued by update_file. Caller holds the refresh lock and commits."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+        for path in pending:
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except OSError:
+                stat = None
+            if stat is None or stat.st_size > MAX_FILE_BYTES:
+                self._remove_file(conn, path)
+            else:
+                self._index_file(conn, path, stat, self.files.get(path))
+
+    def start(self):
+        """Start the background thread that builds the index and keeps it refreshed."""
+        with self._pending_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, name="code-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop.set()
+
+    def _refresh_loop(self):
+        """Refresh until stopped. Runs on the background thread."""
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing code index: {str(e)}", exc_info=True)
+            self._stop.wait(self.refresh_interval)
+
+    @property
+    def building(self):
+        """True until the first full walk has finished."""
+        return not self._built.is_set()
+
+    def _index_file(self, conn, path, stat, known):
+        """Index or re-index one file. Caller commits. Returns False if the file is unreadable."""
+        try:
+            with open(os.path.join(self.root, path), "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if b"\0" in data[:8192]:
+            # Binary file; remember it so it is not re-read until it changes
+            trigrams = set()
+        else:
+            trigrams = file_trigrams(data)
+
+        trigrams = sorted(trigrams)
+        if known:
+            self._remove_file(conn, path)
+        cursor = conn.execute(
+            "INSERT INTO files (path, mtime_ns, size, trigrams) VALUES (?, ?, ?, ?)",
+            (path, stat.st_mtime_ns, stat.st_size, array("I", trigrams).tobytes())
+        )
+        file_id = cursor.lastrowid
+        conn.executemany("INSERT OR IGNORE INTO postings (tri, file_id) VALUES (?, ?)",
+                         ((tri, file_id) for tri in trigrams))
+        self.files[path] = (file_id, stat.st_mtime_ns, stat.st_size)
+        return True
+
+    def _remove_file(self, conn, path):
+        """Drop a file and its postings. Caller manages the transaction."""
+        known = self.files.pop(path, None)
+        if known is None:
+            return
+        row = conn.execute("SELECT trigrams FROM files WHERE id = ?", (known[0],)).fetchone()
+        if row and row[0]:
+            trigrams = array("I")
+            trigrams.frombytes(row[0])
+            conn.executemany("DELETE FROM postings WHERE tri = ? AND file_id = ?",
+                             ((tri, known[0]) for tri in trigrams))
+        conn.execute("DELETE FROM files WHERE id = ?", (known[0],))
+
+    def _candidates(self, trigrams):
+        """Get the paths of files containing every trigram (all files if there are none)."""
+        files = list(self.files.items())
+        if not trigrams:
+            return sorted(path for path, _ in files)
+        conn = self._conn()
+        # Any subset of the required trigrams is still a valid filter
+        trigrams = sorted(trigrams)[:64]
+        placeholders = ",".join("?" * len(trigrams))
+        rows = conn.execute(
+            f"SELECT file_id FROM postings WHERE tri IN ({placeholders}) "
+            f"GROUP BY file_id HAVING COUNT(*) = ?",
+            trigrams + [len(trigrams)]
+        ).fetchall()
+        ids = {row[0] for row in rows}
+        return sorted(path for path, (file_id, _, _) in files if file_id in ids)
+
+    def candidate_files(self, fragments):
+        """
+        Get the files that may contain every fragment.
+
+        Args:
+            fragments (list): Literal strings
+
+        Returns:
+            list: Relative paths of the candidate files, or None while the index is
+                  still being built (callers fall back to walking the tree)
+        """
+        self.start()
+        if self.building:
+            return None
+        return self._candidates(query_trigrams(fragments))
+
+    def search(self, query, regex=False, case_sensitive=False, path_glob=None, max_results=50,
+               max_per_file=5, context=1):
+        """
+        Search the tree.
+
+        Files are ranked by match count (log-scaled), with a bonus for matches on
+        definition lines and for query terms in the file path. Searches use the index
+        as it is; until the first build finishes, index_building is True and files not
+        indexed yet are missing from the results.
+
+        Args:
+            query (str): Literal text or regular expression
+            regex (bool): Treat the query as a regular expression
+            case_sensitive (bool): Match case exactly
+            path_glob (str, optional): Only search paths matching this glob (e.g. "backend/*.py")
+            max_results (int): Maximum number of matching lines returned
+            max_per_file (int): Maximum matching lines returned per file
+            context (int): Lines of context before and after each match
+
+        Returns:
+            dict: Ranked results with file, line, text and context, plus counts and timings
+        """
+        self.start()
+        building = self.building
+        started = time.time()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        fragments = regex_literals(query) if regex else [query]
+
+        candidates = self._candidates(query_trigrams(fragments))
+        if path_glob:
+            candidates = [path for path in candidates if fnmatch.fnmatch(path, path_glob)]
+
+        query_lower = query.lower()
+        ranked = []
+        total_matches = 0
+        for path in candidates:
+            try:
+                with open(os.path.join(self.root, path), "r", errors="replace") as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                continue
+            matches = [number for number, line in enumerate(lines) if pattern.search(line)]
+            if not matches:
+                continue
+            total_matches += len(matches)
+            definitions = sum(1 for number in matches if _DEFINITION_RE.match(lines[number]))
+            score = 1 + math.log(len(matches)) + 2 * min(definitions, 1)
+            if not regex and query_lower in path.lower():
+                score += 3
+            ranked.append((score, path, lines, matches))
+
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        results = []
+        for score, path, lines, matches in ranked:
+            for number in matches[:max_per_file]:
+                if len(results) >= max_results:
+                    break
+                results.append({
+                    "file": path,
+                    "line": number + 1,
+                    "text": lines[number],
+                    "context_before": lines[max(number - context, 0):number],
+                    "context_after": lines[number + 1:number + 1 + context],
+                    "score": round(score, 3)
+                })
+
+        elapsed_ms = round((time.time() - started) * 1000, 1)
+        self.searches += 1
+        self.last_search_ms = elapsed_ms
+        return {
+            "query": query,
+            "results": results,
+            "total_matches": total_matches,
+            "files_matched": len(ranked),
+            "files_scanned": len(candidates),
+            "files_indexed": len(self.files),
+            "index_building": building,
+            "truncated": len(results) < total_matches,
+            "elapsed_ms": elapsed_ms
+        }
+
+    def get_stats(self):
+        """
+        Get index size and timings.
+
+        Returns:
+            dict: Index statistics
+        """
+        return {
+            "root": self.root,
+            "files_indexed": len(self.files),
+            "building": self.building,
+            "searches": self.searches,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3) if self.last_refresh_seconds is not None else None,
+            "last_search_ms": self.last_search_ms
+        }
@@ -0,0 +1,91 @@
+"""
+CodeSearch tool for the Agentic Software-Development tool.
+This tool searches the files under /sandbox/code through a persistent trigram index,
+so the agent does not have to walk the whole tree with grep or find.
+"""
+import json
+from typing import Any
+from langchain.tools import BaseTool
+from backend.api.metrics import timed_tool
+
+class CodeSearchTool(BaseTool):
+    name = "CodeSearch"
+    description = """
+    Search the code under /sandbox/code for a literal string or a regular expression.
+    Much faster than grep/find through the Shell tool, and results are ranked and capped.
+
+    Input should be either a plain string to search for, or a JSON object with:
+    - "query": The text or regular expression to search for
+    - "regex": (Optional) true to treat the query as a Python regular expression
+    - "case_sensitive": (Optional) true to match case exactly (default false)
+    - "path": (Optional) glob restricting the files searched, relative to /sandbox/code (e.g. "backend/*.py")
+    - "max_results": (Optional) maximum matching lines returned (default 30)
+
+    Output will be a JSON object with:
+    - "results": Matches as {"file", "line", "text", "context_before", "context_after"}, best files first
+    - "total_matches": Number of matching lines across all files
+    - "truncated": True if more matches exist than were returned
+    - "index_building": True while the index is first being built; some files may be missing
+
+    Example:
+    {"query":"def get_llm","path":"*.py"}
+
+    Example (regex):
+    {"query":"class \\\\w+Tool\\\\(","regex":true}
+    """
+    index: Any = None
+    max_results: int = 30
+
+    @timed_tool
+    def _run(self, input_str):
+        """
+        Run the CodeSearch tool.
+
+        Args:
+            input_str (str): The search text, or a JSON string with query and options
+
+        Returns:
+            str: JSON string with ranked results or an error
+        """
+        try:
+            input_data = input_str
+            if isinstance(input_str, str):
+                try:
+                    input_data = json.loads(input_str)
+                except ValueError:
+                    input_data = input_str
+            if not isinstance(input_data, dict):
+                input_data = {"query": str(input_data)}
+
+            query = input_data.get("query", "")
+            if not query:
+                return json.dumps({"status": "error", "message": "\"query\" must not be empty"})
+
+            result = self.index.search(
+                query,
+                regex=bool(input_data.get("regex", False)),
+                case_sensitive=bool(input_data.get("case_sensitive", False)),
+                path_glob=input_data.get("path") or None,
+                max_results=int(input_data.get("max_results", self.max_results))
+            )
+            for match in result["results"]:
+                match.pop("score", None)
+            return json.dumps({
+                "status": "success",
+                "results": result["results"],
+                "total_matches": result["total_matches"],
+                "files_matched": result["files_matched"],
+                "truncated": result["truncated"],
+                "index_building": result["index_building"]
+            })
+        except Exception as e:
+            return json.dumps({
+                "status": "error",
+                "message": f"Search failed: {str(e)}"
+            })
+
+    def _arun(self, query):
+        """
+        Async version of _run (not implemented).
+        """
+        raise NotImplementedError("CodeSearchTool does not support async")
@@ -0,0 +1,87 @@
+"""
+CodeSymbols tool for the Agentic Software-Development tool.
+This tool answers "where is X defined" and "what is in this file" from the symbol
+index, and returns a single definition's source without reading the whole file.
+"""
+import json
+from typing import Any
+from langchain.tools import BaseTool
+from backend.api.metrics import timed_tool
+
+class CodeSymbolsTool(BaseTool):
+    name = "CodeSymbols"
+    description = """
+    Navigate Python and JavaScript/TypeScript code under /sandbox/code by symbol.
+    Use it before reading whole files: get a file's outline, find where a function or
+    class is defined, or read just that definition.
+
+    Input should be one of:
+    - "outline <file>": The classes, functions and methods in a file with their line ranges
+    - "find_symbol <name>": Where <name> (e.g. "get_llm" or "ShellTool.run") is defined
+    - "references <name>": Where <name> is defined and the lines that use it
+    - "read_symbol <name> [file]": The source of the definition only
+
+    Output will be a JSON object with "status" and the requested "definitions",
+    "references" or "content" (with its "line"/"end_line" range).
+
+    Example:
+    find_symbol insertion_sort
+    """
+    index: Any = None
+
+    @timed_tool
+    def _run(self, input_str):
+        """
+        Run the CodeSymbols tool.
+
+        Args:
+            input_str (str): "<action> <argument>", or a JSON string with "action", "name"/"file_path"
+
+        Returns:
+            str: JSON string with status and the lookup result
+        """
+        try:
+            input_data = None
+            if isinstance(input_str, dict):
+                input_data = input_str
+            elif input_str.strip().startswith("{"):
+                input_data = json.loads(input_str)
+            if input_data is not None:
+                action = input_data.get("action", "")
+                argument = input_data.get("name") or input_data.get("file_path", "")
+                file_path = input_data.get("file_path") if input_data.get("name") else None
+            else:
+                parts = input_str.strip().split()
+                action = parts[0] if parts else ""
+                argument = parts[1] if len(parts) > 1 else ""
+                file_path = parts[2] if len(parts) > 2 else None
+
+            if not argument:
+                return json.dumps({"status": "error", "message": "Missing file or symbol name"})
+            if action == "outline":
+                return json.dumps({"status": "success", **self.index.outline(argument)})
+            if action in ("find_symbol", "references"):
+                result = self.index.find_symbol(argument, include_references=action == "references")
+                if not result["definitions"] and not result.get("references"):
+                    return json.dumps({"status": "error", "message": f"No definition of {argument} found"})
+                return json.dumps({"status": "success", **result})
+            if action == "read_symbol":
+                result = self.index.read_symbol(argument, file_path)
+                if result is None:
+                    return json.dumps({"status": "error", "message": f"No definition of {argument} found"})
+                return json.dumps({"status": "success", **result})
+            return json.dumps({
+                "status": "error",
+                "message": f"Invalid action: {action}. Must be 'outline', 'find_symbol', 'references' or 'read_symbol'."
+            })
+        except Exception as e:
+            return json.dumps({
+                "status": "error",
+                "message": f"Symbol lookup failed: {str(e)}"
+            })
+
+    def _arun(self, query):
+        """
+        Async version of _run (not implemented).
+        """
+        raise NotImplementedError("CodeSymbolsTool does not support async")
@@ -0,0 +1,216 @@
+"""
+Command executor module for the Agentic Software-Development tool.
+This module runs shell commands with bounded memory: both pipes are read incrementally,
+only the head and tail of each stream are kept, and commands that run too long or go
+quiet are killed together with their whole process group.
+"""
+import os
+import time
+import signal
+import selectors
+import subprocess
+import logging
+from collections import deque
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Exit code reported for commands killed by a timeout (same as coreutils `timeout`)
+TIMEOUT_EXIT_CODE = 124
+
+DEFAULT_TIMEOUT = float(os.environ.get("SHELL_TIMEOUT", "300"))
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("SHELL_IDLE_TIMEOUT", "120"))
+DEFAULT_MAX_OUTPUT_BYTES = int(os.environ.get("SHELL_MAX_OUTPUT_BYTES", "100000"))
+
+
+class HeadTailBuffer:
+    """
+    Keeps the first and last bytes of a stream within a fixed byte cap.
+
+    Half of the cap holds the start of the output, the other half is a ring of the
+    most recent output; everything in between is counted but discarded.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Initialize the buffer.
+
+        Args:
+            max_bytes (int): Maximum number of bytes retained
+        """
+        self.head_cap = max_bytes // 2
+        self.tail_cap = max_bytes - self.head_cap
+        self.head = bytearray()
+        self.tail = deque()
+        self.tail_len = 0
+        self.total_bytes = 0
+
+    def write(self, data):
+        """
+        Append output.
+
+        Args:
+            data (bytes): The bytes read from the stream
+        """
+        self.total_bytes += len(data)
+        if len(self.head) < self.head_cap:
+            take = self.head_cap - len(self.head)
+            self.head += data[:take]
+            data = data[take:]
+        if not data or not self.tail_cap:
+            return
+        self.tail.append(data)
+        self.tail_len += len(data)
+        while self.tail_len > self.tail_cap:
+            excess = self.tail_len - self.tail_cap
+            first = self.tail[0]
+            if len(first) <= excess:
+                self.tail.popleft()
+                self.tail_len -= len(first)
+            else:
+                self.tail[0] = first[excess:]
+                self.tail_len -= excess
+
+    @property
+    def truncated(self):
+        """Whether any output was discarded."""
+        return self.total_bytes > len(self.head) + self.tail_len
+
+    @property
+    def omitted_bytes(self):
+        """Number of bytes discarded from the middle of the stream."""
+        return self.total_bytes - len(self.head) - self.tail_len
+
+    def getvalue(self):
+        """
+        Get the retained output.
+
+        Returns:
+            str: The decoded output, with a marker where bytes were discarded
+        """
+        tail = b"".join(self.tail)
+        if not self.truncated:
+            return (bytes(self.head) + tail).decode("utf-8", errors="replace")
+        return (
+            bytes(self.head).decode("utf-8", errors="replace")
+            + f"\n[... {self.omitted_bytes} bytes truncated ...]\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+
+def kill_process_group(process, grace=2.0):
+    """
+    Terminate a process and everything it spawned.
+
+    Sends SIGTERM to the process group, then SIGKILL if it is still alive after the
+    grace period.
+
+    Args:
+        process (subprocess.Popen): A process started with start_new_session=True
+        grace (float): Seconds to wait between SIGTERM and SIGKILL
+    """
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        try:
+            process.wait(timeout=grace)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def run_command(command, cwd="/sandbox/code", timeout=None, idle_timeout=None, max_output_bytes=None,
+                on_output=None):
+    """
+    Run a shell command with timeouts and capped output.
+
+    Args:
+        command (str): The bash command to execute
+        cwd (str): Working directory
+        timeout (float, optional): Wall-clock limit in seconds
+        idle_timeout (float, optional): Limit in seconds on time without any output
+        max_output_bytes (int, optional): Bytes retained per stream
+        on_output (callable, optional): Called as on_output(stream_name, text) for each chunk read
+
+    Returns:
+        dict: exit_code, stdout, stderr, plus truncation and timeout metadata
+    """
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    idle_timeout = DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+    max_output_bytes = DEFAULT_MAX_OUTPUT_BYTES if max_output_bytes is None else max_output_bytes
+
+    started = time.time()
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=True  # Own process group so timeouts can kill children too
+    )
+
+    buffers = {"stdout": HeadTailBuffer(max_output_bytes), "stderr": HeadTailBuffer(max_output_bytes)}
+    selector = selectors.DefaultSelector()
+    selector.register(process.stdout, selectors.EVENT_READ, "stdout")
+    selector.register(process.stderr, selectors.EVENT_READ, "stderr")
+
+    timed_out = None
+    last_output = started
+    try:
+        while selector.get_map():
+            now = time.time()
+            if now - started >= timeout:
+                timed_out = "wall"
+                break
+            if now - last_output >= idle_timeout:
+                timed_out = "idle"
+                break
+            # A background child may keep the pipes open after the command itself exits
+            if process.poll() is not None and now - last_output >= 0.2:
+                break
+
+            wait = min(timeout - (now - started), idle_timeout - (now - last_output), 0.2)
+            for key, _ in selector.select(timeout=max(wait, 0)):
+                data = os.read(key.fileobj.fileno(), 65536)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                last_output = time.time()
+                buffers[key.data].write(data)
+                if on_output:
+                    on_output(key.data, data.decode("utf-8", errors="replace"))
+
+        if timed_out is None:
+            try:
+                process.wait(timeout=max(timeout - (time.time() - started), 0))
+            except subprocess.TimeoutExpired:
+                timed_out = "wall"
+        if timed_out:
+            logger.warning(f"Command timed out ({timed_out}), killing process group: {command}")
+            kill_process_group(process)
+    finally:
+        selector.close()
+        process.stdout.close()
+        process.stderr.close()
+        if process.poll() is None and timed_out:
+            process.kill()
+
+    stderr = buffers["stderr"].getvalue()
+    if timed_out == "wall":
+        stderr += f"\n[command killed: exceeded {timeout:g}s time limit]"
+    elif timed_out == "idle":
+        stderr += f"\n[command killed: no output for {idle_timeout:g}s]"
+
+    return {
+        "exit_code": TIMEOUT_EXIT_CODE if timed_out else process.returncode,
+        "stdout": buffers["stdout"].getvalue(),
+        "stderr": stderr,
+        "truncated": buffers["stdout"].truncated or buffers["stderr"].truncated,
+        "stdout_bytes": buffers["stdout"].total_bytes,
+        "stderr_bytes": buffers["stderr"].total_bytes,
+        "timed_out": timed_out,
+        "duration": round(time.time() - started, 3)
+    }
@@ -0,0 +1,403 @@
+"""
+File edit helpers for the Agentic Software-Development tool.
+This module applies partial reads and targeted edits (search/replace blocks, line
+inserts and unified diffs) to file contents, so the agent only sends and receives the
+part of a file it is working on.
+"""
+import re
+import json
+import difflib
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Lines of unchanged context shown around each changed region
+CONTEXT_LINES = 3
+
+
+class EditError(ValueError):
+    """Raised when an edit cannot be applied to the current file contents."""
+
+
+def split_lines(content):
+    """
+    Split file contents into lines and their endings.
+
+    Only "\n" ends a line ("\r\n" counts as one ending). Unlike str.splitlines(),
+    form feeds, \x1c-\x1e, \x85, \u2028 and \u2029 stay inside their line.
+
+    Args:
+        content (str): The file contents
+
+    Returns:
+        tuple: (lines, endings); each ending is "\r\n", "\n", or "" for a last line
+               without a line ending
+    """
+    lines = []
+    endings = []
+    parts = content.split("\n")
+    for part in parts[:-1]:
+        if part.endswith("\r"):
+            lines.append(part[:-1])
+            endings.append("\r\n")
+        else:
+            lines.append(part)
+            endings.append("\n")
+    if parts[-1]:
+        lines.append(parts[-1])
+        endings.append("")
+    return lines, endings
+
+
+def join_lines(lines, endings):
+    """
+    Join lines back into file contents.
+
+    Args:
+        lines (list): Lines without line endings
+        endings (list): Each line's ending, as returned by split_lines
+
+    Returns:
+        str: The file contents
+    """
+    return "".join(line + ending for line, ending in zip(lines, endings))
+
+
+def newline_of(endings):
+    """
+    Get the line ending new lines should use: the one most lines already have.
+
+    Args:
+        endings (list): Line endings, as returned by split_lines
+
+    Returns:
+        str: "\r\n" or "\n"
+    """
+    return "\r\n" if endings.count("\r\n") > endings.count("\n") else "\n"
+
+
+def read_range(content, start_line=None, end_line=None, offset=None, length=None):
+    """
+    Select part of a file by line range or byte range.
+
+    Args:
+        content (str|bytes): The file contents; pass the raw bytes so byte ranges match
+                             the file on disk
+        start_line (int, optional): First line to return (1-based)
+        end_line (int, optional): Last line to return (inclusive)
+        offset (int, optional): Byte offset to start at
+        length (int, optional): Number of bytes to return
+
+    Returns:
+        dict: The selected "content" plus its position and the file's size
+    """
+    data = content if isinstance(content, bytes) else None
+    if data is not None:
+        content = data.decode("utf-8", errors="replace")
+    lines = [line + ending for line, ending in zip(*split_lines(content))]
+    if offset is not None or length is not None:
+        if data is None:
+            data = content.encode("utf-8")
+        start = max(int(offset or 0), 0)
+        end = len(data) if length is None else min(start + int(length), len(data))
+        return {
+            "content": data[start:end].decode("utf-8", errors="replace"),
+            "offset": start,
+            "length": end - start,
+            "total_bytes": len(data),
+            "total_lines": len(lines)
+        }
+
+    first = max(int(start_line or 1), 1)
+    last = len(lines) if end_line is None else min(int(end_line), len(lines))
+    if first > len(lines) and lines:
+        raise EditError(f"start_line {first} is past the end of the file ({len(lines)} lines)")
+    return {
+        "content": "".join(lines[first - 1:last]),
+        "start_line": first,
+        "end_line": last,
+        "total_lines": len(lines)
+    }
+
+
+def apply_replacements(content, edits):
+    """
+    Apply search/replace blocks in order.
+
+    Each search text must occur exactly once unless the edit sets "all": true. In a
+    mostly-CRLF file, line breaks in the search and replace texts are matched and written as CRLF.
+
+    Args:
+        content (str): The file contents
+        edits (list): Dicts with "search", "replace" and optionally "all"
+
+    Returns:
+        str: The new contents
+    """
+    crlf = newline_of(split_lines(content)[1]) == "\r\n"
+    for number, edit in enumerate(edits, 1):
+        search = edit.get("search", "")
+        replace = edit.get("replace", "")
+        if crlf:
+            search = search.replace("\r\n", "\n").replace("\n", "\r\n")
+            replace = replace.replace("\r\n", "\n").replace("\n", "\r\n")
+        if not search:
+            raise EditError(f"Edit {number}: \"search\" must not be empty")
+        count = content.count(search)
+        if count == 0:
+            raise EditError(f"Edit {number}: search text not found")
+        if count > 1 and not edit.get("all"):
+            raise EditError(f"Edit {number}: search text occurs {count} times; add more context "
+                            f"or set \"all\": true")
+        content = content.replace(search, replace)
+    return content
+
+
+def insert_lines(content, line, text):
+    """
+    Insert text so that it starts at the given line.
+
+    Inserted lines get the file's usual line ending. Text appended at the end of the
+    file decides whether the file ends with a line ending.
+
+    Args:
+        content (str): The file contents
+        line (int): 1-based line number the text will occupy; past-the-end appends
+        text (str): The text to insert
+
+    Returns:
+        str: The new contents
+    """
+    lines, endings = split_lines(content)
+    line = int(line)
+    if line < 1 or line > len(lines) + 1:
+        raise EditError(f"line must be between 1 and {len(lines) + 1}")
+    newline = newline_of(endings)
+    new_lines = split_lines(text)[0] or [""]
+    new_endings = [newline] * len(new_lines)
+    if line == len(lines) + 1:
+        if endings:
+            # The old last line is followed by the inserted text now
+            endings[-1] = endings[-1] or newline
+        new_endings[-1] = newline if text.endswith("\n") else ""
+    lines[line - 1:line - 1] = new_lines
+    endings[line - 1:line - 1] = new_endings
+    return join_lines(lines, endings)
+
+
+def parse_unified_diff(patch):
+    """
+    Parse the hunks of a unified diff for a single file.
+
+    Header lines (---, +++, diff, index) are skipped. Hunk line counts are only used to
+    tell a file header from a removed line starting with "--"; the hunk body decides
+    what is removed and added.
+
+    Args:
+        patch (str): The unified diff
+
+    Returns:
+        list: Hunk dicts with "old_start", "old_lines", "new_lines", "sources" (for each
+              new line, the index of the old context line it repeats, or None if added),
+              and "old_eof"/"new_eof", set when a "\\ No newline at end of file" marker
+              says that side's last line has no line ending
+    """
+    hunks = []
+    current = None
+    remaining = 0
+    marker = None
+    lines = patch.split("\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    for raw in lines:
+        raw = raw[:-1] if raw.endswith("\r") else raw
+        match = _HUNK_RE.match(raw)
+        if match:
+            current = {"old_start": int(match.group(1)), "old_lines": [], "new_lines": [], "sources": [],
+                       "old_eof": False, "new_eof": False}
+            hunks.append(current)
+            # Stated lines left in the hunk; only used to tell file headers from content
+            remaining = int(match.group(2) or 1) + int(match.group(4) or 1)
+            marker = None
+            continue
+        if current is None:
+            # Preamble
+            continue
+        if raw.startswith("\\"):
+            # "\ No newline at end of file" applies to the side(s) of the line before it
+            if marker in (" ", "-"):
+                current["old_eof"] = True
+            if marker in (" ", "+"):
+                current["new_eof"] = True
+            continue
+        if raw.startswith("diff ") or raw.startswith("index ") or \
+                (remaining <= 0 and (raw.startswith("--- ") or raw.startswith("+++ "))):
+            current = None
+            continue
+        marker, text = (raw[:1], raw[1:]) if raw else (" ", "")
+        if marker == " ":
+            current["sources"].append(len(current["old_lines"]))
+            current["old_lines"].append(text)
+            current["new_lines"].append(text)
+            remaining -= 2
+        elif marker == "-":
+            current["old_lines"].append(text)
+            remaining -= 1
+        elif marker == "+":
+            current["sources"].append(None)
+            current["new_lines"].append(text)
+            remaining -= 1
+        else:
+            raise EditError(f"Malformed patch line: {raw[:80]}")
+    if not hunks:
+        raise EditError("Patch contains no hunks")
+    return hunks
+
+
+def _find_block(lines, block, expected):
+    """Find block in lines, preferring the position closest to expected."""
+    if not block:
+        return min(max(expected, 0), len(lines))
+    size = len(block)
+    for distance in range(len(lines) + 1):
+        for position in (expected - distance, expected + distance):
+            if 0 <= position <= len(lines) - size and lines[position:position + size] == block:
+                return position
+        if expected - distance < 0 and expected + distance > len(lines) - size:
+            break
+    return None
+
+
+def apply_unified_diff(content, patch):
+    """
+    Apply a unified diff to file contents.
+
+    Each hunk's context and removed lines must match the file exactly (ignoring line
+    endings). A hunk is searched for near its stated line first, so diffs with stale
+    line numbers still apply. Context lines keep their own line endings and added lines
+    get the file's usual one. Whether the file ends with a line ending only changes when
+    the patch says so with a "\\ No newline at end of file" marker.
+
+    Args:
+        content (str): The file contents
+        patch (str): The unified diff
+
+    Returns:
+        str: The new contents
+    """
+    lines, endings = split_lines(content)
+    newline = newline_of(endings)
+    offset = 0
+    for number, hunk in enumerate(parse_unified_diff(patch), 1):
+        old_start, old_lines, new_lines = hunk["old_start"], hunk["old_lines"], hunk["new_lines"]
+        base = max(old_start - 1, 0)
+        expected = base + offset
+        position = _find_block(lines, old_lines, expected)
+        if position is None:
+            raise EditError(f"Hunk {number} (@@ -{old_start}) does not match the file; re-read the "
+                            f"lines around {old_start} and regenerate the patch")
+        end = position + len(old_lines)
+        at_eof = end == len(lines)
+        # An empty file gets a final line ending unless the patch says otherwise
+        final_ending = endings[-1] if endings else newline
+        old_endings = endings[position:end]
+        new_endings = [newline if source is None else old_endings[source] or newline
+                       for source in hunk["sources"]]
+        lines[position:end] = new_lines
+        endings[position:end] = new_endings
+        if at_eof and endings:
+            if hunk["new_eof"]:
+                final_ending = ""
+            elif hunk["old_eof"]:
+                final_ending = newline
+            endings[-1] = final_ending
+        # Later hunks shift by this hunk's size change and by how far it was found from its stated line
+        offset = position - base + len(new_lines) - len(old_lines)
+    return join_lines(lines, endings)
+
+
+def changed_line_ranges(old_content, new_content):
+    """
+    Find the lines of the new contents that differ from the old contents.
+
+    Args:
+        old_content (str): The contents before the edit
+        new_content (str): The contents after the edit
+
+    Returns:
+        list: (start_line, end_line) tuples in the new contents; pure deletions are
+              reported as the line following the removed block
+    """
+    matcher = difflib.SequenceMatcher(None, split_lines(old_content)[0], split_lines(new_content)[0], autojunk=False)
+    ranges = []
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            ranges.append((j1 + 1, max(j2, j1 + 1)))
+    return ranges
+
+
+def merge_ranges(ranges, context=CONTEXT_LINES):
+    """
+    Merge changed line ranges that overlap once context lines are added.
+
+    Args:
+        ranges (list): (start_line, end_line) tuples
+        context (int): Lines of context around each range
+
+    Returns:
+        list: Merged (start_line, end_line) tuples, without context
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start - context <= merged[-1][1] + context + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def changed_regions(content, ranges, context=CONTEXT_LINES):
+    """
+    Render the changed regions of the new contents with line numbers.
+
+    Args:
+        content (str): The new file contents
+        ranges (list): (start_line, end_line) tuples that changed
+        context (int): Lines of context around each region
+
+    Returns:
+        list: Dicts with "start_line", "end_line" and numbered "snippet"
+    """
+    lines = split_lines(content)[0]
+    regions = []
+    for start, end in merge_ranges(ranges, context):
+        first = max(start - context, 1)
+        last = min(end + context, len(lines))
+        snippet = "\n".join(f"{number:>5}| {lines[number - 1]}" for number in range(first, last + 1))
+        regions.append({"start_line": start, "end_line": end, "snippet": snippet})
+    return regions
+
+
+def check_syntax(file_path, content):
+    """
+    Check edited contents of languages with a parser available in-process.
+
+    Args:
+        file_path (str): The file path, used to pick the language
+        content (str): The new file contents
+
+    Returns:
+        str: A description of the syntax error, or None
+    """
+    if file_path.endswith(".py"):
+        try:
+            compile(content, file_path, "exec")
+        except SyntaxError as e:
+            return f"SyntaxError at line {e.lineno}: {e.msg}"
+        except ValueError as e:
+            return str(e)
+    elif file_path.endswith(".json"):
+        try:
+            json.loads(content)
+        except ValueError as e:
+            return f"Invalid JSON: {str(e)}"
+    return None
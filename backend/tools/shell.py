@@ -4,13 +4,17 @@ This tool allows executing bash commands in the container.
 """
 import os
 import json
-import subprocess
+from typing import Any, Optional
 from langchain.tools import BaseTool
+from backend.api.metrics import timed_tool
+from backend.tools.executor import run_command, DEFAULT_TIMEOUT, DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_OUTPUT_BYTES
 
 class ShellTool(BaseTool):
     name = "Shell"
     description = """
     Execute bash commands inside the container's /sandbox/code or anywhere under the mounted home.
+    The shell is persistent for the workflow: `cd`, exported variables and activated
+    virtualenvs carry over to later commands.
     
     Input should be a string with the bash command to execute.
     
@@ -18,39 +22,70 @@ class ShellTool(BaseTool):
     - "exit_code": The exit code of the command
     - "stdout": The standard output of the command
     - "stderr": The standard error of the command
+    - "truncated": True if the middle of a long output was elided
+    - "timed_out": "wall" or "idle" if the command was killed for running too long
     """
+    timeout: float = DEFAULT_TIMEOUT
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES
+    session_manager: Any = None
+    session_key: Optional[str] = None
     
+    def for_workflow(self, workflow_id):
+        """
+        Get a copy of this tool that runs commands in the workflow's persistent shell.
+        
+        Args:
+            workflow_id (str): The workflow (or session) ID keying the shell session
+            
+        Returns:
+            ShellTool: The bound tool, or this tool if no session manager is configured
+        """
+        if self.session_manager is None or not workflow_id:
+            return self
+        return ShellTool(
+            timeout=self.timeout,
+            idle_timeout=self.idle_timeout,
+            max_output_bytes=self.max_output_bytes,
+            session_manager=self.session_manager,
+            session_key=workflow_id
+        )
+    
+    @timed_tool
     def _run(self, command):
         """
         Run a shell command.
         
+        Output is read as it is produced and capped at max_output_bytes per stream;
+        the command is killed after timeout seconds, or idle_timeout seconds without output.
+        Bound tools run in their persistent shell session, others in a fresh process.
+        
         Args:
             command (str): The bash command to execute
             
         Returns:
-            str: JSON string with exit_code, stdout, and stderr
+            str: JSON string with exit_code, stdout, stderr and truncation metadata
         """
         try:
-            # Execute the command
-            process = subprocess.Popen(
+            if self.session_key:
+                result = self.session_manager.run(
+                    self.session_key,
+                    command,
+                    timeout=self.timeout,
+                    idle_timeout=self.idle_timeout,
+                    max_output_bytes=self.max_output_bytes
+                )
+                return json.dumps(result)
+            
+            # Execute the command in the mounted directory
+            result = run_command(
                 command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd="/sandbox/code"  # Set working directory to the mounted directory
+                cwd="/sandbox/code",
+                timeout=self.timeout,
+                idle_timeout=self.idle_timeout,
+                max_output_bytes=self.max_output_bytes
             )
-            
-            # Get output
-            stdout, stderr = process.communicate()
-            exit_code = process.returncode
-            
-            # Return result
-            return json.dumps({
-                "exit_code": exit_code,
-                "stdout": stdout,
-                "stderr": stderr
-            })
+            return json.dumps(result)
             
         except Exception as e:
             return json.dumps({
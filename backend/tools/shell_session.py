@@ -0,0 +1,556 @@
+"""
+Shell session module for the Agentic Software-Development tool.
+This module keeps a PTY-backed bash process alive per workflow so the working directory,
+environment variables and activated virtualenvs carry over between commands. Command
+output is delimited with unique sentinels and idle shells are reaped after a TTL.
+"""
+import os
+import pty
+import time
+import uuid
+import errno
+import fcntl
+import select
+import signal
+import struct
+import termios
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from backend.tools.executor import HeadTailBuffer, TIMEOUT_EXIT_CODE, DEFAULT_TIMEOUT, DEFAULT_IDLE_TIMEOUT, \
+    DEFAULT_MAX_OUTPUT_BYTES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SENTINEL_PREFIX = "__OMNI_DONE_"
+
+# Environment that keeps interactive programs from waiting on a pager or editor
+SHELL_ENV = {
+    "TERM": "dumb",
+    "PAGER": "cat",
+    "GIT_PAGER": "cat",
+    "PS1": "",
+    "PS2": "",
+    "PROMPT_COMMAND": ""
+}
+
+
+class ShellSession:
+    """
+    A persistent bash process attached to a pseudo-terminal.
+
+    Commands run one at a time. Each command is written to a temporary script that is
+    sourced by the shell, followed by a printf of a unique sentinel carrying the exit
+    code and working directory, so multi-line commands and heredocs behave exactly as
+    they would when typed.
+    """
+
+    def __init__(self, key, cwd="/sandbox/code"):
+        """
+        Start the shell.
+
+        Args:
+            key (str): The session key (workflow or session ID)
+            cwd (str): Initial working directory
+        """
+        self.key = key
+        self.cwd = cwd
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.commands = 0
+        # Callers holding the session from ShellSessionManager.acquire; guarded by the manager lock
+        self.users = 0
+
+        env = {**os.environ, **SHELL_ENV}
+        self.pid, self.fd = pty.fork()
+        if self.pid == 0:
+            try:
+                os.chdir(cwd)
+            except OSError:
+                pass
+            os.execvpe("bash", ["bash", "--noprofile", "--norc", "--noediting"], env)
+
+        # Wide terminal so tools don't wrap their output
+        fcntl.ioctl(self.fd, termios.TIOCSWINSZ, struct.pack("HHHH", 50, 200, 0, 0))
+        self._write("stty -echo -onlcr; set +H; unset HISTFILE\n")
+        exit_code, _, timed_out = self._run_sentinel("true", timeout=10, idle_timeout=10)
+        if timed_out or exit_code is None:
+            self.close()
+            raise RuntimeError(f"Shell session {key} failed to start")
+        logger.info(f"Started shell session {key} (pid {self.pid})")
+
+    @property
+    def alive(self):
+        """Whether the bash process is still running."""
+        if self.fd is None:
+            return False
+        try:
+            pid, _ = os.waitpid(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            return False
+        return pid == 0
+
+    def _write(self, data):
+        """Write all of data to the terminal."""
+        data = data.encode("utf-8") if isinstance(data, str) else data
+        while data:
+            written = os.write(self.fd, data)
+            data = data[written:]
+
+    def _run_sentinel(self, line, timeout, idle_timeout, buffer=None, on_output=None):
+        """
+        Send a command line followed by a sentinel and read until the sentinel arrives.
+
+        Args:
+            line (str): The shell line to execute
+            timeout (float): Wall-clock limit in seconds
+            idle_timeout (float): Limit in seconds on time without any output
+            buffer (HeadTailBuffer, optional): Receives the command output
+            on_output (callable, optional): Called as on_output("stdout", text) for each chunk
+
+        Returns:
+            tuple: (exit_code or None, cwd or None, timed_out reason or None). The exit code
+                   is None without a timeout if the session was closed.
+        """
+        token = uuid.uuid4().hex
+        marker = f"{SENTINEL_PREFIX}{token}__".encode()
+        # The marker is assembled by printf so it never appears in the command text itself.
+        # It shares the command's line so a command reading stdin cannot consume it.
+        try:
+            self._write(f"{line}; __omni_rc=$?; printf '%s%s:%s:%s\\n' '{SENTINEL_PREFIX}' '{token}__' "
+                        f"\"$__omni_rc\" \"$PWD\"\n")
+        except (OSError, TypeError):
+            # The terminal was closed (fd is None or no longer valid)
+            return None, None, None
+
+        # Hold back enough bytes to recognize a marker split across reads
+        hold = len(marker) + 8
+        pending = b""
+        started = last_output = time.time()
+
+        def flush(data):
+            if data and buffer is not None:
+                buffer.write(data)
+            if data and on_output:
+                on_output("stdout", data.decode("utf-8", errors="replace"))
+
+        while True:
+            now = time.time()
+            if now - started >= timeout:
+                flush(pending)
+                return None, None, "wall"
+            if now - last_output >= idle_timeout:
+                flush(pending)
+                return None, None, "idle"
+
+            fd = self.fd
+            if fd is None:
+                # Closed from another thread while the command was running
+                flush(pending)
+                return None, None, None
+            wait = min(timeout - (now - started), idle_timeout - (now - last_output), 0.5)
+            try:
+                ready, _, _ = select.select([fd], [], [], max(wait, 0))
+                if not ready:
+                    continue
+                data = os.read(fd, 65536)
+            except (OSError, ValueError) as e:
+                if self.fd is None or getattr(e, "errno", None) == errno.EBADF:
+                    flush(pending)
+                    return None, None, None
+                if getattr(e, "errno", None) != errno.EIO:
+                    raise
+                data = b""
+            if not data:
+                # The shell exited (e.g. the command ran `exit`)
+                flush(pending)
+                return self._exit_status(), None, None
+
+            last_output = time.time()
+            pending += data
+            index = pending.find(marker)
+            if index != -1:
+                newline = pending.find(b"\n", index)
+                if newline != -1:
+                    flush(pending[:index])
+                    _, exit_code, cwd = pending[index:newline].decode("utf-8", errors="replace").split(":", 2)
+                    return int(exit_code), cwd, None
+                continue
+            if len(pending) > hold:
+                flush(pending[:-hold])
+                pending = pending[-hold:]
+
+    def _exit_status(self):
+        """Reap the exited shell and return its exit code."""
+        try:
+            _, status = os.waitpid(self.pid, 0)
+        except ChildProcessError:
+            return 1
+        self._close_fd()
+        return os.waitstatus_to_exitcode(status)
+
+    def run(self, command, timeout=None, idle_timeout=None, max_output_bytes=None, on_output=None):
+        """
+        Run a command in the session.
+
+        On a timeout the foreground job is interrupted with Ctrl-C; if the shell does
+        not come back the session is closed.
+
+        Args:
+            command (str): The bash command to execute
+            timeout (float, optional): Wall-clock limit in seconds
+            idle_timeout (float, optional): Limit in seconds on time without any output
+            max_output_bytes (int, optional): Bytes of output retained
+            on_output (callable, optional): Called as on_output("stdout", text) for each chunk read
+
+        Returns:
+            dict: exit_code, stdout, stderr, cwd, plus truncation and timeout metadata.
+                  The terminal merges stderr into stdout.
+        """
+        timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+        idle_timeout = DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        max_output_bytes = DEFAULT_MAX_OUTPUT_BYTES if max_output_bytes is None else max_output_bytes
+
+        with self.lock:
+            started = time.time()
+            self.last_used = started
+            self.commands += 1
+            buffer = HeadTailBuffer(max_output_bytes)
+
+            script_fd, script_path = tempfile.mkstemp(prefix="omni-shell-", suffix=".sh")
+            with os.fdopen(script_fd, "w") as script:
+                script.write(command + "\n")
+
+            try:
+                exit_code, cwd, timed_out = self._run_sentinel(
+                    f". {script_path}", timeout, idle_timeout, buffer=buffer, on_output=on_output
+                )
+                if timed_out:
+                    logger.warning(f"Command timed out ({timed_out}) in shell session {self.key}: {command}")
+                    self.interrupt()
+                    # Let the shell handle SIGINT before sending it more input
+                    time.sleep(0.2)
+                    # Resynchronize with the shell; give up on it if it doesn't answer
+                    _, cwd, stuck = self._run_sentinel("true", timeout=5, idle_timeout=5)
+                    if stuck:
+                        self.close()
+            finally:
+                try:
+                    os.unlink(script_path)
+                except OSError:
+                    pass
+
+            if cwd:
+                self.cwd = cwd
+            self.last_used = time.time()
+
+            stderr = ""
+            if timed_out == "wall":
+                stderr = f"[command killed: exceeded {timeout:g}s time limit]"
+            elif timed_out == "idle":
+                stderr = f"[command killed: no output for {idle_timeout:g}s]"
+            elif exit_code is None:
+                stderr = "[shell session closed]"
+                exit_code = 1
+            elif self.fd is None:
+                stderr = "[shell session exited]"
+
+            return {
+                "exit_code": TIMEOUT_EXIT_CODE if timed_out else exit_code,
+                "stdout": buffer.getvalue(),
+                "stderr": stderr,
+                "cwd": self.cwd,
+                "truncated": buffer.truncated,
+                "stdout_bytes": buffer.total_bytes,
+                "stderr_bytes": 0,
+                "timed_out": timed_out,
+                "duration": round(time.time() - started, 3)
+            }
+
+    def write_input(self, data):
+        """
+        Send input to the running command.
+
+        Args:
+            data (str): Text to write to the terminal
+        """
+        if self.fd is not None:
+            self._write(data)
+
+    def interrupt(self):
+        """Send Ctrl-C to the foreground job."""
+        if self.fd is not None:
+            self._write(b"\x03")
+
+    def send_signal(self, sig):
+        """
+        Signal the foreground job.
+
+        SIGINT is delivered as Ctrl-C through the terminal; other signals go to the
+        terminal's foreground process group, never to the shell itself.
+
+        Args:
+            sig (int): The signal number
+
+        Returns:
+            bool: True if a job was signalled
+        """
+        # Only commands started through run() are signalled, never the idle shell
+        if self.fd is None or not self.lock.locked():
+            return False
+        if sig == signal.SIGINT:
+            self.interrupt()
+            return True
+        try:
+            pgid = os.tcgetpgrp(self.fd)
+        except OSError:
+            return False
+        if pgid in (-1, self.pid):
+            return False
+        try:
+            os.killpg(pgid, sig)
+        except ProcessLookupError:
+            return False
+        return True
+
+    def _close_fd(self):
+        """Close the terminal, hanging up the shell's jobs."""
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+
+    def close(self):
+        """Terminate the shell and everything it started."""
+        self._close_fd()
+        for sig in (signal.SIGHUP, signal.SIGKILL):
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                break
+            time.sleep(0.1)
+            try:
+                if os.waitpid(self.pid, os.WNOHANG)[0]:
+                    break
+            except ChildProcessError:
+                break
+        logger.info(f"Closed shell session {self.key}")
+
+
+class ShellSessionManager:
+    """
+    Registry of persistent shell sessions keyed by workflow (or session) ID.
+
+    Sessions are created on first use, restarted if their shell exited, and closed once
+    idle for longer than idle_ttl or when more than max_sessions are open.
+    """
+
+    def __init__(self, cwd="/sandbox/code", idle_ttl=1800, max_sessions=32, reap_interval=60):
+        """
+        Initialize the manager and start the reaper thread.
+
+        Args:
+            cwd (str): Initial working directory of new sessions
+            idle_ttl (float): Seconds of inactivity before a session is closed
+            max_sessions (int): Maximum number of open sessions
+            reap_interval (float): Seconds between idle checks
+        """
+        self.cwd = cwd
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.created = 0
+        self.reaped = 0
+
+        self._reaper = threading.Thread(target=self._reap_loop, args=(reap_interval,), name="shell-reaper", daemon=True)
+        self._reaper.start()
+
+    def acquire(self, key):
+        """
+        Get the live session for a key, starting one if needed, and mark it in use.
+
+        The in-use mark is taken under the manager lock, so the session cannot be evicted
+        or reaped between this call and the command started on it. Pass the session to
+        release() when done.
+
+        Args:
+            key (str): The session key
+
+        Returns:
+            ShellSession: The session
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and not session.alive:
+                del self._sessions[key]
+                session = None
+            if session is not None:
+                self._sessions.move_to_end(key)
+                session.users += 1
+                return session
+
+        # Starting a shell can take seconds, so it happens outside the lock
+        os.makedirs(self.cwd, exist_ok=True)
+        started = ShellSession(key, cwd=self.cwd)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None or not session.alive:
+                session = self._sessions[key] = started
+                self.created += 1
+                started = None
+            self._sessions.move_to_end(key)
+            session.users += 1
+            evicted = self._evict_idle(len(self._sessions) - self.max_sessions, keep=key)
+        if started is not None:
+            # Another thread started this key's shell first
+            started.close()
+        self._close_evicted(evicted, "Evicting")
+        return session
+
+    def release(self, session):
+        """
+        Drop the in-use mark taken by acquire().
+
+        Args:
+            session (ShellSession): The session returned by acquire()
+        """
+        with self._lock:
+            session.users -= 1
+
+    def _evict_idle(self, count, keep=None):
+        """
+        Remove up to count least recently used sessions that are not running a command.
+        Caller holds the manager lock; the returned sessions are still locked and must
+        be passed to _close_evicted.
+
+        Sessions that are in use are skipped, so the manager can briefly exceed max_sessions.
+
+        Args:
+            count (int): Number of sessions to remove
+            keep (str, optional): Key that must not be removed
+
+        Returns:
+            list: The removed sessions
+        """
+        evicted = []
+        for key, session in list(self._sessions.items()):
+            if len(evicted) >= count:
+                break
+            # Taking the session lock keeps a command from starting on it while it closes
+            if key != keep and not session.users and session.lock.acquire(blocking=False):
+                del self._sessions[key]
+                evicted.append(session)
+        return evicted
+
+    def _close_evicted(self, sessions, reason):
+        """Close sessions removed by _evict_idle (or reap_idle) and release their locks."""
+        for session in sessions:
+            logger.info(f"{reason} shell session {session.key}")
+            try:
+                session.close()
+            finally:
+                session.lock.release()
+
+    def run(self, key, command, **kwargs):
+        """
+        Run a command in the session for a key.
+
+        Args:
+            key (str): The session key
+            command (str): The bash command to execute
+            **kwargs: Passed to ShellSession.run
+
+        Returns:
+            dict: The command result
+        """
+        session = self.acquire(key)
+        try:
+            return session.run(command, **kwargs)
+        finally:
+            self.release(session)
+
+    def find(self, key):
+        """
+        Get the live session for a key without starting one.
+
+        Args:
+            key (str): The session key
+
+        Returns:
+            ShellSession: The session, or None
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+        return session if session is not None and session.alive else None
+
+    def close(self, key):
+        """
+        Close the session for a key if it exists.
+
+        Args:
+            key (str): The session key
+        """
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            session.close()
+
+    def _reap_loop(self, interval):
+        """Close idle sessions until stopped."""
+        while not self._stopped.wait(interval):
+            self.reap_idle()
+
+    def reap_idle(self):
+        """Close sessions idle for longer than idle_ttl."""
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            sessions = []
+            for key, session in list(self._sessions.items()):
+                if session.last_used < cutoff and not session.users and session.lock.acquire(blocking=False):
+                    del self._sessions[key]
+                    sessions.append(session)
+        self._close_evicted(sessions, "Reaping idle")
+        self.reaped += len(sessions)
+
+    def get_stats(self):
+        """
+        Get open sessions and counters.
+
+        Returns:
+            dict: Session statistics
+        """
+        now = time.time()
+        with self._lock:
+            return {
+                "open": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "created": self.created,
+                "reaped": self.reaped,
+                "sessions": [
+                    {
+                        "key": session.key,
+                        "cwd": session.cwd,
+                        "commands": session.commands,
+                        "busy": bool(session.users) or session.lock.locked(),
+                        "idle_seconds": round(now - session.last_used, 1)
+                    }
+                    for session in self._sessions.values()
+                ]
+            }
+
+    def shutdown(self):
+        """Stop the reaper and close every session."""
+        self._stopped.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
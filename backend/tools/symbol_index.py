@@ -0,0 +1,528 @@
+"""
+Symbol index module for the Agentic Software-Development tool.
+This module parses source files under /sandbox/code into definitions and references
+(Python via ast, JavaScript/TypeScript via a lightweight tokenizer) so the agent can
+jump straight to a function instead of reading whole files. Parsed files are cached
+by mtime and size.
+"""
+import os
+import re
+import ast
+import threading
+import logging
+from collections import OrderedDict
+from backend.tools.code_index import SKIP_DIRS, MAX_FILE_BYTES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PYTHON_EXTENSIONS = (".py", ".pyi")
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+
+_JS_TOKEN_RE = re.compile(r"""
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punct>=>|\.\.\.|[^\s\w$])
+""", re.VERBOSE | re.DOTALL)
+
+_JS_KEYWORDS = frozenset({
+    "if", "for", "while", "switch", "catch", "function", "return", "typeof", "new", "await",
+    "else", "do", "try", "finally", "with", "super", "import", "export", "default", "delete",
+    "in", "of", "instanceof", "void", "yield", "case", "throw", "this", "const", "let", "var",
+    "class", "extends", "async", "static", "get", "set", "interface", "type", "enum", "true",
+    "false", "null", "undefined", "public", "private", "protected", "readonly", "implements"
+})
+
+
+def _definition(name, qualname, kind, line, end_line, signature):
+    """Build a definition record."""
+    return {
+        "name": name,
+        "qualname": qualname,
+        "kind": kind,
+        "line": line,
+        "end_line": end_line,
+        "signature": signature.strip()
+    }
+
+
+def parse_python(source):
+    """
+    Parse Python source into definitions and references.
+
+    Args:
+        source (str): The file contents
+
+    Returns:
+        dict: "definitions" (functions, classes, methods and module-level variables) and
+              "references" ({name: [line, ...]}), or "error" if the file does not parse
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        return {"definitions": [], "references": {}, "error": f"SyntaxError: {str(e)}"}
+    lines = source.splitlines()
+    definitions = []
+
+    def visit(body, prefix, in_class):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = f"{prefix}{node.name}"
+                if isinstance(node, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if in_class else "function"
+                # Decorators come before the def line but belong to the definition
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                signature = lines[node.lineno - 1] if node.lineno <= len(lines) else node.name
+                definitions.append(_definition(node.name, qualname, kind, start,
+                                               getattr(node, "end_lineno", node.lineno), signature))
+                visit(node.body, qualname + ".", isinstance(node, ast.ClassDef))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not prefix:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        definitions.append(_definition(
+                            target.id, target.id, "variable", node.lineno,
+                            getattr(node, "end_lineno", node.lineno), lines[node.lineno - 1]
+                        ))
+            elif isinstance(node, (ast.If, ast.Try, ast.With)) and not prefix:
+                # Module-level definitions guarded by if/try (e.g. optional imports)
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    visit(getattr(node, field, []), prefix, in_class)
+            elif isinstance(node, ast.ExceptHandler):
+                visit(node.body, prefix, in_class)
+
+    visit(tree.body, "", False)
+
+    references = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            name, line = node.id, node.lineno
+        elif isinstance(node, ast.Attribute):
+            name, line = node.attr, getattr(node, "end_lineno", node.lineno)
+        else:
+            continue
+        references.setdefault(name, []).append(line)
+    for name in references:
+        references[name] = sorted(set(references[name]))
+    return {"definitions": definitions, "references": references}
+
+
+def tokenize_js(source):
+    """
+    Split JavaScript/TypeScript source into identifier and punctuation tokens.
+
+    Comments and string literals are dropped. Regex literals are not recognised, which
+    only matters for the rare regex containing braces or quotes.
+
+    Args:
+        source (str): The file contents
+
+    Returns:
+        list: (kind, value, line) tuples with kind "ident", "number" or "punct"
+    """
+    tokens = []
+    line = 1
+    position = 0
+    while position < len(source):
+        match = _JS_TOKEN_RE.match(source, position)
+        if match is None:
+            # Unterminated string or comment; skip the character
+            position += 1
+            continue
+        kind = match.lastgroup
+        value = match.group()
+        if kind in ("ident", "number", "punct"):
+            tokens.append((kind, value, line))
+        line += value.count("\n")
+        position = match.end()
+    return tokens
+
+
+def _matching_braces(tokens):
+    """Map the index of each opening brace token to the index of its closing brace."""
+    pairs = {}
+    stack = []
+    for index, (kind, value, _) in enumerate(tokens):
+        if kind != "punct":
+            continue
+        if value == "{":
+            stack.append(index)
+        elif value == "}" and stack:
+            pairs[stack.pop()] = index
+    return pairs
+
+
+def parse_js(source):
+    """
+    Parse JavaScript/TypeScript source into definitions and references.
+
+    Recognises function declarations, classes and their methods, functions assigned
+    to const/let/var, top-level variables, and TypeScript interfaces, types and enums.
+
+    Args:
+        source (str): The file contents
+
+    Returns:
+        dict: "definitions" and "references" ({name: [line, ...]})
+    """
+    tokens = tokenize_js(source)
+    lines = source.splitlines()
+    braces = _matching_braces(tokens)
+    definitions = []
+    defined_at = set()
+
+    def value(index):
+        return tokens[index][1] if 0 <= index < len(tokens) else None
+
+    def body_end(index):
+        """Line of the brace closing the first block opened at or after index."""
+        for position in range(index, min(index + 400, len(tokens))):
+            if value(position) == "{":
+                closing = braces.get(position)
+                return tokens[closing][2] if closing is not None else tokens[position][2]
+            if value(position) == ";" and position > index:
+                break
+        return tokens[min(index, len(tokens) - 1)][2]
+
+    def statement_end(index):
+        """Line of the end of a statement or expression body starting at index."""
+        depth = 0
+        for position in range(index, len(tokens)):
+            token = value(position)
+            if token in ("(", "[", "{"):
+                depth += 1
+            elif token in (")", "]", "}"):
+                if depth == 0:
+                    return tokens[position][2]
+                depth -= 1
+                # A block body ends the statement even without a semicolon
+                if depth == 0 and token == "}" and value(position + 1) not in (")", ".", ",", "(", "?", ":"):
+                    return tokens[position][2]
+            elif token == ";" and depth == 0:
+                return tokens[position][2]
+        return tokens[-1][2]
+
+    def add(name_index, qualname, kind, end_line):
+        line = tokens[name_index][2]
+        definitions.append(_definition(tokens[name_index][1], qualname, kind, line, end_line,
+                                       lines[line - 1] if line <= len(lines) else ""))
+        defined_at.add(name_index)
+
+    # Class bodies currently open: (closing brace index, class name, brace depth of members)
+    classes = []
+    depth = 0
+    for index, (kind, token, line) in enumerate(tokens):
+        while classes and index > classes[-1][0]:
+            classes.pop()
+        if kind == "punct":
+            if token == "{":
+                depth += 1
+            elif token == "}":
+                depth -= 1
+            continue
+        if kind != "ident":
+            continue
+        next_token = value(index + 1)
+
+        if token == "function":
+            name_index = index + 2 if next_token == "*" else index + 1
+            if tokens[name_index:name_index + 1] and tokens[name_index][0] == "ident":
+                # Skip the parameter list so default values like {a: 1} are not taken for the body
+                closing = _matching_paren(tokens, name_index + 1) if value(name_index + 1) == "(" else None
+                add(name_index, tokens[name_index][1], "function",
+                    body_end(closing + 1 if closing is not None else name_index))
+        elif token == "class" and index + 1 < len(tokens) and tokens[index + 1][0] == "ident" \
+                and next_token not in ("extends", "implements"):
+            add(index + 1, next_token, "class", body_end(index + 1))
+            for position in range(index + 1, min(index + 400, len(tokens))):
+                if value(position) == "{":
+                    if position in braces:
+                        classes.append((braces[position], next_token, depth + 1))
+                    break
+        elif token in ("interface", "enum") and index + 1 < len(tokens) and tokens[index + 1][0] == "ident" \
+                and value(index - 1) != ".":
+            add(index + 1, next_token, token, body_end(index + 1))
+        elif token == "type" and index + 2 < len(tokens) and tokens[index + 1][0] == "ident" \
+                and value(index + 2) in ("=", "<") and value(index - 1) != ".":
+            add(index + 1, next_token, "type", statement_end(index + 2))
+        elif token in ("const", "let", "var") and index + 2 < len(tokens) and tokens[index + 1][0] == "ident":
+            assigned = index + 3
+            while value(assigned) in ("async",):
+                assigned += 1
+            if value(index + 2) == "=" and (value(assigned) == "function" or _is_arrow(tokens, assigned)):
+                add(index + 1, next_token, "function", statement_end(assigned))
+            elif depth == 0:
+                add(index + 1, next_token, "variable", statement_end(index + 2))
+        elif classes and depth == classes[-1][2] and token not in _JS_KEYWORDS \
+                and next_token == "(" and value(index - 1) != ".":
+            # Method: name(...) { ... } directly inside a class body
+            closing = _matching_paren(tokens, index + 1)
+            if closing is not None and value(closing + 1) in ("{", ":"):
+                add(index, f"{classes[-1][1]}.{token}", "method", body_end(closing + 1))
+        elif classes and depth == classes[-1][2] and token not in _JS_KEYWORDS \
+                and next_token == "=" and _is_arrow(tokens, index + 2):
+            # Class field holding an arrow function
+            add(index, f"{classes[-1][1]}.{token}", "method", statement_end(index + 2))
+
+    references = {}
+    for index, (kind, token, line) in enumerate(tokens):
+        if kind == "ident" and index not in defined_at and token not in _JS_KEYWORDS:
+            references.setdefault(token, []).append(line)
+    for name in references:
+        references[name] = sorted(set(references[name]))
+    return {"definitions": definitions, "references": references}
+
+
+def _matching_paren(tokens, index):
+    """Index of the parenthesis closing the one at index, or None."""
+    depth = 0
+    for position in range(index, len(tokens)):
+        if tokens[position][1] == "(":
+            depth += 1
+        elif tokens[position][1] == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return None
+
+
+def _is_arrow(tokens, index):
+    """Whether the expression at index is an arrow function."""
+    if index >= len(tokens):
+        return False
+    if tokens[index][0] == "ident" and index + 1 < len(tokens) and tokens[index + 1][1] == "=>":
+        return True
+    if tokens[index][1] == "(":
+        closing = _matching_paren(tokens, index)
+        if closing is None:
+            return False
+        following = closing + 1
+        if following < len(tokens) and tokens[following][1] == ":":
+            # TypeScript return type annotation
+            while following < len(tokens) and tokens[following][1] not in ("=>", "{", ";"):
+                following += 1
+        return following < len(tokens) and tokens[following][1] == "=>"
+    return False
+
+
+def parse_source(path, source):
+    """
+    Parse a source file by extension.
+
+    Args:
+        path (str): The file path
+        source (str): The file contents
+
+    Returns:
+        dict: Definitions and references, or None for unsupported languages
+    """
+    if path.endswith(PYTHON_EXTENSIONS):
+        return parse_python(source)
+    if path.endswith(JS_EXTENSIONS):
+        return parse_js(source)
+    return None
+
+
+class SymbolIndex:
+    """
+    Definitions and references of the source files under a root, parsed on demand.
+
+    Parsed files are kept in an LRU cache keyed by path and invalidated when their
+    mtime or size changes. When a CodeIndex is given, symbol lookups only parse the
+    files its trigram index says contain the name.
+    """
+
+    def __init__(self, root="/sandbox/code", code_index=None, max_cached_files=5000):
+        """
+        Initialize the index.
+
+        Args:
+            root (str): Directory containing the sources
+            code_index (CodeIndex, optional): Trigram index used to narrow lookups
+            max_cached_files (int): Number of parsed files kept in memory
+        """
+        self.root = root
+        self.code_index = code_index
+        self.max_cached_files = max_cached_files
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, file_path):
+        """
+        Map a path relative to the root (or absolute under it) to (relative, absolute).
+
+        Args:
+            file_path (str): The file path
+
+        Returns:
+            tuple: (relative path, absolute path)
+        """
+        root = os.path.abspath(self.root)
+        full_path = os.path.abspath(file_path if os.path.isabs(file_path) and file_path.startswith(root)
+                                    else os.path.join(root, file_path.lstrip("/")))
+        if not full_path.startswith(root + os.sep):
+            raise ValueError(f"Path is outside {self.root}: {file_path}")
+        return os.path.relpath(full_path, root), full_path
+
+    def parse(self, file_path):
+        """
+        Get a file's definitions and references, parsing it only if it changed.
+
+        Args:
+            file_path (str): Path relative to the root (or absolute under it)
+
+        Returns:
+            dict: Definitions and references, or None if the file is missing or unsupported
+        """
+        path, full_path = self.resolve(file_path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == key:
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+        if stat.st_size > MAX_FILE_BYTES or not path.endswith(PYTHON_EXTENSIONS + JS_EXTENSIONS):
+            return None
+        try:
+            with open(full_path, "r", errors="replace") as f:
+                source = f.read()
+        except OSError:
+            return None
+        parsed = parse_source(path, source)
+        with self._lock:
+            self.misses += 1
+            self._cache[path] = (key, parsed)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_cached_files:
+                self._cache.popitem(last=False)
+        return parsed
+
+    def outline(self, file_path):
+        """
+        List the definitions in a file.
+
+        Args:
+            file_path (str): Path relative to the root (or absolute under it)
+
+        Returns:
+            dict: The file and its definitions in source order
+        """
+        path, _ = self.resolve(file_path)
+        parsed = self.parse(path)
+        if parsed is None:
+            raise ValueError(f"Not a supported source file: {file_path}")
+        result = {"file": path, "definitions": parsed["definitions"]}
+        if parsed.get("error"):
+            result["error"] = parsed["error"]
+        return result
+
+    def _source_files(self, name):
+        """Get the source files that may mention name."""
+        paths = self.code_index.candidate_files([name]) if self.code_index is not None else None
+        if paths is None:
+            # No index, or it is still being built
+            paths = []
+            for directory, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+                for filename in filenames:
+                    paths.append(os.path.relpath(os.path.join(directory, filename), self.root))
+        return [path for path in paths if path.endswith(PYTHON_EXTENSIONS + JS_EXTENSIONS)]
+
+    def find_symbol(self, name, kind=None, include_references=False, max_results=50):
+        """
+        Find where a symbol is defined, and optionally where it is used.
+
+        A name matches a definition's plain name ("run") or qualified name
+        ("ShellTool.run").
+
+        Args:
+            name (str): The symbol name
+            kind (str, optional): Only return definitions of this kind (function, class, ...)
+            include_references (bool): Also return the lines referencing the name
+            max_results (int): Maximum definitions (and references) returned
+
+        Returns:
+            dict: "definitions" with file and line range, and optionally "references"
+        """
+        plain_name = name.rsplit(".", 1)[-1]
+        definitions = []
+        references = []
+        for path in self._source_files(plain_name):
+            parsed = self.parse(path)
+            if not parsed:
+                continue
+            for definition in parsed["definitions"]:
+                if name not in (definition["name"], definition["qualname"]):
+                    continue
+                if kind and definition["kind"] != kind:
+                    continue
+                definitions.append({"file": path, **definition})
+            if include_references:
+                for line in parsed["references"].get(plain_name, []):
+                    references.append({"file": path, "line": line})
+
+        # Prefer classes and functions over variables, then shallower paths
+        order = {"class": 0, "function": 1, "method": 2, "interface": 3, "type": 3, "enum": 3, "variable": 4}
+        definitions.sort(key=lambda d: (order.get(d["kind"], 5), d["file"].count("/"), d["file"], d["line"]))
+        result = {
+            "name": name,
+            "definitions": definitions[:max_results],
+            "truncated": len(definitions) > max_results
+        }
+        if include_references:
+            result["references"] = references[:max_results]
+            result["total_references"] = len(references)
+        return result
+
+    def read_symbol(self, name, file_path=None):
+        """
+        Get the source of a definition without reading the rest of its file.
+
+        Args:
+            name (str): The symbol name (plain or qualified)
+            file_path (str, optional): Only look in this file
+
+        Returns:
+            dict: The definition and its "content", or None if not found
+        """
+        if file_path:
+            path, _ = self.resolve(file_path)
+            definitions = [{"file": path, **definition} for definition in self.outline(path)["definitions"]
+                           if name in (definition["name"], definition["qualname"])]
+        else:
+            definitions = self.find_symbol(name, max_results=1)["definitions"]
+        if not definitions:
+            return None
+        definition = definitions[0]
+        _, full_path = self.resolve(definition["file"])
+        selected = []
+        with open(full_path, "r", errors="replace") as f:
+            for number, line in enumerate(f, 1):
+                if number > definition["end_line"]:
+                    break
+                if number >= definition["line"]:
+                    selected.append(line)
+        return {**definition, "content": "".join(selected)}
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Cached file count, hits and misses
+        """
+        with self._lock:
+            return {"cached_files": len(self._cache), "hits": self.hits, "misses": self.misses}
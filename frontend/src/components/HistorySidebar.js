@@ -4,19 +4,32 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 
+const PAGE_SIZE = 30;
+
 const HistorySidebar = ({ onSelectSession, onSelectWorkflow, currentSessionId, currentWorkflowId }) => {
   const [sessions, setSessions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [expandedSessions, setExpandedSessions] = useState({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  // Fetch sessions on component mount
+  // Fetch one page of sessions, most recently active first
+  const fetchSessionPage = async (cursor) => {
+    const params = { limit: PAGE_SIZE, fields: 'id,name,created_at,last_activity,workflows' };
+    if (cursor) params.cursor = cursor;
+    const response = await axios.get('http://localhost:5000/api/sessions', { params });
+    return response.data;
+  };
+
+  // Fetch the first page of sessions on component mount
   useEffect(() => {
     const fetchSessions = async () => {
       try {
         setLoading(true);
-        const response = await axios.get('http://localhost:5000/api/sessions');
-        setSessions(response.data.sessions || []);
+        const page = await fetchSessionPage(null);
+        setSessions(page.sessions || []);
+        setNextCursor(page.next_cursor || null);
         
         // Initialize expanded state for current session
         if (currentSessionId) {
@@ -36,6 +49,22 @@ const HistorySidebar = ({ onSelectSession, onSelectWorkflow, currentSessionId, c
     fetchSessions();
   }, [currentSessionId]);
 
+  // Append the next page of sessions
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchSessionPage(nextCursor);
+      setSessions(prev => [...prev, ...(page.sessions || [])]);
+      setNextCursor(page.next_cursor || null);
+    } catch (err) {
+      console.error('Error fetching more sessions:', err);
+      setError('Failed to load session history');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Toggle session expansion
   const toggleSession = (sessionId) => {
     setExpandedSessions(prev => ({
@@ -110,7 +139,7 @@ const HistorySidebar = ({ onSelectSession, onSelectWorkflow, currentSessionId, c
                   >
                     {session.name}
                   </h4>
-                  <p className="text-xs text-gray-500">{formatDate(session.created_at)}</p>
+                  <p className="text-xs text-gray-500">{formatDate(session.last_activity || session.created_at)}</p>
                 </div>
                 <span className="text-gray-400">
                   {expandedSessions[session.id] ? (
@@ -151,6 +180,16 @@ const HistorySidebar = ({ onSelectSession, onSelectWorkflow, currentSessionId, c
           ))}
         </ul>
       )}
+
+      {nextCursor && (
+        <button
+          className="mt-3 w-full text-sm text-indigo-600 hover:text-indigo-800 disabled:text-gray-400"
+          onClick={loadMore}
+          disabled={loadingMore}
+        >
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 };
@@ -12,6 +12,44 @@ const Terminal = ({ sessionId, workflowId }) => {
   const xtermRef = useRef(null);
   const fitAddonRef = useRef(null);
   const socketRef = useRef(null);
+  const runningRef = useRef(false);
+  const cwdRef = useRef('');
+  // Keep the latest IDs available to the key handler registered on mount
+  const idsRef = useRef({ sessionId, workflowId });
+  idsRef.current = { sessionId, workflowId };
+
+  const writePrompt = () => {
+    xtermRef.current.write(cwdRef.current ? `${cwdRef.current} $ ` : '$ ');
+  };
+
+  // xterm needs carriage returns to start new lines at column 0
+  const writeOutput = (text) => {
+    xtermRef.current.write(text.replace(/\r?\n/g, '\r\n'));
+  };
+
+  const sendInput = async (data) => {
+    try {
+      await axios.post('http://localhost:5000/api/shell/input', {
+        data,
+        session_id: idsRef.current.sessionId,
+        workflow_id: idsRef.current.workflowId
+      });
+    } catch (error) {
+      console.error('Error sending input:', error);
+    }
+  };
+
+  const sendSignal = async (signal) => {
+    try {
+      await axios.post('http://localhost:5000/api/shell/signal', {
+        signal,
+        session_id: idsRef.current.sessionId,
+        workflow_id: idsRef.current.workflowId
+      });
+    } catch (error) {
+      console.error('Error sending signal:', error);
+    }
+  };
 
   useEffect(() => {
     // Initialize terminal
@@ -59,19 +97,31 @@ const Terminal = ({ sessionId, workflowId }) => {
       // Welcome message
       xtermRef.current.writeln('Terminal initialized. Type commands to interact with the system.');
       xtermRef.current.writeln('');
-      xtermRef.current.write('$ ');
+      writePrompt();
 
       // Handle user input
       let commandBuffer = '';
       xtermRef.current.onKey(({ key, domEvent }) => {
         const printable = !domEvent.altKey && !domEvent.ctrlKey && !domEvent.metaKey;
 
-        if (domEvent.keyCode === 13) { // Enter key
+        if (domEvent.ctrlKey && domEvent.key === 'c') { // Ctrl-C
+          xtermRef.current.write('^C');
+          commandBuffer = '';
+          if (runningRef.current) {
+            sendSignal('SIGINT');
+          } else {
+            xtermRef.current.writeln('');
+            writePrompt();
+          }
+        } else if (domEvent.keyCode === 13) { // Enter key
           xtermRef.current.writeln('');
-          if (commandBuffer.trim()) {
+          if (runningRef.current) {
+            // Forward the line to the running command's stdin
+            sendInput(commandBuffer + '\n');
+          } else if (commandBuffer.trim()) {
             executeCommand(commandBuffer);
           } else {
-            xtermRef.current.write('$ ');
+            writePrompt();
           }
           commandBuffer = '';
         } else if (domEvent.keyCode === 8) { // Backspace
@@ -105,41 +155,80 @@ const Terminal = ({ sessionId, workflowId }) => {
     }
   }, []);
 
-  // Execute command via API
+  // Execute command via the streaming API, writing output as it arrives
   const executeCommand = async (command) => {
+    runningRef.current = true;
+    let result = null;
+    let lastChar = '\n';
     try {
-      xtermRef.current.writeln(`Executing: ${command}`);
-      
-      const response = await axios.post('http://localhost:5000/api/shell', {
-        command,
-        session_id: sessionId,
-        workflow_id: workflowId
+      const response = await fetch('http://localhost:5000/api/shell/stream', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': 'text/event-stream'
+        },
+        body: JSON.stringify({
+          command,
+          session_id: idsRef.current.sessionId,
+          workflow_id: idsRef.current.workflowId
+        })
       });
-      
-      // The shell endpoint returns exit_code, stdout, and stderr
-      if (response.data.exit_code === 0) {
-        if (response.data.stdout) {
-          xtermRef.current.writeln(response.data.stdout);
-        }
-        if (response.data.stderr) {
-          xtermRef.current.writeln(response.data.stderr);
-        }
-      } else {
-        if (response.data.stdout) {
-          xtermRef.current.writeln(response.data.stdout);
-        }
-        if (response.data.stderr) {
-          xtermRef.current.writeln(`Error: ${response.data.stderr}`);
-        } else {
-          xtermRef.current.writeln(`Command failed with exit code ${response.data.exit_code}`);
+      if (!response.ok) {
+        throw new Error(`Request failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (!result) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        for (const frame of frames) {
+          const eventLine = frame.split('\n').find(line => line.startsWith('event: '));
+          const dataLine = frame.split('\n').find(line => line.startsWith('data: '));
+          if (!eventLine || !dataLine) continue;
+          const event = eventLine.slice(7);
+          const data = JSON.parse(dataLine.slice(6));
+
+          if (event === 'output') {
+            writeOutput(data.data);
+            lastChar = data.data.slice(-1) || lastChar;
+          } else if (event === 'exit') {
+            result = data;
+          } else if (event === 'error') {
+            throw new Error(data.error);
+          }
         }
       }
+      if (!result) {
+        throw new Error('Stream ended before the command finished');
+      }
+
+      if (lastChar !== '\n') {
+        xtermRef.current.writeln('');
+      }
+      if (result.stderr) {
+        writeOutput(`${result.stderr}\n`);
+      }
+      if (result.exit_code !== 0) {
+        xtermRef.current.writeln(`Command failed with exit code ${result.exit_code}`);
+      }
+      if (result.cwd) {
+        cwdRef.current = result.cwd;
+      }
     } catch (error) {
       console.error('Error executing command:', error);
       xtermRef.current.writeln(`Error: ${error.message || 'Failed to execute command'}`);
     }
-    
-    xtermRef.current.write('$ ');
+
+    runningRef.current = false;
+    writePrompt();
   };
 
   return (
@@ -14,6 +14,7 @@ const ChatPage = ({ sessionId, workflowId, stepId, incrementStepId, workflowName
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [jobId, setJobId] = useState(null);
   const messagesEndRef = useRef(null);
 
   // Scroll to bottom of chat
@@ -85,32 +86,97 @@ const ChatPage = ({ sessionId, workflowId, stepId, incrementStepId, workflowName
     setInput('');
     setIsLoading(true);
 
+    // Placeholder assistant message that is filled in as the stream arrives
+    setMessages(prev => [...prev, {
+      role: 'assistant',
+      content: '',
+      steps: [],
+      streaming: true,
+      timestamp: new Date().toISOString(),
+      step_id: stepId
+    }]);
+    const updateStreamingMessage = (update) => {
+      setMessages(prev => prev.map(m => (m.streaming ? { ...m, ...update(m) } : m)));
+    };
+
     try {
-      // Send message to backend
+      // Queue the message as a background job, then stream the agent's tokens and steps
       // The backend will create a new workflow for each task (first message)
-      const response = await axios.post('http://localhost:5000/api/chat', {
+      const job = await axios.post('http://localhost:5000/api/jobs', {
         message: input,
         session_id: sessionId,
         workflow_id: workflowId, // This will be null for a new task
         workflow_name: workflowName,
         step_id: stepId
       });
+      setJobId(job.data.job_id);
 
-      // Add AI response to chat
-      const aiMessage = {
-        role: 'assistant',
-        content: response.data.response,
-        timestamp: new Date().toISOString(),
-        step_id: stepId
-      };
-      setMessages(prev => [...prev, aiMessage]);
+      const response = await fetch(`http://localhost:5000/api/jobs/${job.data.job_id}/events`, {
+        headers: { Accept: 'text/event-stream' }
+      });
+      if (!response.ok || !response.body) {
+        throw new Error(`Job stream failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let result = null;
+      let cancelled = false;
+
+      while (!result) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        for (const frame of frames) {
+          const eventLine = frame.split('\n').find(line => line.startsWith('event: '));
+          const dataLine = frame.split('\n').find(line => line.startsWith('data: '));
+          if (!eventLine || !dataLine) continue;
+          const event = eventLine.slice(7);
+          const data = JSON.parse(dataLine.slice(6));
+
+          if (event === 'token') {
+            updateStreamingMessage(m => ({ content: m.content + data.token }));
+          } else if (event === 'action') {
+            updateStreamingMessage(m => ({
+              content: '',
+              steps: [...m.steps, `Action: ${data.tool} ${typeof data.tool_input === 'string' ? data.tool_input : JSON.stringify(data.tool_input)}`]
+            }));
+          } else if (event === 'observation') {
+            updateStreamingMessage(m => ({ steps: [...m.steps, `Observation: ${data.observation}`] }));
+          } else if (event === 'truncated') {
+            updateStreamingMessage(m => ({ content: `${m.content}[${data.dropped} earlier events were dropped]\n` }));
+          } else if (event === 'final') {
+            result = data;
+          } else if (event === 'error') {
+            throw new Error(data.error);
+          } else if (event === 'cancelled') {
+            cancelled = true;
+            result = data;
+          }
+        }
+      }
+      if (!result) {
+        throw new Error('Stream ended before the agent finished');
+      }
+      if (cancelled) {
+        updateStreamingMessage(m => ({ content: `${m.content}\n[Stopped]`, streaming: false }));
+        return;
+      }
+
+      // Replace the streamed text with the final response
+      updateStreamingMessage(() => ({ content: result.response, streaming: false }));
       
       // Update workflow ID if this was a new task
-      if (response.data.workflow_id && (!workflowId || response.data.workflow_id !== workflowId)) {
+      if (result.workflow_id && (!workflowId || result.workflow_id !== workflowId)) {
         // Call the updateWorkflowId function from props
         if (updateWorkflowId) {
           const taskPreview = input.length > 50 ? `${input.substring(0, 50)}...` : input;
-          updateWorkflowId(response.data.workflow_id, `Task: ${taskPreview}`);
+          updateWorkflowId(result.workflow_id, `Task: ${taskPreview}`);
         }
       }
       
@@ -119,16 +185,27 @@ const ChatPage = ({ sessionId, workflowId, stepId, incrementStepId, workflowName
     } catch (error) {
       console.error('Error sending message:', error);
       
-      // Add error message to chat
+      // Replace the partial response with an error message
       const errorMessage = {
         role: 'system',
         content: 'Error: Could not connect to the agent. Please try again.',
         timestamp: new Date().toISOString(),
         step_id: stepId
       };
-      setMessages(prev => [...prev, errorMessage]);
+      setMessages(prev => [...prev.filter(m => !m.streaming), errorMessage]);
     } finally {
       setIsLoading(false);
+      setJobId(null);
+    }
+  };
+
+  // Cancel the running job; the stream then ends with a "cancelled" event
+  const handleStop = async () => {
+    if (!jobId) return;
+    try {
+      await axios.delete(`http://localhost:5000/api/jobs/${jobId}`);
+    } catch (error) {
+      console.error('Error cancelling job:', error);
     }
   };
 
@@ -173,6 +250,13 @@ const ChatPage = ({ sessionId, workflowId, stepId, incrementStepId, workflowName
                       : 'bg-gray-200 dark:bg-gray-700 text-gray-800 dark:text-gray-200'
                 }`}
               >
+                {message.steps && message.steps.length > 0 && (
+                  <div className="mb-2 text-xs font-mono text-gray-500 dark:text-gray-400 whitespace-pre-wrap">
+                    {message.steps.map((step, stepIndex) => (
+                      <div key={stepIndex} className="truncate">{step}</div>
+                    ))}
+                  </div>
+                )}
                 <p className="whitespace-pre-wrap">{message.content}</p>
                 <div className="flex justify-between text-xs text-gray-500 dark:text-gray-400 mt-1">
                   <span>
@@ -216,6 +300,15 @@ const ChatPage = ({ sessionId, workflowId, stepId, incrementStepId, workflowName
           >
             {isLoading ? 'Sending...' : 'Send'}
           </button>
+          {isLoading && jobId && (
+            <button
+              type="button"
+              onClick={handleStop}
+              className="ml-2 bg-gray-500 text-white px-4 py-2 rounded-md hover:bg-gray-600 focus:outline-none focus:ring-2 focus:ring-gray-400 focus:ring-offset-2"
+            >
+              Stop
+            </button>
+          )}
         </form>
       </div>
     </div>
@@ -1,38 +1,101 @@
 /**
  * History page component for viewing and managing past sessions and workflows.
  */
-import React, { useState, useEffect, useContext } from 'react';
+import React, { useState, useEffect, useRef, useContext } from 'react';
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import { ThemeContext } from '../context/ThemeContext';
 
+const PAGE_SIZE = 50;
+
 const HistoryPage = ({ onSelectSession, onSelectWorkflow }) => {
   const { isDarkMode } = useContext(ThemeContext);
-  const [sessions, setSessions] = useState([]);
+  // The loaded sessions, the cursor of the next page and the filter both belong to,
+  // kept in one state so they always change together
+  const [listing, setListing] = useState({ query: '', sessions: [], nextCursor: null });
+  const { sessions, nextCursor } = listing;
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [searchQuery, setSearchQuery] = useState('');
   const [selectedSession, setSelectedSession] = useState(null);
   const [selectedWorkflow, setSelectedWorkflow] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const navigate = useNavigate();
+  // Id and AbortController of the latest session list request; responses to older ones are ignored
+  const listRequestRef = useRef({ id: 0, controller: null });
+
+  // Cancel the session list request in flight (if any) and start tracking a new one
+  const startListRequest = () => {
+    const previous = listRequestRef.current;
+    if (previous.controller) previous.controller.abort();
+    listRequestRef.current = { id: previous.id + 1, controller: new AbortController() };
+    return listRequestRef.current;
+  };
+
+  const isCurrentListRequest = (request) => listRequestRef.current.id === request.id;
+
+  // Fetch one page of sessions without their workflow lists; details are fetched on selection
+  const fetchSessionPage = async (query, cursor, signal) => {
+    const params = { limit: PAGE_SIZE, fields: 'id,name,created_at,last_activity,workflow_count' };
+    if (cursor) params.cursor = cursor;
+    if (query) params.q = query;
+    const response = await axios.get('http://localhost:5000/api/sessions', { params, signal });
+    return response.data;
+  };
 
-  // Fetch sessions on component mount
+  // Fetch the first page of sessions on mount and whenever the search changes
   useEffect(() => {
     const fetchSessions = async () => {
+      const request = startListRequest();
+      // loading starts true, so only the first fetch replaces the page with a spinner
       try {
-        setLoading(true);
-        const response = await axios.get('http://localhost:5000/api/sessions');
-        setSessions(response.data.sessions || []);
+        const page = await fetchSessionPage(searchQuery, null, request.controller.signal);
+        if (!isCurrentListRequest(request)) return;
+        setListing({ query: searchQuery, sessions: page.sessions || [], nextCursor: page.next_cursor || null });
       } catch (err) {
+        if (axios.isCancel(err) || !isCurrentListRequest(request)) return;
         console.error('Error fetching sessions:', err);
         setError('Failed to load session history');
       } finally {
-        setLoading(false);
+        if (isCurrentListRequest(request)) {
+          setLoading(false);
+          setLoadingMore(false);
+        }
       }
     };
 
-    fetchSessions();
+    const timer = setTimeout(fetchSessions, searchQuery ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  // Cancel any session list request still in flight when the page is left
+  useEffect(() => () => {
+    if (listRequestRef.current.controller) listRequestRef.current.controller.abort();
   }, []);
 
+  // Append the next page of sessions; not while the first page of a new filter is pending
+  const loadMore = async () => {
+    if (!nextCursor || listing.query !== searchQuery) return;
+    const { query, nextCursor: cursor } = listing;
+    const request = startListRequest();
+    try {
+      setLoadingMore(true);
+      const page = await fetchSessionPage(query, cursor, request.controller.signal);
+      if (!isCurrentListRequest(request)) return;
+      setListing(prev => (prev.query !== query || prev.nextCursor !== cursor ? prev : {
+        query,
+        sessions: [...prev.sessions, ...(page.sessions || [])],
+        nextCursor: page.next_cursor || null
+      }));
+    } catch (err) {
+      if (axios.isCancel(err) || !isCurrentListRequest(request)) return;
+      console.error('Error fetching more sessions:', err);
+      setError('Failed to load session history');
+    } finally {
+      if (isCurrentListRequest(request)) setLoadingMore(false);
+    }
+  };
+
   // Fetch session details when a session is selected
   useEffect(() => {
     if (selectedSession) {
@@ -130,6 +193,13 @@ const HistoryPage = ({ onSelectSession, onSelectWorkflow }) => {
         <div className="w-1/3 border-r border-gray-200 dark:border-gray-700 overflow-y-auto" style={{ maxHeight: '70vh' }}>
           <div className="p-4 bg-gray-50 dark:bg-gray-700 border-b border-gray-200 dark:border-gray-600">
             <h3 className="text-sm font-medium text-gray-700 dark:text-gray-300">Sessions</h3>
+            <input
+              type="text"
+              value={searchQuery}
+              onChange={(e) => setSearchQuery(e.target.value)}
+              placeholder="Filter by name"
+              className="mt-2 w-full px-2 py-1 text-sm border border-gray-300 dark:border-gray-600 rounded-md bg-white dark:bg-gray-800 text-gray-900 dark:text-white"
+            />
           </div>
           <ul className="divide-y divide-gray-200 dark:divide-gray-700">
             {sessions.length === 0 ? (
@@ -148,16 +218,25 @@ const HistoryPage = ({ onSelectSession, onSelectWorkflow }) => {
                   <div className="flex justify-between">
                     <div>
                       <h4 className="font-medium text-gray-900 dark:text-white">{session.name}</h4>
-                      <p className="text-xs text-gray-500 dark:text-gray-400">{formatDate(session.created_at)}</p>
+                      <p className="text-xs text-gray-500 dark:text-gray-400">{formatDate(session.last_activity || session.created_at)}</p>
                     </div>
                     <div className="text-xs text-gray-500 dark:text-gray-400">
-                      {session.workflows?.length || 0} workflows
+                      {session.workflow_count ?? session.workflows?.length ?? 0} workflows
                     </div>
                   </div>
                 </li>
               ))
             )}
           </ul>
+          {nextCursor && (
+            <button
+              className="w-full p-3 text-sm text-indigo-600 dark:text-indigo-400 hover:bg-gray-50 dark:hover:bg-gray-700 disabled:text-gray-400"
+              onClick={loadMore}
+              disabled={loadingMore || listing.query !== searchQuery}
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
 
         {/* Workflows List */}